@@ -0,0 +1,60 @@
+# benchmarks/bench_drop_pseudo_empty.py
+#
+#   python -m benchmarks.bench_drop_pseudo_empty [rows]
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+import components.data_ops as ops
+
+
+def _legacy_is_pseudo_empty(row, threshold: float) -> bool:
+    empty = sum(
+        1
+        for v in row
+        if pd.isna(v) or (isinstance(v, str) and v.strip().lower() in ops._EMPTY_TOKENS)
+    )
+    return empty / len(row) >= threshold
+
+
+def legacy_drop_pseudo_empty(df: pd.DataFrame, threshold: float = 0.8) -> pd.DataFrame:
+    return df[~df.apply(_legacy_is_pseudo_empty, axis=1, threshold=threshold)].copy()
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    tokens = np.array(["N/A", "unknown", "", " ", "Rear End", "Angle", "Sideswipe"], dtype=object)
+    df = pd.DataFrame({
+        "crash_type": rng.choice(tokens, n),
+        "weather": rng.choice(tokens, n),
+        "road": rng.choice(tokens[:5], n),
+        "injuries": np.where(rng.random(n) < 0.3, np.nan, rng.integers(0, 5, n)),
+        "lat": np.where(rng.random(n) < 0.3, np.nan, rng.random(n)),
+    })
+    df.loc[rng.random(n) < 0.1, "weather"] = None
+    return df
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(rows: int = 1_000_000):
+    df = make_frame(rows)
+    new, t_new = _timed(ops.drop_pseudo_empty, df, 0.6)
+    # the row-wise version is timed on a slice and extrapolated
+    sample = min(rows, 100_000)
+    old, t_old = _timed(legacy_drop_pseudo_empty, df.head(sample), 0.6)
+    assert old.index.equals(new.index[new.index < sample])
+    t_old *= rows / sample
+    print(f"rows={rows:,}  kept={len(new):,}")
+    print(f"row-wise apply : {t_old:8.2f}s" + (" (extrapolated)" if sample < rows else ""))
+    print(f"vectorized     : {t_new:8.2f}s")
+    print(f"speedup        : {t_old / t_new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,78 @@
+# benchmarks/bench_external_sort.py
+#
+#   python -m benchmarks.bench_external_sort [rows] [chunk_rows]
+#
+# Converts one CSV to SPMF sequences in memory (read, parse, group, build,
+# write) and out of core (chunked passes, sorted runs, k-way merge), reports
+# time and traced peak memory of both and checks the files are identical.
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.bench_time_grouping import FMT, make_frame
+import components.data_ops as ops
+import components.spmf.external_sort as ext
+
+ITEM_COLS = ["weather", "light"]
+
+
+def write_csv(rows: int, path: str):
+    df = make_frame(rows)
+    rng = np.random.default_rng(1)
+    df["weather"] = rng.choice(["clear", "rain", "snow", "fog", None], rows, p=[.6, .2, .1, .07, .03])
+    df["light"] = rng.choice(["day", "dusk", "dark"], rows)
+    df.to_csv(path, index=False)
+
+
+def in_memory(path: str, out: str) -> str:
+    df = ops.standardize_columns(pd.read_csv(path, dtype=str))
+    d1 = ops.parse_time_for_spmf(df, "date_and_time", FMT)
+    d1["groupid"] = ops.daily_groupid(d1, "zip_code", "date_and_time")
+    d2 = d1.dropna(subset=ITEM_COLS)
+    _, encoder = ops.build_spmf_dictionary(d2, ITEM_COLS)
+    return ops.write_sequence_db(ops.build_sequence_db(d2, ITEM_COLS, encoder), path=out)
+
+
+def out_of_core(path: str, chunk_rows: int) -> str:
+    spmf_path, _, _ = ext.convert_sequences(
+        path, ITEM_COLS, "date_and_time", "zip_code", FMT, chunk_rows=chunk_rows
+    )
+    return spmf_path
+
+
+def measure(fn, *args):
+    # timed untraced, then run again for the traced peak
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    ext.store.clear()
+    tracemalloc.start()
+    fn(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(rows: int = 2_000_000, chunk_rows: int = 200_000):
+    tmp = tempfile.mkdtemp()
+    src = os.path.join(tmp, "accidents.csv")
+    write_csv(rows, src)
+    ext.store.clear()
+
+    ref, t_mem, m_mem = measure(in_memory, src, os.path.join(tmp, "in_memory.txt"))
+    out, t_ext, m_ext = measure(out_of_core, src, chunk_rows)
+
+    print(f"rows={rows:,} csv={os.path.getsize(src) / 1024 ** 2:,.0f} MB chunk_rows={chunk_rows:,}")
+    print(f"in memory    {t_mem:6.2f}s  peak {m_mem / 1024 ** 2:8.1f} MB")
+    print(f"out of core  {t_ext:6.2f}s  peak {m_ext / 1024 ** 2:8.1f} MB  "
+          f"identical={filecmp.cmp(ref, out, shallow=False)}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,73 @@
+# benchmarks/bench_jvm_worker.py
+#
+#   python -m benchmarks.bench_jvm_worker [runs] [rows]
+#
+# Runs the same small mining job repeatedly with a fresh process per run and
+# on a warm worker from the pool, and checks both give the same output. Uses
+# SpmfWorker.java with the SPMF jar when Java and the jar are present,
+# otherwise the Python stand-in worker (which shows only the process start-up
+# part of the saving; JIT warm-up comes on top with a real JVM).
+
+import filecmp
+import os
+import shutil
+import sys
+import tempfile
+import time
+from benchmarks.bench_spmf_writer import make_frame
+from components.spmf.spmf_converter import build_dictionary
+from components.spmf.sequence_db import SequenceDB
+import components.spmf.jvm_worker as jvm_worker
+import components.spmf.stand_in_worker as stand_in
+import components.spmf.spmf_executor as executor
+
+
+def worker_command() -> tuple[list[str], str]:
+    if shutil.which("java") and os.path.exists(executor.JAR_PATH):
+        return jvm_worker.java_command(executor.JAR_PATH), "SpmfWorker.java"
+    return stand_in.command(), "stand-in"
+
+
+def cold_run(command: list[str], args: list[str]):
+    # one worker per job: start, run, quit
+    worker = jvm_worker.JvmWorker(command)
+    try:
+        if not worker.ping(jvm_worker.START_TIMEOUT):
+            raise RuntimeError("worker did not start")
+        worker.run(args)
+    finally:
+        worker.close()
+
+
+def main(runs: int = 20, rows: int = 20_000):
+    df = make_frame(rows)
+    item_cols = ["weather", "light", "collision"]
+    _, encoder = build_dictionary(df, item_cols)
+    tmp = tempfile.mkdtemp()
+    src = SequenceDB.from_frame(df, item_cols, encoder).to_spmf(os.path.join(tmp, "in.txt"))
+    cold_out, warm_out = os.path.join(tmp, "cold.txt"), os.path.join(tmp, "warm.txt")
+    command, kind = worker_command()
+    args = ["PrefixSpan", src, None, "0.05"]
+
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        cold_run(command, args[:2] + [cold_out] + args[3:])
+    t_cold = (time.perf_counter() - t0) / runs
+
+    pool = jvm_worker.WorkerPool(command, size=1)
+    pool.run(args[:2] + [warm_out] + args[3:])        # start and warm up
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        pool.run(args[:2] + [warm_out] + args[3:])
+    t_warm = (time.perf_counter() - t0) / runs
+    pool.shutdown()
+
+    same = filecmp.cmp(cold_out, warm_out, shallow=False)
+    print(f"worker={kind} runs={runs} rows={rows:,}")
+    print(f"cold {t_cold * 1000:8.1f} ms/run  warm {t_warm * 1000:8.1f} ms/run  "
+          f"{t_cold / t_warm:5.1f}x  identical={same}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
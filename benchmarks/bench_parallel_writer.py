@@ -0,0 +1,54 @@
+# benchmarks/bench_parallel_writer.py
+#
+#   python -m benchmarks.bench_parallel_writer [rows] [workers]
+#
+# Writes one SequenceDB with the in-process writer and with the process-pool
+# writer and checks both files are byte-identical. Only the writing runs in
+# parallel; the build (SequenceDB.from_frame) stays serial, so the end-to-end
+# line shows how much of a conversion the pool can speed up.
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_spmf_writer import make_frame
+from components.spmf.spmf_converter import build_dictionary
+from components.spmf.sequence_db import SequenceDB
+import components.spmf.parallel_writer as pw
+
+
+def main(rows: int = 2_000_000, workers: int = pw.DEFAULT_WORKERS):
+    df = make_frame(rows)
+    item_cols = ["weather", "light", "collision"]
+    _, encoder = build_dictionary(df, item_cols)
+    tmp = tempfile.mkdtemp()
+    serial, parallel = os.path.join(tmp, "serial.txt"), os.path.join(tmp, "parallel.txt")
+
+    t0 = time.perf_counter()
+    db = SequenceDB.from_frame(df, item_cols, encoder, time_col="date_and_time")
+    t_build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    db.to_spmf(serial)
+    t_serial = time.perf_counter() - t0
+
+    pw.MIN_SHARD_ITEMS = min(pw.MIN_SHARD_ITEMS, max(db.n_items // workers, 1))
+    pw.write_parallel(db, parallel, workers)     # warm the pool
+    t0 = time.perf_counter()
+    pw.write_parallel(db, parallel, workers)
+    t_parallel = time.perf_counter() - t0
+
+    same = filecmp.cmp(serial, parallel, shallow=False)
+    print(f"rows={rows:,} sequences={len(db):,} items={db.n_items:,} workers={workers}")
+    print(f"build {t_build:6.2f}s  write serial {t_serial:6.2f}s  "
+          f"parallel {t_parallel:6.2f}s  {t_serial / t_parallel:5.1f}x  identical={same}")
+    serial_total, parallel_total = t_build + t_serial, t_build + t_parallel
+    print(f"end to end: serial {serial_total:6.2f}s  parallel {parallel_total:6.2f}s  "
+          f"{serial_total / parallel_total:5.1f}x  serial build "
+          f"{t_build / parallel_total:4.0%} of the parallel conversion")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
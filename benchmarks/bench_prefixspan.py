@@ -0,0 +1,71 @@
+# benchmarks/bench_prefixspan.py
+#
+#   python -m benchmarks.bench_prefixspan [min_support] [sizes...]
+#
+# Mines synthetic sequence databases of growing size with PrefixSpan on the
+# NumPy backend (in process) and on the SPMF jar (write, JVM, parse), and
+# checks both find the same patterns with the same supports. Without Java
+# or the jar only the NumPy side runs.
+
+import os
+import shutil
+import sys
+import time
+import numpy as np
+from components.spmf.sequence_db import SequenceDB, _offsets
+import components.spmf.spmf_executor as executor
+
+SIZES = [1_000, 10_000, 100_000]
+N_ITEMS = 40
+
+
+def make_db(sequences: int, seed: int = 0) -> SequenceDB:
+    rng = np.random.default_rng(seed)
+    itemsets = 1 + rng.poisson(3, sequences)
+    set_sizes = rng.integers(1, 4, int(itemsets.sum()))
+    # skewed item popularity; sort and drop repeats inside every itemset
+    raw = np.minimum(rng.zipf(1.6, int(set_sizes.sum())), N_ITEMS)
+    owner = np.repeat(np.arange(len(set_sizes)), set_sizes)
+    order = np.lexsort((raw, owner))
+    raw, owner = raw[order], owner[order]
+    keep = np.r_[True, (raw[1:] != raw[:-1]) | (owner[1:] != owner[:-1])]
+    counts = np.bincount(owner[keep], minlength=len(set_sizes))
+    return SequenceDB(raw[keep], _offsets(counts), _offsets(itemsets))
+
+
+def patterns(df) -> set:
+    cols = [c for c in df.columns if c.startswith("Itemset ")]
+    return {
+        (tuple(r[c] for c in cols if isinstance(r[c], str)), int(r["Support"]))
+        for _, r in df.iterrows()
+    }
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main(min_support: float = 0.05, sizes=SIZES):
+    have_jar = shutil.which("java") is not None and os.path.exists(executor.JAR_PATH)
+    params = {"min_support": min_support}
+    print(f"min_support={min_support} jar={'yes' if have_jar else 'missing, skipped'}")
+    for n in sizes:
+        db = make_db(n)
+        src = db.save()
+        fast, t_np = timed(lambda: executor.mine(
+            "PrefixSpan", src, params, db, cache=False, backend="numpy"
+        ))
+        line = f"sequences={n:>9,} patterns={len(fast):>7,}  numpy {t_np:8.3f}s"
+        if have_jar:
+            jar, t_jar = timed(lambda: executor.mine(
+                "PrefixSpan", src, params, db, use_worker=False, cache=False
+            ))
+            line += f"  jar {t_jar:8.3f}s  same={patterns(fast) == patterns(jar)}"
+        print(line)
+
+
+if __name__ == "__main__":
+    ms = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    main(ms, [int(a) for a in sys.argv[2:]] or SIZES)
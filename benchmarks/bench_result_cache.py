@@ -0,0 +1,73 @@
+# benchmarks/bench_result_cache.py
+#
+#   python -m benchmarks.bench_result_cache [patterns] [rows]
+#
+# Mines a deduplicated database twice: once without the result cache (the
+# SPMF output is already in the artifact store, so this is parse + weighted
+# recount) and once answered from the result cache, and checks both frames
+# are equal. The SPMF run is replaced by a writer of sampled patterns so the
+# benchmark needs no Java.
+
+import os
+import sys
+import time
+import numpy as np
+from benchmarks.bench_spmf_writer import make_frame
+from components.spmf.spmf_converter import build_dictionary
+from components.spmf.sequence_db import SequenceDB
+import components.spmf.result_cache as result_cache
+import components.spmf.spmf_executor as executor
+
+ITEM_COLS = ["weather", "light", "collision"]
+PARAMS = {"min_support": 0.001}
+
+
+def pattern_writer(db: SequenceDB, patterns: int, seed: int = 0):
+    # prefixes of random sequences, one item per itemset: all really occur
+    rng = np.random.default_rng(seed)
+
+    def run(cmd, output_path):
+        with open(output_path, "w", encoding="utf-8") as f:
+            for s in rng.integers(0, len(db), patterns):
+                lo, hi = db.sequence_offsets[s], db.sequence_offsets[s + 1]
+                starts = db.itemset_offsets[lo:min(hi, lo + rng.integers(1, 4))]
+                f.write(" -1 ".join(str(db.items[i]) for i in starts) + " -1 #SUP: 1\n")
+    return run
+
+
+def timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main(patterns: int = 2_000, rows: int = 100_000):
+    df = make_frame(rows)
+    _, encoder = build_dictionary(df, ITEM_COLS)
+    db = SequenceDB.from_frame(df, ITEM_COLS, encoder).dedup()
+    src = db.save()
+    run = pattern_writer(db, patterns)
+    result_cache.store.clear()
+
+    def mine(cache):
+        return executor.mine("PrefixSpan", src, PARAMS, db, prune=False, run=run, cache=cache)
+
+    mine(True)                                     # SPMF output and cached result
+    fresh, t_fresh = timed(lambda: mine(False), repeat=1)
+    hit, t_hit = timed(lambda: mine(True))
+
+    size = os.path.getsize(result_cache.store.path(
+        executor.result_key("PrefixSpan", src, PARAMS, db, False), result_cache.SUFFIX
+    ))
+    same = fresh.equals(hit) and hit.attrs.get("cached", False)
+    print(f"patterns={len(fresh):,} sequences={len(db):,} cache file={size / 1024:,.0f} KB")
+    print(f"parse + recount {t_fresh * 1000:8.1f} ms  cache hit {t_hit * 1000:6.1f} ms  "
+          f"{t_fresh / t_hit:5.1f}x  equal={same}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,115 @@
+# benchmarks/bench_spmf_writer.py
+#
+#   python -m benchmarks.bench_spmf_writer [rows]
+#
+# Compares the columnar sequence and transaction writers with the previous
+# groupby/iterrows writers and checks the output is byte-identical.
+
+import filecmp
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from components.spmf.spmf_converter import build_dictionary
+from components.spmf.spmf_writer import write_sequences, write_transactions
+
+
+def legacy_write_sequence_file(df, item_cols, item2id, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for _, grp in df.groupby("groupid"):
+            grp = grp.sort_values("date_and_time", kind="stable")
+            seq = [
+                " ".join(
+                    str(item2id[(c, v)]) for c, v in row[item_cols].items()
+                    if pd.notna(v) and (c, v) in item2id
+                )
+                for _, row in grp.iterrows()
+            ]
+            f.write(" -1 ".join(seq) + " -2\n")
+    return path
+
+
+def legacy_write_spmf_file(df, item_cols, item2id, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for _, grp in df.groupby("groupid"):
+            seq = []
+            for _, row in grp.iterrows():
+                ids = [
+                    str(item2id[(c, row[c])])
+                    for c in item_cols
+                    if (c, row[c]) in item2id
+                ]
+                if ids:
+                    seq.append(" ".join(ids))
+            if seq:
+                f.write(" -1 ".join(seq) + " -2\n")
+    return path
+
+
+def legacy_write_transaction_file(df, item_cols, item2id, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for _, row in df.iterrows():
+            ids = [str(item2id[(c, row[c])]) for c in item_cols if (c, row[c]) in item2id]
+            if ids:
+                f.write(" ".join(ids) + "\n")
+    return path
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    zips = rng.integers(10000, 10400, n).astype(str)
+    days = rng.integers(0, 365, n)
+    secs = rng.integers(0, 86400, n)
+    t = pd.Timestamp("2020-01-01") + pd.to_timedelta(days, "D") + pd.to_timedelta(secs, "s")
+    df = pd.DataFrame({
+        "date_and_time": t,
+        "weather": rng.choice(["Clear", "Rain", "Snow", "Fog", None], n),
+        "light": rng.choice(["Day", "Dark", "Dusk"], n),
+        "collision": rng.choice(["Rear End", "Angle", "Sideswipe", "Head On"], n),
+    })
+    df["groupid"] = zips + "_" + df["date_and_time"].dt.strftime("%Y%m%d")
+    return df
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main(rows: int = 50_000):
+    df = make_frame(rows)
+    item_cols = ["weather", "light", "collision"]
+    _, encoder = build_dictionary(df, item_cols)
+    item2id = encoder.item2id
+    tmp = tempfile.mkdtemp()
+    p = {k: os.path.join(tmp, f"{k}.txt") for k in ("old_seq", "new_seq", "old_spmf", "new_spmf", "old_trx", "new_trx")}
+
+    t_new_seq = _timed(
+        lambda: write_sequences(df, item_cols, encoder, p["new_seq"],
+                                time_col="date_and_time", skip_empty=False)
+    )
+    t_new_spmf = _timed(lambda: write_sequences(df, item_cols, encoder, p["new_spmf"]))
+    t_new_trx = _timed(write_transactions, df, item_cols, encoder, p["new_trx"])
+    t_old_trx = _timed(legacy_write_transaction_file, df, item_cols, item2id, p["old_trx"])
+    t_old_seq = _timed(legacy_write_sequence_file, df, item_cols, item2id, p["old_seq"])
+    t_old_spmf = _timed(legacy_write_spmf_file, df, item_cols, item2id, p["old_spmf"])
+
+    print(f"rows={rows:,}")
+    for name, key, old, new in (("write_sequence_file", "seq", t_old_seq, t_new_seq),
+                                ("write_spmf_file", "spmf", t_old_spmf, t_new_spmf),
+                                ("write_transaction_file", "trx", t_old_trx, t_new_trx)):
+        same = filecmp.cmp(p[f"old_{key}"], p[f"new_{key}"], shallow=False)
+        print(f"{name:22s} legacy {old:7.2f}s  columnar {new:6.2f}s  "
+              f"{old / new:6.1f}x  identical={same}")
+
+    # throughput at scale, columnar writer only
+    big = make_frame(rows * 20, seed=1)
+    t = _timed(write_transactions, big, item_cols, encoder, p["new_trx"])
+    print(f"write_transactions     {len(big) / t:,.0f} transactions/s ({len(big):,} rows)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
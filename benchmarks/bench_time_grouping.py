@@ -0,0 +1,69 @@
+# benchmarks/bench_time_grouping.py
+#
+#   python -m benchmarks.bench_time_grouping [rows]
+#
+# Compares the string-based parse/strftime/concat groupid with the unique-value
+# parser and integer composite keys, and checks both split the rows into the
+# same sequences. Also times gap sessionization.
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from components.time_grouping import daily_groupid, parse_datetime, session_groupid
+
+FMT = "%m/%d/%Y %I:%M:%S %p"
+
+
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # a realistic number of distinct timestamps (one per minute over a year)
+    minutes = rng.integers(0, 365 * 24 * 60, n)
+    t = pd.Timestamp("2020-01-01") + pd.to_timedelta(minutes, "min")
+    text = pd.Series(t.strftime(FMT), dtype=object)
+    text[rng.random(n) < 0.01] = "not a date"
+    zips = pd.Series(rng.integers(1000, 100000, n).astype(str), dtype=object)
+    zips[rng.random(n) < 0.01] = None
+    return pd.DataFrame({"date_and_time": text, "zip_code": zips})
+
+
+def legacy_groupid(df: pd.DataFrame) -> pd.Series:
+    t = pd.to_datetime(df["date_and_time"], format=FMT, errors="coerce")
+    return df["zip_code"].astype(str) + "_" + t.dt.strftime("%Y%m%d")
+
+
+def fast_groupid(df: pd.DataFrame) -> pd.Series:
+    d = df.assign(date_and_time=parse_datetime(df["date_and_time"], FMT))
+    return daily_groupid(d, "zip_code", "date_and_time")
+
+
+def same_partition(a: pd.Series, b: pd.Series) -> bool:
+    ca, _ = pd.factorize(a)
+    cb, _ = pd.factorize(b)
+    if not np.array_equal(ca < 0, cb < 0):
+        return False
+    pairs = pd.DataFrame({"a": ca, "b": cb})[ca >= 0].drop_duplicates()
+    return pairs["a"].is_unique and pairs["b"].is_unique
+
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main(rows: int = 2_000_000):
+    df = make_frame(rows)
+    old, t_old = _timed(legacy_groupid, df)
+    new, t_new = _timed(fast_groupid, df)
+    print(f"rows={rows:,}")
+    print(f"groupid  legacy {t_old:6.2f}s  vectorized {t_new:6.2f}s  "
+          f"{t_old / t_new:5.1f}x  same sequences={same_partition(old, new)}")
+
+    d = df.assign(date_and_time=parse_datetime(df["date_and_time"], FMT))
+    sessions, t_sess = _timed(session_groupid, d, "zip_code", "date_and_time", pd.Timedelta(hours=6))
+    print(f"sessions {t_sess:6.2f}s  {sessions.nunique():,} sessions (6h gap)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
@@ -0,0 +1,224 @@
+# components/artifact_store.py
+#
+# Content-addressed store for the files the SPMF pipeline writes (converted
+# inputs, rewritten inputs, miner outputs). A file is named by a hash of what
+# it was made from, so identical conversions and runs resolve to the same
+# file and are produced once. The directory is kept under a byte quota by
+# evicting least recently used files; files used by a live Streamlit session
+# are pinned, and when the session's state is dropped the files no other
+# session uses are deleted. The
+# directory sits in the shared temp dir, so it must be private to the
+# server's user: created with mode 0700 and refused when someone else owns
+# it.
+
+import hashlib
+import os
+import stat
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+
+ARTIFACT_DIR = os.path.join(tempfile.gettempdir(), "spmavis_artifacts")
+DISK_QUOTA_BYTES = 4 * 1024 ** 3
+STALE_TMP_SECONDS = 24 * 3600
+
+_session_provider = None
+
+
+def set_session_provider(provider):
+    """``provider()`` returns the current ArtifactSession or None."""
+    global _session_provider
+    _session_provider = provider
+
+
+def content_key(*parts) -> str:
+    """Hex digest of ``parts`` (bytes, NumPy arrays or anything with a stable repr)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if hasattr(part, "tobytes"):
+            h.update(repr((part.dtype.str, part.shape)).encode())
+            h.update(part.tobytes())
+        elif isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(repr(part).encode())
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def private_dir(path: str) -> str:
+    """Create ``path`` readable and writable by this user only, or check
+    that an existing one is; raises PermissionError otherwise."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{path} is not a directory")
+    if hasattr(os, "getuid"):
+        if st.st_uid != os.getuid():
+            raise PermissionError(f"{path} belongs to another user")
+        if st.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+def _release_all(names: dict):
+    for store, held in names.items():
+        store.release(held)
+
+
+class ArtifactSession:
+    """Pins held by one Streamlit session, in every store; released when it
+    is collected."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.names = {}            # store -> names of its files this session uses
+        weakref.finalize(self, _release_all, self.names)
+
+
+class ArtifactStore:
+    def __init__(self, root: str = ARTIFACT_DIR, quota: int = DISK_QUOTA_BYTES):
+        self.root = root
+        self.quota = quota
+        self._lock = threading.Lock()
+        self._pins = {}            # file name -> number of sessions holding it
+        self._used = {}            # file name -> last use, this process
+        self._file_keys = {}       # (path, mtime, size) -> content key
+        private_dir(root)
+
+    # ---------- naming -------------------------------------------------------
+    def path(self, key: str, suffix: str = ".txt") -> str:
+        return os.path.join(self.root, key + suffix)
+
+    def file_key(self, path: str) -> str:
+        """Content key of an existing file; free for files of this store."""
+        name = os.path.basename(path)
+        if os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.root):
+            return os.path.splitext(name)[0]
+        st = os.stat(path)
+        stamp = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+        key = self._file_keys.get(stamp)
+        if key is None:
+            h = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as f:
+                while block := f.read(1 << 20):
+                    h.update(block)
+            key = self._file_keys[stamp] = h.hexdigest()
+        return key
+
+    # ---------- access -------------------------------------------------------
+    def get(self, key: str, suffix: str = ".txt") -> str | None:
+        path = self.path(key, suffix)
+        if not os.path.exists(path):
+            return None
+        self._touch(os.path.basename(path))
+        return path
+
+    def get_or_create(self, key: str, write, suffix: str = ".txt") -> str:
+        """Path of artifact ``key``, calling ``write(path)`` if it is missing."""
+        path = self.get(key, suffix)
+        if path is not None:
+            return path
+        return self.create(key, write, suffix)
+
+    def create(self, key: str, write, suffix: str = ".txt") -> str:
+        """Write artifact ``key`` with ``write(path)``, replacing any file
+        already there; readers holding the old file keep reading it."""
+        path = self.path(key, suffix)
+        tmp = os.path.join(self.root, f".{key}.{uuid.uuid4().hex}.tmp")
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._touch(os.path.basename(path))
+        self.evict(keep=os.path.basename(path))
+        return path
+
+    def _touch(self, name: str):
+        session = _session_provider() if _session_provider else None
+        with self._lock:
+            self._used[name] = time.time()
+            held = session.names.setdefault(self, set()) if session is not None else None
+            if held is not None and name not in held:
+                held.add(name)
+                self._pins[name] = self._pins.get(name, 0) + 1
+
+    # ---------- lifecycle ----------------------------------------------------
+    def open_session(self) -> ArtifactSession:
+        return ArtifactSession()
+
+    def release(self, names: set):
+        """Drop one session's pins on ``names`` and delete those files no
+        other session holds."""
+        with self._lock:
+            for name in names:
+                left = self._pins.get(name, 0) - 1
+                if left > 0:
+                    self._pins[name] = left
+                    continue
+                self._pins.pop(name, None)
+                self._used.pop(name, None)
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    pass
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        stale = time.time() - STALE_TMP_SECONDS
+        with os.scandir(self.root) as it:
+            for e in it:
+                if not e.is_file():
+                    continue
+                st = e.stat()
+                if e.name.startswith("."):
+                    # partial write; left behind only if a writer died
+                    if st.st_mtime < stale:
+                        try:
+                            os.remove(e.path)
+                        except OSError:
+                            pass
+                    continue
+                used = self._used.get(e.name, st.st_mtime)
+                entries.append((used, st.st_size, e.name))
+        return entries
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: str | None = None) -> int:
+        """Delete least recently used unpinned files (other than ``keep``)
+        until under quota."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        with self._lock:
+            for _, size, name in entries:
+                if total <= self.quota:
+                    break
+                if self._pins.get(name) or name == keep:
+                    continue
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                self._used.pop(name, None)
+                total -= size
+                freed += size
+        return freed
+
+    def clear(self):
+        """Delete every unpinned file."""
+        quota, self.quota = self.quota, -1
+        try:
+            self.evict()
+        finally:
+            self.quota = quota
+
+
+store = ArtifactStore()
@@ -0,0 +1,81 @@
+# components/cache.py
+#
+# Small thread-safe LRU keyed by hashable keys and bounded by a byte budget.
+# Streamlit runs every session in its own thread of the same process, so a
+# module-level instance is shared server-wide. A value larger than the whole
+# budget is not kept, unless the cache keeps oversized values: then it
+# evicts everything else and stays until the next put.
+
+from collections import OrderedDict
+import threading
+import numpy as np
+import pandas as pd
+
+
+def sizeof(value) -> int:
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return 0
+
+
+class LRUCache:
+    def __init__(self, max_bytes: int, sizeof=sizeof, keep_oversized: bool = False):
+        self.max_bytes = max_bytes
+        self.keep_oversized = keep_oversized
+        self._sizeof = sizeof
+        self._items: OrderedDict = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        size = self._sizeof(value)
+        if size > self.max_bytes and not self.keep_oversized:
+            return value
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[1]
+            self._items[key] = (value, size)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes and len(self._items) > 1:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._nbytes -= old_size
+        return value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._items.pop(key, None)
+            if item is None:
+                return default
+            self._nbytes -= item[1]
+            return item[0]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._nbytes = 0
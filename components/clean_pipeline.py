@@ -0,0 +1,164 @@
+# components/clean_pipeline.py
+#
+# Compiles the Data Tool cleaning params into a plan that is executed column
+# by column: row masks (pseudo-empty, filter) and the column selection are
+# resolved first, only the surviving cells are transformed, and the output
+# frame is materialised once. Produces the same frame as the step-by-step
+# pipeline (drop_pe -> fill -> types -> select -> filter -> dedup -> nulls).
+
+from dataclasses import dataclass, asdict
+import json
+import numpy as np
+import pandas as pd
+import components.data_ops as ops
+import components.rule_engine as rules
+from components.cache import LRUCache, sizeof
+
+_NUMERIC_OPS = {">", ">=", "<", "<="}
+RESULT_CACHE_BYTES = 2 * 1024 ** 3
+
+# key -> (cleaned frame, warnings raised while cleaning it)
+_results = LRUCache(RESULT_CACHE_BYTES, sizeof=lambda item: sizeof(item[0]))
+
+
+@dataclass(frozen=True)
+class CleanPlan:
+    pe_threshold: float | None
+    fill: bool
+    type_map: dict
+    columns: list | None
+    filter: tuple | None
+    drop_dup: bool
+    null_values: list | None
+
+
+def compile_clean_plan(params: dict) -> CleanPlan:
+    null_values = None
+    if params["drop_null"]:
+        null_values = []
+        if "NaN" in params["null_types"]:
+            null_values.append(pd.NA)
+        if "UNKNOWN" in params["null_types"]:
+            null_values.append("UNKNOWN")
+        null_values += [x.strip() for x in params["custom_nulls"].split(",") if x.strip()]
+    return CleanPlan(
+        pe_threshold=params["pe_thresh"] if params["drop_pe"] else None,
+        fill=bool(params["fill_type"]),
+        type_map=dict(params["type_map"]),
+        columns=list(params["keep_cols"]) if params["select_cols"] else None,
+        filter=(
+            (params["filter_col"], params["filter_op"], params["filter_val"])
+            if params["filter_rows"]
+            else None
+        ),
+        drop_dup=bool(params["drop_dup"]),
+        null_values=null_values,
+    )
+
+
+# ---------- execution --------------------------------------------------------
+def _row_local(s: pd.Series, t: str | None) -> bool:
+    # to_datetime without a format guesses it from the first non-null value,
+    # so those columns must see the same rows as the original pipeline did
+    return not (t == "Datetime" and not pd.api.types.is_datetime64_any_dtype(s))
+
+
+def _transform(s: pd.Series, plan: CleanPlan) -> pd.Series:
+    t = plan.type_map.get(s.name)
+    if plan.fill:
+        s = ops.fill_missing_series(s, t)
+    return ops.ensure_type(s, t)
+
+
+def _filter_mask(s: pd.Series, op: str, val) -> np.ndarray:
+    cv = float(val) if op in _NUMERIC_OPS else val
+    if op in _NUMERIC_OPS and isinstance(s.dtype, pd.CategoricalDtype):
+        # unordered categoricals cannot be ordered; compare their values
+        s = s.astype(s.cat.categories.dtype)
+    frame = pd.DataFrame({s.name: s}, copy=False)
+    mask = frame.eval(f"`{s.name}` {op} @cv", local_dict={"cv": cv})
+    return np.asarray(mask, dtype=bool)
+
+
+def run_clean_plan(plan: CleanPlan, df: pd.DataFrame, on_warning=None) -> pd.DataFrame:
+    cols = plan.columns if plan.columns is not None else list(df.columns)
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise KeyError(f"{missing} not in index")
+
+    rows = np.arange(len(df))
+    if plan.pe_threshold is not None and df.shape[1]:
+        rows = np.flatnonzero(~ops.pseudo_empty_mask(df, plan.pe_threshold))
+
+    # columns that cannot be transformed on an arbitrary row subset are
+    # staged on the pseudo-empty survivors before the filter is applied
+    staged = {}
+    for col in cols:
+        if not _row_local(df[col], plan.type_map.get(col)):
+            staged[col] = _transform(df[col].take(rows), plan)
+
+    if plan.filter is not None:
+        fc, op, val = plan.filter
+        try:
+            if fc not in cols:
+                raise KeyError(fc)
+            fs = staged.get(fc)
+            if fs is None:
+                fs = _transform(df[fc].take(rows), plan)
+            keep = _filter_mask(fs, op, val)
+            rows = rows[keep]
+            staged = {c: s[keep] for c, s in staged.items()}
+        except Exception:
+            if on_warning:
+                on_warning("Filter expression failed")
+
+    data = {}
+    for col in cols:
+        s = staged.pop(col, None)
+        if s is None:
+            s = _transform(df[col].take(rows), plan)
+        data[col] = s
+
+    keep = np.ones(len(rows), dtype=bool)
+    if plan.drop_dup:
+        keep &= ~pd.DataFrame(data, copy=False).duplicated().to_numpy()
+    if plan.null_values is not None:
+        for col in cols:
+            data[col] = data[col].replace(plan.null_values, pd.NA)
+            keep &= data[col].notna().to_numpy()
+    if not keep.all():
+        for col in cols:
+            data[col] = data[col][keep]
+    return pd.DataFrame(data, columns=cols, copy=False)
+
+
+# ---------- memoised results -------------------------------------------------
+def plan_key(plan: CleanPlan) -> str:
+    return json.dumps(asdict(plan), sort_keys=True, default=repr)
+
+
+def clean_cached(
+    df: pd.DataFrame, params: dict, rb_cfg: dict | None = None, on_warning=None
+) -> pd.DataFrame:
+    """Clean ``df`` and apply the Rule Builder, reusing an earlier result.
+
+    Keyed on the source fingerprint plus the normalised plan and rules, so
+    "Save clean" returns the frame "Preview clean" already computed. The
+    warnings of the first run are passed to ``on_warning`` again on every
+    hit. The returned frame is shared between callers and must not be
+    mutated.
+    """
+    plan = compile_clean_plan(params)
+    key = (ops.frame_fingerprint(df), plan_key(plan), rules.rules_key(rb_cfg))
+    item = _results.get(key)
+    if item is None:
+        warnings = []
+        cleaned = run_clean_plan(plan, df, on_warning=warnings.append)
+        if key[2] is not None:
+            cleaned = rules.apply_rules(cleaned, rb_cfg)
+        item = _results.put(key, (cleaned, tuple(warnings)))
+    cleaned, warnings = item
+    if on_warning:
+        for message in warnings:
+            on_warning(message)
+    return cleaned
@@ -1,67 +1,290 @@
 # components/data_ops.py
 
 import pandas as pd
+import numpy as np
 import os
-import uuid
+import hashlib
+import weakref
 from components.spmf.spmf_converter import write_transaction_file as _wt_file
+from components.spmf.item_encoder import ItemEncoder
+from components.spmf.spmf_writer import write_sequences
+from components.spmf.sequence_db import SequenceDB
+from components.spmf.parallel_writer import DEFAULT_WORKERS, write_parallel
+from components.spmf.external_sort import convert_sequences
+from components.time_grouping import (
+    day_number,
+    daily_groupid,
+    parse_datetime,
+    session_groupid,
+)
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
 
 def load_csv(path: str) -> pd.DataFrame:
     return pd.read_csv(path)
 
+# ---------- streaming ingestion ---------------------------------------------
+CHUNK_ROWS = 200_000
+_CATEGORY_RATIO = 0.5
+
+def _source_size(src) -> int | None:
+    if isinstance(src, (str, os.PathLike)):
+        return os.path.getsize(src)
+    size = getattr(src, "size", None)
+    if size is None and hasattr(src, "seek"):
+        pos = src.tell()
+        size = src.seek(0, os.SEEK_END)
+        src.seek(pos)
+    return size
+
+def _pin_dtypes(first: pd.DataFrame, use_arrow: bool) -> dict:
+    # decided once from the first chunk and passed to read_csv for the rest,
+    # so string columns never materialise as python objects
+    pinned = {}
+    for col in first.columns:
+        s = first[col]
+        if not (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)):
+            continue
+        if s.nunique(dropna=True) <= max(1, len(s) * _CATEGORY_RATIO):
+            pinned[col] = "category"
+        elif use_arrow:
+            pinned[col] = "string[pyarrow]"
+    return pinned
+
+def _compact_chunk(chunk: pd.DataFrame, pinned: dict) -> pd.DataFrame:
+    for col in chunk.columns:
+        s = chunk[col]
+        if col in pinned:
+            if s.dtype != pinned[col]:
+                chunk[col] = s.astype(pinned[col])
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            chunk[col] = pd.to_numeric(s, downcast="integer")
+    return chunk
+
+def _concat_chunks(chunks: list) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+    cols = {}
+    for col in chunks[0].columns:
+        parts = [c.pop(col) for c in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            cat = pd.api.types.union_categoricals(parts)
+            cols[col] = pd.Series(cat, name=col)
+        else:
+            cols[col] = pd.concat(parts, ignore_index=True)
+        del parts
+    return pd.DataFrame(cols)
+
+def load_csv_chunked(
+    src,
+    chunk_rows: int = CHUNK_ROWS,
+    use_arrow: bool = False,
+    on_progress=None,
+) -> pd.DataFrame:
+    """Read a CSV in chunks with dtypes pinned from the first chunk.
+
+    Low-cardinality string columns are parsed straight into ``category``,
+    integers are downcast and, with ``use_arrow``, remaining strings are
+    Arrow-backed. ``on_progress`` receives the fraction of bytes consumed.
+    Peak memory stays around twice the final frame (chunks + concat).
+    """
+    use_arrow = use_arrow and HAS_ARROW
+    total = _source_size(src)
+    handle = open(src, "rb") if isinstance(src, (str, os.PathLike)) else src
+    try:
+        sniff = pd.read_csv(handle, nrows=chunk_rows)
+        pinned = _pin_dtypes(sniff, use_arrow)
+        del sniff
+        handle.seek(0)
+        reader = pd.read_csv(handle, chunksize=chunk_rows, dtype=pinned)
+        chunks = []
+        for chunk in reader:
+            chunks.append(_compact_chunk(chunk, pinned))
+            if on_progress and total:
+                on_progress(min(handle.tell() / total, 1.0))
+        if on_progress:
+            on_progress(1.0)
+        return _concat_chunks(chunks) if chunks else pd.DataFrame()
+    finally:
+        if handle is not src:
+            handle.close()
+
+# ---------- memory compaction -----------------------------------------------
+_COMPACT_CATEGORY_RATIO = 0.5
+
+def _is_text(s: pd.Series) -> bool:
+    return pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)
+
+def compact_series(s: pd.Series) -> pd.Series:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s
+    if pd.api.types.is_bool_dtype(s):
+        return s
+    if pd.api.types.is_integer_dtype(s):
+        return pd.to_numeric(s, downcast="integer")
+    if pd.api.types.is_float_dtype(s):
+        small = pd.to_numeric(s, downcast="float")
+        # only keep float32 when it round-trips exactly (lat/long would not)
+        if small.dtype != s.dtype and not small.astype(s.dtype).equals(s):
+            return s
+        return small
+    if _is_text(s):
+        non_null = s.dropna()
+        if len(non_null) and non_null.map(type).isin([bool, np.bool_]).all():
+            return s.astype("boolean")
+        if s.nunique(dropna=True) <= max(1, len(s) * _COMPACT_CATEGORY_RATIO):
+            return s.astype("category")
+    return s
+
+def compact_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Downcast numerics, categorise low-cardinality text, use nullable bools.
+
+    Returns the compacted frame and a per-column report of bytes saved.
+    """
+    out = df.copy(deep=False)
+    rows = []
+    for col in df.columns:
+        before = df[col]
+        after = compact_series(before)
+        out[col] = after
+        b0 = int(before.memory_usage(index=False, deep=True))
+        b1 = int(after.memory_usage(index=False, deep=True)) if after is not before else b0
+        rows.append({
+            "Column": col,
+            "From": str(before.dtype),
+            "To": str(after.dtype),
+            "Bytes before": b0,
+            "Bytes after": b1,
+            "Saved": b0 - b1,
+        })
+    return out, pd.DataFrame(rows)
+
 def standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    # returns ``df`` itself when already normalised, else a view sharing data
+    cols = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    if cols == list(df.columns):
+        return df
+    df = df.copy(deep=False)
+    df.columns = cols
     return df
 
 _EMPTY_TOKENS = {"n/a", "unknown", "", " "}
 
-def _is_pseudo_empty(row, threshold: float) -> bool:
-    empty = sum(
-        1
-        for v in row
-        if pd.isna(v) or (isinstance(v, str) and v.strip().lower() in _EMPTY_TOKENS)
+def _empty_cells(s: pd.Series) -> np.ndarray:
+    mask = s.isna().to_numpy()
+    if not (
+        pd.api.types.is_object_dtype(s)
+        or pd.api.types.is_string_dtype(s)
+        or isinstance(s.dtype, pd.CategoricalDtype)
+    ):
+        return mask
+    # test the tokens once per distinct value instead of once per cell
+    codes, uniques = pd.factorize(s)
+    if len(uniques) == 0:
+        return mask
+    hit = np.fromiter(
+        (isinstance(v, str) and v.strip().lower() in _EMPTY_TOKENS for v in uniques),
+        dtype=bool,
+        count=len(uniques),
     )
-    return empty / len(row) >= threshold
+    return mask | ((codes >= 0) & hit[codes])
+
+def pseudo_empty_mask(df: pd.DataFrame, threshold: float = 0.8) -> np.ndarray:
+    empty = np.zeros(len(df), dtype=np.int64)
+    for i in range(df.shape[1]):
+        empty += _empty_cells(df.iloc[:, i])
+    return empty / df.shape[1] >= threshold
 
 def drop_pseudo_empty(df: pd.DataFrame, threshold: float = 0.8) -> pd.DataFrame:
-    return df[~df.apply(_is_pseudo_empty, axis=1, threshold=threshold)].copy()
+    if df.shape[1] == 0:
+        return df.copy()
+    return df[~pseudo_empty_mask(df, threshold)].copy()
+
+_FILL_VALUES = {
+    "Numeric": 0,
+    "Bool": False,
+    "Category": "Unknown",
+    "ID": "Unknown",
+    "Datetime": pd.NaT,
+}
+
+def fill_missing_series(s: pd.Series, t: str | None) -> pd.Series:
+    s = s.replace(list(_EMPTY_TOKENS), pd.NA)
+    if t not in _FILL_VALUES:
+        return s
+    fill = _FILL_VALUES[t]
+    if (
+        isinstance(s.dtype, pd.CategoricalDtype)
+        and t != "Datetime"
+        and fill not in s.cat.categories
+        and s.isna().any()
+    ):
+        s = s.cat.add_categories([fill])
+    return s.fillna(fill)
 
 def fill_missing_by_type(df: pd.DataFrame, type_map: dict) -> pd.DataFrame:
-    df = df.copy()
-    df.replace(list(_EMPTY_TOKENS), pd.NA, inplace=True)
+    df = df.copy(deep=False)
+    for col in df.columns:
+        df[col] = fill_missing_series(df[col], type_map.get(col))
+    return df
+
+def ensure_type(s: pd.Series, t: str | None) -> pd.Series:
+    if t == "Datetime":
+        if not pd.api.types.is_datetime64_any_dtype(s):
+            return pd.to_datetime(s, errors="coerce")
+    elif t == "Bool":
+        return (
+            s.astype(str)
+            .str.upper()
+            .map({"Y": True, "N": False, "TRUE": True, "FALSE": False})
+            .astype("boolean")
+        )
+    elif t == "Category":
+        return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    elif t == "ID":
+        return s.astype("string")
+    elif t == "Numeric":
+        if not pd.api.types.is_numeric_dtype(s):
+            return pd.to_numeric(s, errors="coerce")
+    return s
+
+def ensure_types(df: pd.DataFrame, type_map: dict) -> pd.DataFrame:
+    df = df.copy(deep=False)
     for col, t in type_map.items():
-        if col not in df:
-            continue
-        if t == "Numeric":
-            df[col] = df[col].fillna(0)
-        elif t == "Bool":
-            df[col] = df[col].fillna(False)
-        elif t in {"Category", "ID"}:
-            df[col] = df[col].fillna("Unknown")
-        elif t == "Datetime":
-            df[col] = df[col].fillna(pd.NaT)
+        if col in df:
+            df[col] = ensure_type(df[col], t)
     return df
 
-def _try_parse_dt(series: pd.Series, fmt: str) -> bool:
-    return pd.to_datetime(series, format=fmt, errors="coerce").notna().mean() > 0.8
+# id(frame) -> (weak reference, digest); the reference tells a live frame
+# from a new one that reuses a collected frame's id
+_fingerprints: dict = {}
 
-def infer_column_types(df: pd.DataFrame, sample_n: int = 1000) -> dict:
-    sample = df.head(sample_n)
-    res = {}
-    for col in df.columns:
-        s = sample[col].dropna()
-        if s.empty:
-            res[col] = None
-            continue
-        if _try_parse_dt(s, "%m/%d/%Y %I:%M:%S %p"):
-            res[col] = "Datetime"
-        elif pd.api.types.is_bool_dtype(s):
-            res[col] = "Bool"
-        elif pd.api.types.is_numeric_dtype(s):
-            res[col] = "Numeric"
-        else:
-            res[col] = None
-    return res
+def _forget_fingerprint(ref, key):
+    entry = _fingerprints.get(key)
+    if entry is not None and entry[0] is ref:
+        _fingerprints.pop(key, None)
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of shape, schema and every row, computed once per frame object.
+
+    Frames are treated as immutable once fingerprinted, as the caches keyed
+    on this already assume."""
+    key = id(df)
+    entry = _fingerprints.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((df.shape, list(df.columns), [str(t) for t in df.dtypes])).encode())
+    if len(df):
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest = h.hexdigest()
+    ref = weakref.ref(df, lambda r, k=key: _forget_fingerprint(r, k))
+    _fingerprints[key] = (ref, digest)
+    return digest
 
 def drop_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop_duplicates()
@@ -73,8 +296,8 @@ def parse_time_for_spmf(
     df: pd.DataFrame, datetime_col: str, fmt: str = "%m/%d/%Y %I:%M:%S %p"
 ) -> pd.DataFrame:
     df = df.copy()
-    df[datetime_col] = pd.to_datetime(df[datetime_col], format=fmt, errors="coerce")
-    df["dategroup"] = df[datetime_col].dt.strftime("%Y%m%d")
+    df[datetime_col] = parse_datetime(df[datetime_col], fmt)
+    df["dategroup"] = day_number(df[datetime_col])
     return df
 
 def discretize_fields(df: pd.DataFrame, bins_config: dict) -> pd.DataFrame:
@@ -82,54 +305,40 @@ def discretize_fields(df: pd.DataFrame, bins_config: dict) -> pd.DataFrame:
     for col, cfg in bins_config.items():
         if col not in df:
             continue
+        # the base data can hold numbers as text
         df[f"{col}_bin"] = pd.cut(
-            df[col], bins=cfg["bins"], labels=cfg["labels"], include_lowest=True
+            ensure_type(df[col], "Numeric"), bins=cfg["bins"], labels=cfg["labels"], include_lowest=True
         )
     return df
 
 def build_spmf_dictionary(df: pd.DataFrame, item_cols: list):
-    item2id = {}
-    data = []
-    next_id = 1
-    for col in item_cols:
-        for val in sorted(df[col].dropna().unique()):
-            item2id[(col, val)] = next_id
-            data.append({"Column": col, "Value": val, "ID": next_id})
-            next_id += 1
-    return pd.DataFrame(data), item2id
-
-def _tmp_path() -> str:
-    os.makedirs("tmp_spmf", exist_ok=True)
-    return os.path.join("tmp_spmf", f"{uuid.uuid4().hex}.txt")
+    encoder = ItemEncoder.fit(df, item_cols)
+    return encoder.to_frame(), encoder
 
 def write_spmf_file(
-    df: pd.DataFrame, item_cols: list, item2id: dict, path: str | None = None
+    df: pd.DataFrame, item_cols: list, encoder: ItemEncoder, path: str | None = None
 ) -> str:
-    path = path or _tmp_path()
-    with open(path, "w", encoding="utf-8") as f:
-        for _, grp in df.groupby("groupid"):
-            seq = []
-            for _, row in grp.iterrows():
-                ids = [
-                    str(item2id[(c, row[c])])
-                    for c in item_cols
-                    if (c, row[c]) in item2id
-                ]
-                if ids:
-                    seq.append(" ".join(ids))
-            if seq:
-                f.write(" -1 ".join(seq) + " -2\n")
-    return path
+    if path is None:
+        return SequenceDB.from_frame(df, item_cols, encoder).save()
+    return write_sequences(df, item_cols, encoder, path)
 
 def spmf_to_dataframe(path: str) -> pd.DataFrame:
-    rows = []
-    with open(path, encoding="utf-8") as f:
-        for sid, line in enumerate(f, 1):
-            parts = line.strip().split(" -2")[0].split(" -1 ")
-            row = {"Sequence ID": sid}
-            row.update({f"Itemset {i+1}": p for i, p in enumerate(parts)})
-            rows.append(row)
-    return pd.DataFrame(rows)
-
-def write_transaction_file(df, item_cols, item2id, path=None):
-    return _wt_file(df, item_cols, item2id)
\ No newline at end of file
+    return SequenceDB.from_spmf(path).to_frame()
+
+def build_sequence_db(
+    df: pd.DataFrame, item_cols: list, encoder: ItemEncoder, time_col: str | None = None
+) -> SequenceDB:
+    return SequenceDB.from_frame(df, item_cols, encoder, time_col=time_col)
+
+def build_transaction_db(df: pd.DataFrame, item_cols: list, encoder: ItemEncoder) -> SequenceDB:
+    return SequenceDB.from_transactions(df, item_cols, encoder)
+
+def write_sequence_db(db: SequenceDB, path: str | None = None, workers: int = 1) -> str:
+    """Write ``db`` to ``path``, or to the artifact store when no path is given."""
+    write = (lambda p: write_parallel(db, p, workers)) if workers > 1 else db.to_spmf
+    return db.save(write) if path is None else write(path)
+
+def write_transaction_file(df, item_cols, encoder, path=None):
+    if path is None:
+        return _wt_file(df, item_cols, encoder)
+    return SequenceDB.from_transactions(df, item_cols, encoder).to_spmf(path)
\ No newline at end of file
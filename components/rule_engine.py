@@ -0,0 +1,104 @@
+# components/rule_engine.py
+#
+# Rule Builder evaluation shared by the preview and the save path. Each rule
+# becomes a boolean mask (cached per frame fingerprint) and all masks are
+# combined in one np.select pass; later rules take precedence, as before.
+
+import operator
+import numpy as np
+import pandas as pd
+import components.data_ops as ops
+from components.cache import LRUCache
+
+PREVIEW_ROWS = 5
+MASK_CACHE_BYTES = 256 * 1024 ** 2
+
+_COMPARE = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_masks = LRUCache(MASK_CACHE_BYTES)
+
+
+def _cast_value(series: pd.Series, raw: str | float):
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            return float(raw)
+        except ValueError:
+            return np.nan
+    return raw
+
+
+def compile_rules(cfg: dict) -> list[tuple]:
+    return [
+        (r["col"], r["op"], r["val"], r["label"])
+        for r in (cfg or {}).get("rules", [])
+        if r["col"]
+    ]
+
+
+def _compare_categorical(s: pd.Series, op: str, raw) -> np.ndarray:
+    # unordered categoricals only support == and !=: compare the categories
+    # as plain values and look every row up by its code; missing rows are
+    # unequal to anything, like the string columns Category used to be
+    cats = pd.Series(s.cat.categories)
+    hit = np.asarray(_COMPARE[op](cats, _cast_value(cats, raw)), dtype=bool)
+    codes = s.cat.codes.to_numpy()
+    return np.where(codes >= 0, hit[codes], op == "!=")
+
+
+def _evaluate(s: pd.Series, op: str, raw) -> np.ndarray:
+    if op == "contains":
+        mask = s.astype(str).str.contains(str(raw), case=False, na=False)
+    elif isinstance(s.dtype, pd.CategoricalDtype):
+        mask = _compare_categorical(s, op, raw)
+    else:
+        mask = _COMPARE[op](s, _cast_value(s, raw))
+    return np.asarray(mask, dtype=bool)
+
+
+def rules_key(cfg: dict | None) -> tuple | None:
+    if not cfg or not cfg.get("rules"):
+        return None
+    compiled = tuple((c, op, repr(raw), lab) for c, op, raw, lab in compile_rules(cfg))
+    return compiled, cfg["default"], cfg["new_name"]
+
+
+def rule_mask(df: pd.DataFrame, rule: tuple, fingerprint: str | None = None) -> np.ndarray:
+    col, op, raw, _ = rule
+    key = (fingerprint or ops.frame_fingerprint(df), col, op, repr(raw))
+    mask = _masks.get(key)
+    if mask is None:
+        mask = _masks.put(key, _evaluate(df[col], op, raw))
+    return mask
+
+
+def evaluate_rules(df: pd.DataFrame, cfg: dict) -> pd.Series:
+    rules = compile_rules(cfg)
+    fp = ops.frame_fingerprint(df)
+    masks = [rule_mask(df, r, fp) for r in rules]
+    if not masks:
+        return pd.Series(cfg["default"], index=df.index, name=cfg["new_name"])
+    labels = np.select(
+        masks[::-1],
+        [np.array(r[3], dtype=object) for r in rules[::-1]],
+        default=np.array(cfg["default"], dtype=object),
+    )
+    return pd.Series(labels, index=df.index, name=cfg["new_name"])
+
+
+def apply_rules(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+    if not cfg or not cfg.get("rules"):
+        return df
+    df = df.copy(deep=False)
+    df[cfg["new_name"]] = evaluate_rules(df, cfg)
+    return df
+
+
+def preview_rules(df: pd.DataFrame, cfg: dict, n: int = PREVIEW_ROWS) -> pd.DataFrame:
+    return evaluate_rules(df.head(n), cfg).to_frame()
@@ -1,9 +1,14 @@
 # components/sidebar/algorithm.py
 
+import plotly.express as px
 import streamlit as st
 import components.state_manager as state
 import components.spmf.algorithm_registry as registry
 import components.spmf.spmf_executor as executor
+import components.spmf.job_manager as jobs
+import components.spmf.param_sweep as sweep
+import components.spmf.prefixspan as prefixspan
+from components.spmf.item_encoder import ItemEncoder
 from components.spmf.spmf_parser import (
     parse_spmf_output,
     parse_to_dataframe,
@@ -45,6 +50,210 @@ def _ui_param_input(param_name: str):
     return st.text_input(param_name)
 
 
+_BACKEND_LABELS = {"spmf": "SPMF (Java)", "numpy": "NumPy (no Java)"}
+_NATIVE_MEMORY_HELP = (
+    "NumPy runs share the server's memory and report none of their own; "
+    f"they stop after {prefixspan.MAX_PATTERNS:,} patterns instead."
+)
+
+JOBS_KEY = "spmf_jobs"
+JOB_REFRESH_SECONDS = 1.0
+
+
+def _store_results(file_key: str, algo_cat: str, df_raw):
+    state.set("spmf_output_data", df_raw)
+    out_key = f"{file_key}_output"
+    state.set(out_key, df_raw)
+    state.add_dynamic_data_key(out_key, "spmf")
+
+    dict_df = state.get(file_key.replace("_file", "_dict"))
+
+    if algo_cat == "seq":
+        patterns = parse_spmf_output(df_raw, dict_df)
+        summary = parse_to_dataframe(patterns)
+
+        patterns_key = file_key.replace("_file", "_patterns")
+        state.set(patterns_key, patterns)
+        state.add_dynamic_data_key(patterns_key, "spmf")
+    else:  # rule category
+        summary = df_raw
+
+    summary_key = file_key.replace("_file", "_summary")
+    state.set(summary_key, summary)
+    state.add_dynamic_data_key(summary_key, "normal")
+
+    pruned = df_raw.attrs.get("pruned_items", [])
+    if pruned and dict_df is not None:
+        names = ItemEncoder.from_frame(dict_df).labels(pruned)
+        return f"Pruned {len(pruned)} infrequent item(s): " + ", ".join(names)
+    return None
+
+
+def _render_jobs():
+    entries = st.session_state.get(JOBS_KEY, [])
+    if not entries:
+        return
+    st.markdown("#### Jobs")
+    changed, keep = False, []
+    for entry in entries:
+        job = jobs.manager.get(entry["id"])
+        if job is None:
+            continue
+        if job.status == jobs.DONE:
+            try:
+                note = _store_results(entry["file_key"], entry["algo_cat"], job.result)
+                st.toast(f"{job.algo_name} finished - results saved.")
+                if note:
+                    st.toast(note)
+            except Exception as err:
+                st.toast(f"Saving {job.algo_name} results failed: {err}")
+            jobs.manager.forget(job.id)
+            changed = True
+            continue
+        if not job.active and not entry.get("reported"):
+            entry["reported"] = changed = True
+        keep.append(entry)
+    st.session_state[JOBS_KEY] = keep
+
+    for entry in keep:
+        job = jobs.manager.get(entry["id"])
+        c1, c2 = st.columns([4, 1])
+        info = job.summary()
+        c1.caption(
+            f"`{info['Job']}` {info['Algorithm']} - **{info['Status']}** - "
+            f"{info['Elapsed (s)']:,.1f} s - output {info['Output (MB)']:,.2f} MB - "
+            f"peak {info['Peak memory (MB)']:,.0f} MB"
+        )
+        if job.active:
+            if c2.button("Cancel", key=f"job_cancel_{job.id}"):
+                job.cancel()
+        else:
+            if job.error:
+                c1.error(f"SPMF execution failed: {job.error}")
+            if c2.button("Dismiss", key=f"job_dismiss_{job.id}"):
+                jobs.manager.forget(job.id)
+                st.session_state[JOBS_KEY] = [e for e in keep if e["id"] != job.id]
+                st.rerun()
+    if changed:
+        # a full rerun shows the results and stops the refresh timer
+        st.rerun()
+
+
+
+SWEEP_KEY = "spmf_sweep"
+_SWEEP_DEFAULTS = {
+    "min_support": "0.05:0.5:10",
+    "max_support": "0.5:1:6",
+    "min_conf": "0.5:0.95:10",
+    "max_pattern_length": "1, 2, 3, 5, 10",
+    "top_k": "5, 10, 20, 50, 100",
+    "k": "5, 10, 20, 50, 100",
+}
+_SWEEP_METRICS = ["Patterns", "Runtime (s)", "Peak memory (MB)"]
+
+
+def _sweep_figure(frame, param: str):
+    long = frame.melt(
+        id_vars=param, value_vars=_SWEEP_METRICS, var_name="Metric", value_name="Value"
+    ).dropna(subset=["Value"])
+    fig = px.line(long, x=param, y="Value", facet_row="Metric", markers=True, height=600)
+    fig.update_yaxes(matches=None, title_text="")
+    fig.for_each_annotation(lambda a: a.update(text=a.text.split("=", 1)[-1]))
+    return fig
+
+
+def _render_sweep_progress():
+    result = st.session_state[SWEEP_KEY]
+    done, total = sweep.progress(result["sweep"])
+    c1, c2 = st.columns([4, 1])
+    c1.progress(done / total, text=f"Sweeping: {done}/{total} runs")
+    if c2.button("Cancel", key="algo_sweep_cancel"):
+        sweep.cancel(result["sweep"])
+    if done == total:
+        # a full rerun shows the curves and stops the refresh timer
+        result["frame"] = sweep.frame(result["sweep"])
+        st.rerun()
+
+
+def _render_sweep(
+    file_key: str, algo_name: str, algo_cat: str, in_path: str, params: dict, prune: bool,
+    backend: str,
+):
+    options = sweep.sweepable(algo_name)
+    if not options or not st.checkbox(
+        "Sweep a parameter",
+        key="algo_sweep",
+        help="Run the algorithm at several values of one parameter as background "
+             "jobs and plot pattern count, runtime and memory against it.",
+    ):
+        return
+    param = st.selectbox("Parameter", options, key="algo_sweep_param")
+    text = st.text_input(
+        "Values",
+        _SWEEP_DEFAULTS[param],
+        key=f"algo_sweep_values_{param}",
+        help="Comma-separated values, or start:stop:count for evenly spaced ones.",
+    )
+    c1, c2 = st.columns(2)
+    timeout_min = c1.number_input(
+        "Time limit per run (min)", 1, 24 * 60, jobs.DEFAULT_TIMEOUT // 60,
+        key="algo_sweep_timeout",
+    )
+    memory_mb = c2.number_input(
+        "Memory limit per run (MB)", 256, 256 * 1024, jobs.DEFAULT_MEMORY_MB, 256,
+        key="algo_sweep_memory", disabled=backend != "spmf",
+        help=_NATIVE_MEMORY_HELP if backend != "spmf" else None,
+    )
+    db = state.get(file_key.replace("_file", "_db"))
+
+    if st.button("Run sweep"):
+        try:
+            values = sweep.parse_values(text, param)
+        except ValueError as err:
+            st.error(f"Invalid values: {err}")
+        else:
+            previous = st.session_state.get(SWEEP_KEY)
+            if previous and previous["frame"] is None:
+                sweep.cancel(previous["sweep"])
+            runs = sweep.start_sweep(
+                algo_name, in_path, params, param, values, db=db, prune=prune,
+                dictionary=state.get("spmf_dictionary"), backend=backend,
+                timeout=float(timeout_min) * 60, memory_mb=int(memory_mb),
+            )
+            st.session_state[SWEEP_KEY] = {
+                "file_key": file_key, "algo_name": algo_name, "param": param,
+                "params": params, "prune": prune, "backend": backend, "sweep": runs,
+                "frame": None if sweep.active(runs) else sweep.frame(runs),
+            }
+
+    result = st.session_state.get(SWEEP_KEY)
+    if not result or result["file_key"] != file_key or result["algo_name"] != algo_name:
+        return
+    if result["frame"] is None:
+        st.fragment(run_every=JOB_REFRESH_SECONDS)(_render_sweep_progress)()
+        return
+    frame, param = result["frame"], result["param"]
+    st.plotly_chart(_sweep_figure(frame, param), use_container_width=True)
+    st.dataframe(frame, hide_index=True)
+
+    ok = frame.loc[frame["Error"].isna(), param].tolist()
+    if not ok:
+        return
+    value = st.selectbox(f"Keep results for {param}", ok, key="algo_sweep_pick")
+    if st.button("Load results"):
+        try:
+            df_raw = executor.run_spmf(
+                algo_name, in_path, dict(result["params"], **{param: value}),
+                db=db, prune=result["prune"], backend=result["backend"],
+            )
+            note = _store_results(file_key, algo_cat, df_raw)
+            st.success(f"Results for {param} = {value} saved.")
+            if note:
+                st.caption(note)
+        except Exception as err:
+            st.error(f"SPMF execution failed: {err}")
+
+
 def render_algorithm_panel():
     state.init_state()
     with st.expander("📌 Algorithm Runner", expanded=False):
@@ -85,31 +294,101 @@ def render_algorithm_panel():
             for p in registry.get_algorithm_parameters(algo_name)
         }
 
-        if st.button("Run"):
-            with st.spinner("Running..."):
-                try:
-                    df_raw = executor.run_spmf(algo_name, in_path, params)
-
-                    out_key = f"{file_key}_output"
-                    state.set(out_key, df_raw)
-                    state.add_dynamic_data_key(out_key, "spmf")
+        backends = registry.get_algorithm_backends(algo_name)
+        backend = "spmf"
+        if len(backends) > 1:
+            backend = st.radio(
+                "Backend",
+                backends,
+                format_func=_BACKEND_LABELS.get,
+                horizontal=True,
+                key="algo_backend",
+                help="NumPy mines in process, without Java or SPMF files; it is "
+                     "quicker on small and medium inputs.",
+            )
+        native = backend != "spmf"
 
-                    dict_df = state.get(file_key.replace("_file", "_dict"))
+        prune = st.checkbox(
+            "Prune infrequent items",
+            value=True,
+            key="algo_prune",
+            help="Drop items below min_support from the input before mining; "
+                 "results are unchanged.",
+        )
+        use_cache = st.checkbox(
+            "Reuse cached results",
+            value=True,
+            key="algo_use_cache",
+            help="Answer a run seen before (same input, algorithm, parameters "
+                 "and SPMF jar) from the on-disk result cache.",
+        )
 
-                    if algo_cat == "seq":
-                        patterns = parse_spmf_output(df_raw, dict_df)
-                        summary = parse_to_dataframe(patterns)
+        background = st.checkbox(
+            "Run in background",
+            value=True,
+            key="algo_background",
+            help="Queue the run so the page stays usable; it can be cancelled "
+                 "and is stopped at the limits below.",
+        )
+        use_worker = st.checkbox(
+            "Keep SPMF warm between runs",
+            value=True,
+            key="algo_use_worker",
+            disabled=background,
+            help="Run jobs on a long-lived Java worker instead of starting "
+                 "a new JVM each time. Background runs always get their own "
+                 "JVM so they can be limited and cancelled.",
+        )
+        if background:
+            if not native:
+                # background is the default so long runs stay limited and
+                # cancellable; quick repeated runs are faster on the warm worker
+                st.caption(
+                    "Background runs start a new JVM each time. Untick "
+                    "\"Run in background\" to reuse the warm worker for quick runs."
+                )
+            c1, c2 = st.columns(2)
+            timeout_min = c1.number_input(
+                "Time limit (min)", 1, 24 * 60, jobs.DEFAULT_TIMEOUT // 60, key="algo_timeout"
+            )
+            memory_mb = c2.number_input(
+                "Memory limit (MB)", 256, 256 * 1024, jobs.DEFAULT_MEMORY_MB, 256,
+                key="algo_memory", disabled=native,
+                help=_NATIVE_MEMORY_HELP if native else None,
+            )
 
-                        patterns_key = file_key.replace("_file", "_patterns")
-                        state.set(patterns_key, patterns)
-                        state.add_dynamic_data_key(patterns_key, "spmf")
-                    else:  # rule category
-                        summary = df_raw
+        if st.button("Run"):
+            db = state.get(file_key.replace("_file", "_db"))
+            if background:
+                job = jobs.manager.submit(
+                    algo_name, in_path, params, db=db, prune=prune, cache=use_cache,
+                    dictionary=state.get("spmf_dictionary"), backend=backend,
+                    timeout=float(timeout_min) * 60, memory_mb=int(memory_mb),
+                )
+                st.session_state.setdefault(JOBS_KEY, []).append(
+                    {"id": job.id, "file_key": file_key, "algo_cat": algo_cat}
+                )
+            else:
+                with st.spinner("Running..."):
+                    try:
+                        df_raw = executor.run_spmf(
+                            algo_name, in_path, params, db=db, prune=prune,
+                            use_worker=use_worker, cache=use_cache, backend=backend,
+                        )
+                        note = _store_results(file_key, algo_cat, df_raw)
+                        if df_raw.attrs.get("cached"):
+                            st.success("Loaded from the result cache - results saved.")
+                        else:
+                            st.success("Algorithm completed - results saved.")
+                        if note:
+                            st.caption(note)
+                    except Exception as err:
+                        st.error(f"SPMF execution failed: {err}")
 
-                    summary_key = file_key.replace("_file", "_summary")
-                    state.set(summary_key, summary)
-                    state.add_dynamic_data_key(summary_key, "normal")
+        _render_sweep(file_key, algo_name, algo_cat, in_path, params, prune, backend)
 
-                    st.success("Algorithm completed - results saved.")
-                except Exception as err:
-                    st.error(f"SPMF execution failed: {err}")
\ No newline at end of file
+        running = any(
+            (job := jobs.manager.get(e["id"])) is not None and job.active
+            for e in st.session_state.get(JOBS_KEY, [])
+        )
+        st.fragment(run_every=JOB_REFRESH_SECONDS if running else None)(_render_jobs)()
\ No newline at end of file
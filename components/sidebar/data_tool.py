@@ -1,79 +1,44 @@
 # components/sidebar/data_tool.py
 # components/sidebar/data_tool.py
 
+import os
 import streamlit as st
 import pandas as pd
-import numpy as np
 import components.state_manager as state
 import components.data_ops as ops
+from components.clean_pipeline import clean_cached
+import components.rule_engine as rules
+import components.type_inference as inference
+from components.sidebar.memory_report import render_compaction_report
+from components.version_store import DatasetVersion, create_version
+import components.spmf.spmf_preview as spmf_preview
+from components.spmf.item_encoder import ItemEncoder
 
 
-def _ensure_types(df: pd.DataFrame, type_map: dict) -> pd.DataFrame:
-    df = df.copy()
-    for col, t in type_map.items():
-        if col not in df:
-            continue
-        if t == "Datetime":
-            if not pd.api.types.is_datetime64_any_dtype(df[col]):
-                df[col] = pd.to_datetime(df[col], errors="coerce")
-        elif t == "Bool":
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.upper()
-                .map({"Y": True, "N": False, "TRUE": True, "FALSE": False})
-                .astype("boolean")
-            )
-        elif t in {"Category", "ID"}:
-            df[col] = df[col].astype("string")
-    return df
-
-
-def _clean_dataframe(df: pd.DataFrame, params: dict) -> pd.DataFrame:
-    df2 = df.copy()
-    if params["drop_pe"]:
-        df2 = ops.drop_pseudo_empty(df2, params["pe_thresh"])
-    if params["fill_type"]:
-        df2 = ops.fill_missing_by_type(df2, params["type_map"])
-    df2 = _ensure_types(df2, params["type_map"])
-    if params["select_cols"]:
-        df2 = df2[params["keep_cols"]]
-    if params["filter_rows"]:
-        fc, op, val = params["filter_col"], params["filter_op"], params["filter_val"]
-        try:
-            cv = float(val) if op in [">", ">=", "<", "<="] else val
-            df2 = df2.query(f"`{fc}` {op} @cv")
-        except Exception:
-            st.warning("Filter expression failed")
-    if params["drop_dup"]:
-        df2 = ops.drop_duplicates(df2)
-    if params["drop_null"]:
-        vals = []
-        if "NaN" in params["null_types"]:
-            vals.append(pd.NA)
-        if "UNKNOWN" in params["null_types"]:
-            vals.append("UNKNOWN")
-        vals += [x.strip() for x in params["custom_nulls"].split(",") if x.strip()]
-        df2 = df2.replace(vals, pd.NA)
-        df2 = ops.drop_nulls(df2)
-    return df2
+def _clean_dataframe(df: pd.DataFrame, params: dict, rb_cfg: dict | None = None) -> pd.DataFrame:
+    return clean_cached(df, params, rb_cfg, on_warning=st.warning)
 
 
 def _next_key(base: str) -> str:
     idx = 1
-    while state.get(f"{base}_cleaned_v{idx}") is not None:
+    while state.get_raw(f"{base}_cleaned_v{idx}") is not None:
         idx += 1
     return f"{base}_cleaned_v{idx}"
 
 
-def _cast_value(series: pd.Series, raw: str | float):
-    if pd.api.types.is_numeric_dtype(series):
-        try:
-            return float(raw)
-        except ValueError:
-            return np.nan
-    return raw
-
+def _render_spmf_preview(preview):
+    path, dict_df = preview["path"], preview["dict"]
+    st.dataframe(dict_df.head(10000), use_container_width=True)
+    st.dataframe(pd.DataFrame([preview["stats"]]), hide_index=True, use_container_width=True)
+    pages = spmf_preview.page_count(path)
+    c1, c2 = st.columns([1, 1])
+    page = c1.number_input(f"Page (of {pages:,})", 1, pages, key="spmf_preview_page")
+    show_labels = c2.checkbox("Show item labels", key="spmf_preview_labels")
+    labels = ItemEncoder.from_frame(dict_df).label_table() if show_labels else None
+    st.dataframe(
+        spmf_preview.read_page(path, int(page) - 1, labels=labels),
+        hide_index=True, use_container_width=True,
+    )
 
 def render_data_tool():
     state.init_state()
@@ -95,8 +60,9 @@ def render_data_tool():
             return
         df_src = ops.standardize_columns(df_src)
 
+        inferred = inference.infer_column_types(df_src)
         if "col_types" not in st.session_state:
-            st.session_state["col_types"] = ops.infer_column_types(df_src)
+            st.session_state["col_types"] = dict(inferred)
 
         tabs = st.tabs(["Types", "Clean", "SPMF"])
 
@@ -106,16 +72,16 @@ def render_data_tool():
             groups = ["ID", "Numeric", "Datetime", "Bool", "Category"]
 
             if "type_sel" not in st.session_state:
-                inf = ops.infer_column_types(df_src)
+                inf = inferred
                 st.session_state.type_sel = {
                     "ID": [],
-                    "Numeric": [],
+                    "Numeric": [c for c, t in inf.items() if t == "Numeric"],
                     "Datetime": [c for c, t in inf.items() if t == "Datetime"],
                     "Bool": [c for c, t in inf.items() if t == "Bool"],
                     "Category": [
                         c
                         for c in cols
-                        if c not in inf or inf.get(c) not in {"Datetime", "Bool"}
+                        if c not in inf or inf.get(c) not in {"Datetime", "Bool", "Numeric"}
                     ],
                 }
 
@@ -229,25 +195,8 @@ def render_data_tool():
                 }
 
                 if st.button("Preview rule result", key="rb_prev"):
-                    def _apply(df, cfg):
-                        df = df.copy()
-                        df[cfg["new_name"]] = cfg["default"]
-                        for rule in cfg["rules"]:
-                            if not rule["col"]:
-                                continue
-                            c, op, raw, lab = rule["col"], rule["op"], rule["val"], rule["label"]
-                            if op == "contains":
-                                mask = df[c].astype(str).str.contains(
-                                    str(raw), case=False, na=False
-                                )
-                            else:
-                                val = _cast_value(df[c], raw)
-                                mask = df.eval(f'`{c}` {op} @val')
-                            df.loc[mask, cfg["new_name"]] = lab
-                        return df
-
                     st.dataframe(
-                        _apply(df_src, rb_cfg)[[rb_cfg["new_name"]]].head(),
+                        rules.preview_rules(df_src, rb_cfg),
                         use_container_width=True,
                     )
 
@@ -273,37 +222,27 @@ def render_data_tool():
                 type_map=tm,
             )
 
-            def apply_rules(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
-                if not cfg or not cfg.get("rules"):
-                    return df
-                df = df.copy()
-                new = cfg["new_name"]
-                df[new] = cfg["default"]
-                for r in cfg["rules"]:
-                    if not r["col"]:
-                        continue
-                    col, op, raw_val, lab = r["col"], r["op"], r["val"], r["label"]
-                    if op == "contains":
-                        mask = df[col].astype(str).str.contains(
-                            str(raw_val), case=False, na=False
-                        )
-                    else:
-                        val = _cast_value(df[col], raw_val)
-                        mask = df.eval(f'`{col}` {op} @val')
-                    df.loc[mask, new] = lab
-                st.session_state["col_types"][new] = "Category"
-                return df
-
             if preview or save:
-                cleaned = _clean_dataframe(df_src, params)
-                if enable_rb:
-                    cleaned = apply_rules(cleaned, rb_cfg)
+                rb_active = rb_cfg if enable_rb and rb_cfg.get("rules") else None
+                cleaned = _clean_dataframe(df_src, params, rb_active)
+                if rb_active:
+                    st.session_state["col_types"][rb_cfg["new_name"]] = "Category"
                 st.dataframe(cleaned.head(10), use_container_width=True)
 
                 if save:
-                    state.set(save_key, cleaned)
+                    cleaned, report = ops.compact_frame(cleaned)
+                    render_compaction_report(report)
+                    parent = state.get_raw(source_key)
+                    if not isinstance(parent, DatasetVersion):
+                        parent = DatasetVersion.root(df_src)
+                    version = create_version(parent, cleaned)
+                    state.set(save_key, version)
                     state.add_dynamic_data_key(save_key, "normal")
-                    st.success(f"Saved `{save_key}`")
+                    st.success(
+                        f"Saved `{save_key}` "
+                        f"({len(version.changed)} changed columns, "
+                        f"{version.nbytes / 1024 ** 2:,.1f} MB stored)"
+                    )
                     st.download_button(
                         "Download cleaned CSV",
                         cleaned.to_csv(index=False).encode("utf-8"),
@@ -323,6 +262,7 @@ def render_data_tool():
 
             base_key = st.selectbox("Base data", normal_keys)
             df0 = base_df if base_key == "base_data" else state.get(base_key)
+            df0 = ops.standardize_columns(df0)
             tm = st.session_state["col_types"]
 
             pattern_mode = st.radio(
@@ -332,10 +272,34 @@ def render_data_tool():
             if pattern_mode == "Sequence":
                 dt_opts = [c for c, t in tm.items() if t == "Datetime"]
                 dt_col = st.selectbox("Datetime column", dt_opts)
-                fmt = st.text_input("Datetime format", "%m/%d/%Y %I:%M:%S %p")
+                detected = inference.datetime_format(df0, dt_col) if dt_col else None
+                fmt = st.text_input(
+                    "Datetime format", detected or inference.DEFAULT_DATETIME_FORMAT
+                )
                 grp = st.text_input("Group by column", "zip_code")
+                split = st.radio(
+                    "Split sequences by", ["Calendar day", "Time gap"],
+                    horizontal=True, key="spmf_split",
+                )
+                gap_hours = None
+                if split == "Time gap":
+                    gap_hours = st.number_input(
+                        "New sequence after a gap of (hours)", 0.1, 24.0 * 365, 6.0, 0.5,
+                        key="spmf_gap_hours",
+                    )
+                external = st.checkbox(
+                    "Convert from file (out of core)", value=False, key="spmf_external",
+                    help="Stream a CSV or Parquet file too large to load instead of the "
+                         "base data; columns are picked from the loaded data, which can "
+                         "be a sample of that file.",
+                )
+                source_path = (
+                    st.text_input("Source file (CSV or Parquet)", key="spmf_external_path")
+                    if external else None
+                )
             else:
-                dt_col = fmt = grp = None
+                dt_col = fmt = grp = gap_hours = source_path = None
+                external = False
 
             # pick antecedent fields and one consequent
             ante = st.multiselect(
@@ -346,8 +310,14 @@ def render_data_tool():
             )
 
             bins_conf = {}
+            if external and any(tm.get(c) == "Numeric" for c in ante):
+                # the out-of-core conversion encodes the source values as they are
+                st.caption(
+                    "Bins are not applied when converting from file; numeric "
+                    "fields are used as they are."
+                )
             for c in ante:
-                if tm.get(c) == "Numeric":
+                if tm.get(c) == "Numeric" and not external:
                     raw_bins = st.text_input(f"{c} bins", "0,1,2,10", key=f"{c}_bins")
                     raw_labels = st.text_input(f"{c} labels", "V0,V1,V2", key=f"{c}_labels")
                     try:
@@ -360,47 +330,91 @@ def render_data_tool():
                     except ValueError:
                         st.warning(f"{c}: invalid bins")
 
+            workers = st.number_input(
+                "Conversion workers", 1, ops.DEFAULT_WORKERS, ops.DEFAULT_WORKERS,
+                key="spmf_workers",
+                help="Processes used to write the SPMF file; small datasets always use one.",
+            )
+            dedup = st.checkbox(
+                "Deduplicate sequences", value=False, key="spmf_dedup", disabled=external,
+                help="Write each distinct sequence once with a count; "
+                     "supports are reconstituted when mining.",
+            )
             spmf_key = st.text_input("SPMF save key", "spmf_v1")
             prev_spmf = st.button("Preview SPMF")
             save_spmf = st.button("Save SPMF")
 
+            def _to_sequence_spmf_external():
+                if not source_path or not os.path.isfile(source_path):
+                    st.error(f"Source file not found: {source_path}")
+                    return None, None, None, None
+                gap = pd.Timedelta(hours=gap_hours) if gap_hours is not None else None
+                bar = st.progress(0.0, text="Converting...")
+                try:
+                    path, dict_df, stats = ops.convert_sequences(
+                        source_path, ante, dt_col, grp, fmt, gap,
+                        on_progress=lambda p: bar.progress(p, text=f"Converting... {p:.0%}"),
+                    )
+                except (KeyError, ValueError, ImportError) as e:
+                    st.error(f"Conversion failed: {e}")
+                    return None, None, None, None
+                finally:
+                    bar.empty()
+                return dict_df, path, None, stats
+
             def _to_sequence_spmf():
                 d1 = ops.parse_time_for_spmf(df0, dt_col, fmt)
-                d1["groupid"] = d1[grp].astype(str) + "_" + d1["dategroup"]
+                if gap_hours is None:
+                    d1["groupid"] = ops.daily_groupid(d1, grp, dt_col)
+                else:
+                    gap = pd.Timedelta(hours=gap_hours)
+                    d1["groupid"] = ops.session_groupid(d1, grp, dt_col, gap)
                 d2 = ops.discretize_fields(d1, bins_conf) if bins_conf else d1
                 d2 = d2.dropna(subset=ante)
-                dict_df, _ = ops.build_spmf_dictionary(d2, ante)
-                path = ops.write_spmf_file(d2, ante, _)
-                sp_df = ops.spmf_to_dataframe(path)
-                return dict_df, path, sp_df
+                dict_df, encoder = ops.build_spmf_dictionary(d2, ante)
+                db = ops.build_sequence_db(
+                    d2, ante, encoder, time_col=dt_col if gap_hours is not None else None
+                )
+                if dedup:
+                    db = db.dedup()
+                return dict_df, ops.write_sequence_db(db, workers=int(workers)), db, db.stats()
 
             def _to_transaction_spmf():
                 d1 = ops.discretize_fields(df0, bins_conf) if bins_conf else df0
                 needed = list(dict.fromkeys(ante + [cons]))
                 d1 = d1.dropna(subset=needed)
-                dict_df, item2id = ops.build_spmf_dictionary(d1, needed)
-                path = ops.write_transaction_file(d1, needed, item2id)
-                trx_df = pd.read_csv(path, header=None, names=["Transaction"])
-                return dict_df, path, trx_df
+                dict_df, encoder = ops.build_spmf_dictionary(d1, needed)
+                db = ops.build_transaction_db(d1, needed, encoder)
+                if dedup:
+                    db = db.dedup()
+                return dict_df, ops.write_sequence_db(db, workers=int(workers)), db, db.stats()
 
             if prev_spmf or save_spmf:
-                if pattern_mode == "Sequence":
-                    dict_df, path, sp_df = _to_sequence_spmf()
+                if pattern_mode == "Sequence" and external:
+                    dict_df, path, db, stats = _to_sequence_spmf_external()
+                elif pattern_mode == "Sequence":
+                    dict_df, path, db, stats = _to_sequence_spmf()
                 else:
-                    dict_df, path, sp_df = _to_transaction_spmf()
+                    dict_df, path, db, stats = _to_transaction_spmf()
 
                 if dict_df is None:
                     st.stop()
 
-                st.dataframe(dict_df.head(10000), use_container_width=True)
-                st.dataframe(sp_df.head(10), use_container_width=True)
+                st.session_state["spmf_preview"] = {
+                    "path": path, "dict": dict_df, "stats": stats
+                }
+                st.session_state["spmf_preview_page"] = 1
 
                 if save_spmf:
                     state.set(f"{spmf_key}_dict", dict_df)
                     state.add_dynamic_data_key(f"{spmf_key}_dict", "spmf")
                     state.set(f"{spmf_key}_file", path)
                     state.add_dynamic_data_key(f"{spmf_key}_file", "spmf")
-                    state.set(f"{spmf_key}_df", sp_df)
-                    state.add_dynamic_data_key(f"{spmf_key}_df", "spmf")
+                    state.set(f"{spmf_key}_db", db)
+                    state.add_dynamic_data_key(f"{spmf_key}_db", "spmf")
                     state.set("spmf_dictionary", dict_df)
-                    st.success(f"SPMF saved as `{spmf_key}`")
\ No newline at end of file
+                    st.success(f"SPMF saved as `{spmf_key}`")
+
+            preview = st.session_state.get("spmf_preview")
+            if preview and os.path.exists(preview["path"]):
+                _render_spmf_preview(preview)
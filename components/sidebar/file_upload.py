@@ -3,16 +3,42 @@
 import streamlit as st
 import components.state_manager as state
 import components.data_ops as ops
+from components.sidebar.memory_report import render_compaction_report
 
 def render_file_upload():
     with st.expander("📁 File Upload", expanded=False):
         uploaded_file = st.file_uploader("Select CSV/TXT File", type=["csv", "txt"])
         if uploaded_file:
             st.write(f"**Uploaded File:** {uploaded_file.name}")
+            streaming = st.checkbox(
+                "Streaming load (chunked, compact dtypes)", value=True, key="load_streaming"
+            )
+            if streaming:
+                chunk_rows = st.number_input(
+                    "Rows per chunk", 10_000, 5_000_000, ops.CHUNK_ROWS, 10_000,
+                    key="load_chunk_rows",
+                )
+                use_arrow = st.checkbox(
+                    "Arrow-backed strings", value=ops.HAS_ARROW,
+                    disabled=not ops.HAS_ARROW, key="load_arrow",
+                )
             if st.button("Load Data"):
                 try:
-                    df = ops.load_csv(uploaded_file)
+                    if streaming:
+                        bar = st.progress(0.0, text="Loading...")
+                        df = ops.load_csv_chunked(
+                            uploaded_file,
+                            chunk_rows=int(chunk_rows),
+                            use_arrow=use_arrow,
+                            on_progress=lambda p: bar.progress(p, text=f"Loading... {p:.0%}"),
+                        )
+                        bar.empty()
+                    else:
+                        df = ops.load_csv(uploaded_file)
+                    df = ops.standardize_columns(df)
+                    df, report = ops.compact_frame(df)
                     state.set("base_data", df)
                     st.success("Base data loaded successfully!")
+                    render_compaction_report(report)
                 except Exception as e:
                     st.error(f"Failed to load data: {e}")
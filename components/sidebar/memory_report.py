@@ -0,0 +1,17 @@
+# components/sidebar/memory_report.py
+#
+# Caption and per-column table for a data_ops.compact_frame report, shown
+# after Load Data and after Save clean.
+
+import streamlit as st
+
+def render_compaction_report(report):
+    before = report["Bytes before"].sum()
+    after = report["Bytes after"].sum()
+    st.caption(
+        f"Memory: {before / 1024 ** 2:,.1f} MB → {after / 1024 ** 2:,.1f} MB "
+        f"({before / max(after, 1):.1f}x smaller)"
+    )
+    changed = report[report["Saved"] != 0]
+    if not changed.empty:
+        st.dataframe(changed, hide_index=True, use_container_width=True)
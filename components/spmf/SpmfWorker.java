@@ -0,0 +1,77 @@
+// components/spmf/SpmfWorker.java
+//
+// Long-lived SPMF runner for components/spmf/jvm_worker.py. The JVM stays up
+// between runs, so start-up and JIT warm-up are paid once per worker instead
+// of once per click. One request per line on stdin, one answer per line on
+// stdout (fields separated by tabs):
+//
+//   PING                                     -> PONG
+//   RUN  algo  input  output  [param ...]    -> OK | ERR  message
+//   QUIT
+//
+// Launched in single-file source mode:  java -cp spmf.jar SpmfWorker.java
+
+import java.io.BufferedReader;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.util.Arrays;
+
+public class SpmfWorker {
+
+    public static void main(String[] args) throws Exception {
+        PrintStream protocol = new PrintStream(
+                new FileOutputStream(FileDescriptor.out), true, StandardCharsets.UTF_8);
+        // algorithms print statistics; keep them off the protocol stream
+        System.setOut(System.err);
+        BufferedReader in = new BufferedReader(
+                new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        Method runner = runner();
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            String[] fields = line.split("\t", -1);
+            switch (fields[0]) {
+                case "PING":
+                    protocol.println("PONG");
+                    break;
+                case "QUIT":
+                    return;
+                case "RUN":
+                    try {
+                        run(runner, Arrays.copyOfRange(fields, 1, fields.length));
+                        protocol.println("OK");
+                    } catch (Throwable e) {
+                        Throwable cause = e instanceof InvocationTargetException ? e.getCause() : e;
+                        protocol.println("ERR\t" + oneLine(String.valueOf(cause)));
+                    }
+                    break;
+                default:
+                    protocol.println("ERR\tunknown request " + oneLine(fields[0]));
+            }
+        }
+    }
+
+    // CommandProcessor.runAlgorithm; without it the worker fails to start
+    // and jvm_worker.py runs jobs with "java -jar" instead. The command line
+    // entry point is no substitute: it may call System.exit.
+    private static Method runner() throws ReflectiveOperationException {
+        return Class.forName("ca.pfv.spmf.gui.CommandProcessor").getMethod(
+                "runAlgorithm", String.class, String.class, String.class, String[].class);
+    }
+
+    private static void run(Method runner, String[] job) throws Exception {
+        if (job.length < 3) {
+            throw new IllegalArgumentException("RUN needs algorithm, input and output");
+        }
+        runner.invoke(null, job[0], job[1], job[2], Arrays.copyOfRange(job, 3, job.length));
+    }
+
+    private static String oneLine(String s) {
+        return s.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ');
+    }
+}
@@ -2,7 +2,8 @@
 
 ALGORITHMS: dict[str, dict] = {
     # -------- sequential pattern mining --------
-    "PrefixSpan":    {"id": "PrefixSpan",    "category": "seq",  "parameters": ["min_support"]},
+    "PrefixSpan":    {"id": "PrefixSpan",    "category": "seq",  "parameters": ["min_support"],
+                      "backends": ["spmf", "numpy"]},
     "GSP":           {"id": "GSP",           "category": "seq",  "parameters": ["min_support"]},
     "SPADE":         {"id": "SPADE",         "category": "seq",  "parameters": ["min_support"]},
     "CM-SPADE":      {"id": "CM-SPADE",      "category": "seq",  "parameters": ["min_support"]},
@@ -45,4 +46,9 @@ def get_algorithm_id(name: str) -> str:
 
 
 def get_algorithm_cat(name: str) -> str:
-    return ALGORITHMS[name]["category"]
\ No newline at end of file
+    return ALGORITHMS[name]["category"]
+
+
+def get_algorithm_backends(name: str) -> list[str]:
+    """Engines that can run ``name``; "spmf" (the jar) first."""
+    return ALGORITHMS[name].get("backends", ["spmf"])
\ No newline at end of file
@@ -0,0 +1,436 @@
+# components/spmf/external_sort.py
+#
+# Out-of-core conversion of a CSV or Parquet file to an SPMF sequence file,
+# for tables that do not fit in memory. A first pass over the source collects
+# the item and entity dictionaries; a second pass encodes every chunk, sorts
+# it by (entity, day or time, row) and spills it to disk as a sorted run; the
+# runs are then merged block by block (k-way) and the sequences rendered in
+# the same streaming pass. Memory is bounded by the chunk size, the merge
+# buffer and the longest single sequence, not by the size of the source.
+#
+# The output matches the in-memory conversion of the SPMF tab on the same
+# rows: calendar-day sequences keep file order within a day, time-gap
+# sessions are ordered by time, and rows missing an item still count when
+# deciding where a session breaks.
+
+import json
+import os
+import zipfile
+import numpy as np
+import pandas as pd
+
+from components.artifact_store import content_key, store
+from components.spmf.item_encoder import ItemEncoder
+from components.spmf.sequence_db import SequenceDB
+from components.spmf.spmf_writer import WRITE_BUFFER, flatten_rows
+from components.time_grouping import NS_PER_DAY, epoch_ns, parse_datetime
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+CHUNK_ROWS = 500_000
+MERGE_BUFFER_BYTES = 16 << 20   # run rows read per merge step, all runs together
+MIN_MERGE_BLOCK = 4_096         # rows per run and merge step, whatever the run count
+
+_PARQUET_SUFFIXES = {".parquet", ".pq"}
+_PASS1, _PASS2 = 0.3, 0.7      # progress at the end of each pass
+
+
+# ---------- reading ----------------------------------------------------------
+def _standard_name(name: str) -> str:
+    # same normalisation as data_ops.standardize_columns
+    return name.strip().lower().replace(" ", "_")
+
+
+def _source_columns(header, columns: list[str]) -> dict:
+    names = {c: _standard_name(c) for c in header if _standard_name(c) in columns}
+    missing = set(columns) - set(names.values())
+    if missing:
+        raise KeyError(f"Columns not in source: {sorted(missing)}")
+    return names
+
+
+def is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in _PARQUET_SUFFIXES
+
+
+def iter_chunks(path: str, columns: list[str], chunk_rows: int = CHUNK_ROWS):
+    """Yield ``(frame, fraction read)`` over ``columns`` (standardised names)
+    of a CSV or Parquet file. CSV values are read as text, so every chunk
+    sees the same types."""
+    columns = list(dict.fromkeys(columns))
+    if is_parquet(path):
+        if not HAS_PARQUET:
+            raise ImportError("Reading Parquet files needs pyarrow")
+        pf = pq.ParquetFile(path)
+        names = _source_columns(pf.schema_arrow.names, columns)
+        total, done = max(pf.metadata.num_rows, 1), 0
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=list(names)):
+            done += batch.num_rows
+            yield batch.to_pandas().rename(columns=names), done / total
+    else:
+        names = _source_columns(pd.read_csv(path, nrows=0).columns, columns)
+        total = max(os.path.getsize(path), 1)
+        with open(path, "rb") as f:
+            for chunk in pd.read_csv(f, usecols=list(names), dtype=str, chunksize=chunk_rows):
+                yield chunk.rename(columns=names), min(f.tell() / total, 1.0)
+
+
+def _distinct(s: pd.Series) -> pd.Index:
+    values = s.dropna().unique()
+    if isinstance(values, pd.Categorical):
+        values = np.asarray(values)
+    return pd.Index(values)
+
+
+def _union(acc: pd.Index | None, new: pd.Index) -> pd.Index:
+    return new if acc is None else acc.append(new).unique()
+
+
+# ---------- pass 1: dictionaries ---------------------------------------------
+def collect_dictionaries(
+    path: str, item_cols: list[str], group_col: str, chunk_rows: int = CHUNK_ROWS, on_progress=None
+) -> tuple[ItemEncoder, pd.Index]:
+    """Item encoder over the rows with every item present, and the sorted
+    distinct entities of ``group_col``."""
+    cats, entities = [None] * len(item_cols), None
+    for chunk, done in iter_chunks(path, item_cols + [group_col], chunk_rows):
+        full = chunk.dropna(subset=item_cols)
+        cats = [_union(acc, _distinct(full[c])) for acc, c in zip(cats, item_cols)]
+        entities = _union(entities, _distinct(chunk[group_col]))
+        if on_progress:
+            on_progress(done)
+    cats = [(c if c is not None else pd.Index([])).sort_values() for c in cats]
+    entities = (entities if entities is not None else pd.Index([])).sort_values()
+    return ItemEncoder.from_categories(item_cols, cats), entities
+
+
+# ---------- pass 2: sorted runs ----------------------------------------------
+def run_dtype(n_cols: int) -> np.dtype:
+    return np.dtype([
+        ("entity", "<i8"), ("time", "<i8"), ("row", "<i8"),
+        ("keep", "?"), ("items", "<i4", (n_cols,)),
+    ])
+
+
+def _sorted_run(
+    chunk: pd.DataFrame,
+    first_row: int,
+    item_cols: list[str],
+    time_col: str,
+    group_col: str,
+    fmt: str | None,
+    encoder: ItemEncoder,
+    entities: pd.Index,
+    sessions: bool,
+) -> np.ndarray:
+    ns, valid = epoch_ns(parse_datetime(chunk[time_col], fmt))
+    entity = entities.get_indexer(chunk[group_col])
+    keep = chunk[item_cols].notna().all(axis=1).to_numpy()
+    # rows without items only matter for where sessions break
+    valid = valid & (entity >= 0) & (keep | sessions)
+
+    run = np.empty(int(valid.sum()), dtype=run_dtype(len(item_cols)))
+    run["entity"] = entity[valid]
+    run["time"] = ns[valid] if sessions else ns[valid] // NS_PER_DAY
+    run["row"] = first_row + np.flatnonzero(valid)
+    run["keep"] = keep[valid]
+    run["items"] = encoder.encode(chunk.loc[valid], item_cols)
+    # rows are already in file order, so a stable sort breaks ties by row
+    return run[np.lexsort((run["time"], run["entity"]))]
+
+
+def spill_runs(
+    path: str,
+    run_prefix: str,
+    item_cols: list[str],
+    time_col: str,
+    group_col: str,
+    fmt: str | None,
+    encoder: ItemEncoder,
+    entities: pd.Index,
+    sessions: bool,
+    chunk_rows: int = CHUNK_ROWS,
+    on_progress=None,
+) -> list[str]:
+    """Write one sorted ``.npy`` run per chunk; returns their paths."""
+    runs, first_row = [], 0
+    cols = item_cols + [time_col, group_col]
+    try:
+        for chunk, done in iter_chunks(path, cols, chunk_rows):
+            run = _sorted_run(
+                chunk, first_row, item_cols, time_col, group_col, fmt, encoder, entities, sessions
+            )
+            first_row += len(chunk)
+            if len(run):
+                runs.append(f"{run_prefix}.run{len(runs)}.npy")
+                np.save(runs[-1], run)
+            if on_progress:
+                on_progress(done)
+    except BaseException:
+        for p in runs:
+            if os.path.exists(p):
+                os.remove(p)
+        raise
+    return runs
+
+
+# ---------- merge ------------------------------------------------------------
+def _count_upto(block: np.ndarray, bound: tuple) -> int:
+    # rows of a sorted block whose (entity, time, row) key is <= bound
+    e, t, r = bound
+    le = (block["entity"] < e) | (
+        (block["entity"] == e) & ((block["time"] < t) | ((block["time"] == t) & (block["row"] <= r)))
+    )
+    return int(np.count_nonzero(le))
+
+
+def merge_runs(paths: list[str], buffer_bytes: int = MERGE_BUFFER_BYTES):
+    """Yield the rows of the sorted runs in ``paths`` as sorted blocks.
+
+    Each step reads a block from every run; everything up to the smallest
+    last key among blocks that do not reach the end of their run is safe to
+    emit, since no later row of any run can sort before it.
+    """
+    runs = [np.load(p, mmap_mode="r") for p in paths]
+    if not runs:
+        return
+    block_rows = max(buffer_bytes // (len(runs) * runs[0].dtype.itemsize), MIN_MERGE_BLOCK)
+    pos = [0] * len(runs)
+    while True:
+        blocks = [
+            (i, np.array(run[pos[i]:pos[i] + block_rows]))
+            for i, run in enumerate(runs) if pos[i] < len(run)
+        ]
+        if not blocks:
+            return
+        partial = [
+            (int(b[-1]["entity"]), int(b[-1]["time"]), int(b[-1]["row"]))
+            for i, b in blocks if pos[i] + len(b) < len(runs[i])
+        ]
+        bound = min(partial) if partial else None
+        parts = []
+        for i, b in blocks:
+            n = len(b) if bound is None else _count_upto(b, bound)
+            parts.append(b[:n])
+            pos[i] += n
+        merged = np.concatenate(parts)
+        yield merged[np.lexsort((merged["row"], merged["time"], merged["entity"]))]
+
+
+# ---------- streaming output -------------------------------------------------
+class _Totals:
+    def __init__(self, max_id: int):
+        self.sequences = self.itemsets = self.items = 0
+        self.max_sequence = self.max_itemset = 0
+        self.seen = np.zeros(max_id + 1, dtype=bool)
+
+    def add(self, db: SequenceDB):
+        self.sequences += len(db)
+        self.itemsets += db.n_itemsets
+        self.items += db.n_items
+        self.max_sequence = max(self.max_sequence, int(db.sequence_lengths().max(initial=0)))
+        self.max_itemset = max(self.max_itemset, int(db.itemset_lengths().max(initial=0)))
+        self.seen[db.items] = True
+
+    def stats(self) -> dict:
+        # same keys as SequenceDB.stats for what a streamed file can tell
+        return {
+            "Sequences": self.sequences,
+            "Itemsets": self.itemsets,
+            "Items": self.items,
+            "Distinct items": int(np.count_nonzero(self.seen)),
+            "Avg itemsets / sequence": self.itemsets / self.sequences if self.sequences else 0.0,
+            "Max itemsets / sequence": self.max_sequence,
+            "Avg items / itemset": self.items / self.itemsets if self.itemsets else 0.0,
+            "Max items / itemset": self.max_itemset,
+        }
+
+
+def _block_db(ids: np.ndarray, seq: np.ndarray) -> SequenceDB:
+    flat, counts = flatten_rows(ids, keep_empty=True)
+    starts = np.flatnonzero(np.r_[True, seq[1:] != seq[:-1]])
+    return SequenceDB(flat, np.r_[0, np.cumsum(counts)], np.r_[starts, len(seq)])
+
+
+def write_merged(f, blocks, max_id: int, session_gap_ns: int | None = None, on_rows=None) -> dict:
+    """Render merged run blocks as SPMF sequences to ``f``; returns stats.
+
+    The last, possibly unfinished, sequence of a block is held back and
+    written with the next one.
+    """
+    totals = _Totals(max_id)
+    prev, seq_base = None, 0
+    held_ids, held_seq = None, np.zeros(0, dtype=np.int64)
+    for block in blocks:
+        e, t = block["entity"], block["time"]
+        start = np.empty(len(block), dtype=bool)
+        start[0] = prev is None or prev[0] != e[0] or (
+            t[0] - prev[1] > session_gap_ns if session_gap_ns is not None else t[0] != prev[1]
+        )
+        if session_gap_ns is not None:
+            start[1:] = (e[1:] != e[:-1]) | (np.diff(t) > session_gap_ns)
+        else:
+            start[1:] = (e[1:] != e[:-1]) | (t[1:] != t[:-1])
+        seq = seq_base + np.cumsum(start)
+        prev, seq_base = (e[-1], t[-1]), int(seq[-1])
+
+        keep = block["keep"]
+        ids, seq = block["items"][keep], seq[keep]
+        if held_ids is not None:
+            ids, seq = np.concatenate([held_ids, ids]), np.concatenate([held_seq, seq])
+        if len(seq):
+            done = seq < seq[-1]
+            if done.any():
+                db = _block_db(ids[done], seq[done])
+                db.write(f)
+                totals.add(db)
+            held_ids, held_seq = ids[~done], seq[~done]
+        if on_rows:
+            on_rows(len(block))
+    if held_ids is not None and len(held_seq):
+        db = _block_db(held_ids, held_seq)
+        db.write(f)
+        totals.add(db)
+    return totals.stats()
+
+
+# ---------- public API -------------------------------------------------------
+META_SUFFIX = ".meta.npz"
+
+
+def _source_stamp(path: str) -> tuple:
+    # path, modification time and size stand in for the content, so a cache
+    # hit does not read the whole source again to hash it
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+
+def _plain_array(index: pd.Index) -> np.ndarray:
+    # numbers, booleans, times and text: what np.load reads without pickle
+    values = index.to_numpy()
+    if values.dtype == object:
+        if not pd.api.types.is_string_dtype(index):
+            raise TypeError(f"cannot store values of dtype {index.dtype}")
+        values = values.astype(str)
+    return values
+
+
+def _save_meta(path: str, encoder: ItemEncoder, entities: pd.Index, stats: dict):
+    info = {"columns": encoder.columns, "stats": stats}
+    arrays = {
+        "info": np.array(json.dumps(info, default=lambda v: v.item())),
+        "entities": _plain_array(entities),
+    }
+    for i, (values, ids) in enumerate(zip(encoder.categories, encoder.ids)):
+        arrays[f"values_{i}"], arrays[f"ids_{i}"] = _plain_array(values), ids
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def _load_meta(key: str) -> tuple | None:
+    """Encoder, entities and stats kept for conversion ``key``, if any."""
+    meta_path = store.get(key, META_SUFFIX)
+    if meta_path is None:
+        return None
+    try:
+        with np.load(meta_path, allow_pickle=False) as meta:
+            info = json.loads(str(meta["info"]))
+            n = len(info["columns"])
+            encoder = ItemEncoder(
+                info["columns"],
+                [pd.Index(meta[f"values_{i}"]) for i in range(n)],
+                [meta[f"ids_{i}"] for i in range(n)],
+            )
+            return encoder, pd.Index(meta["entities"]), info["stats"]
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def convert_sequences(
+    path: str,
+    item_cols: list[str],
+    time_col: str,
+    group_col: str,
+    fmt: str | None = None,
+    session_gap: pd.Timedelta | None = None,
+    chunk_rows: int = CHUNK_ROWS,
+    on_progress=None,
+) -> tuple[str, pd.DataFrame, dict]:
+    """Convert the CSV or Parquet file at ``path`` to an SPMF sequence file
+    without loading it; returns ``(spmf path, dictionary frame, stats)``.
+
+    Sequences are one ``group_col`` value per calendar day, or per session
+    split at gaps longer than ``session_gap``. The file lives in the artifact
+    store and is reused for the same source and settings. Its dictionaries
+    and stats are kept next to it under the same key; a conversion is only
+    reused when both files are there, and either one is rebuilt when lost.
+    """
+    def progress(lo, hi):
+        return (lambda p: on_progress(lo + (hi - lo) * p)) if on_progress else None
+
+    item_cols = list(item_cols)
+    gap_ns = None if session_gap is None else int(pd.Timedelta(session_gap).value)
+    key = content_key(
+        "external-sequences", _source_stamp(path), item_cols, time_col, group_col, fmt, gap_ns
+    )
+    # the metadata is looked up last, so under eviction the SPMF file goes
+    # first and the dictionaries survive to rebuild it without pass 1
+    spmf_path = store.get(key)
+    meta = _load_meta(key)
+    if spmf_path is not None and meta is not None:
+        if on_progress:
+            on_progress(1.0)
+        return spmf_path, meta[0].to_frame(), meta[2]
+
+    if meta is None:
+        encoder, entities = collect_dictionaries(
+            path, item_cols, group_col, chunk_rows, progress(0.0, _PASS1)
+        )
+    else:
+        encoder, entities, _ = meta
+    stats = {}
+
+    def write(out_path):
+        runs = spill_runs(
+            path, out_path, item_cols, time_col, group_col, fmt, encoder, entities,
+            gap_ns is not None, chunk_rows, progress(_PASS1, _PASS2),
+        )
+        try:
+            total = sum(np.load(p, mmap_mode="r").shape[0] for p in runs)
+            merged = 0
+
+            def on_rows(n):
+                nonlocal merged
+                merged += n
+                if on_progress and total:
+                    on_progress(_PASS2 + (1 - _PASS2) * merged / total)
+
+            with open(out_path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+                stats.update(write_merged(f, merge_runs(runs), encoder.max_id, gap_ns, on_rows))
+        finally:
+            for p in runs:
+                if os.path.exists(p):
+                    os.remove(p)
+
+    if spmf_path is None:
+        spmf_path = store.get_or_create(key, write)
+    else:
+        # only the stats were lost; the conversion is deterministic, so the
+        # file is rewritten with the same content
+        spmf_path = store.create(key, write)
+    if stats:
+        # written by this call, so the metadata describes this file
+        try:
+            store.create(
+                key, lambda meta_path: _save_meta(meta_path, encoder, entities, stats),
+                META_SUFFIX,
+            )
+        except TypeError:
+            pass                    # values np.load cannot read back; not reused
+    if on_progress:
+        on_progress(1.0)
+    return spmf_path, encoder.to_frame(), stats
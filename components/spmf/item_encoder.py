@@ -0,0 +1,139 @@
+# components/spmf/item_encoder.py
+#
+# One item dictionary for every SPMF artefact. Each item column owns a sorted
+# categories index and an int32 id array; ids are sequential across columns
+# starting at 1, so columns can never collide. Encoding and decoding are
+# array lookups in both directions.
+
+import numpy as np
+import pandas as pd
+
+
+def _sorted_values(s: pd.Series) -> pd.Index:
+    values = s.dropna().unique()
+    if isinstance(values, pd.Categorical):
+        values = np.asarray(values)
+    return pd.Index(values).sort_values()
+
+
+class ItemEncoder:
+    def __init__(self, columns: list[str], categories: list[pd.Index], ids: list[np.ndarray]):
+        self.columns = list(columns)
+        self.categories = list(categories)
+        self.ids = [np.asarray(a, dtype=np.int32) for a in ids]
+        max_id = max((int(a.max()) for a in self.ids if len(a)), default=0)
+        # id -> (column position, category position); -1 for unused ids
+        self._col_of = np.full(max_id + 1, -1, dtype=np.int32)
+        self._pos_of = np.full(max_id + 1, -1, dtype=np.int32)
+        for j, a in enumerate(self.ids):
+            self._col_of[a] = j
+            self._pos_of[a] = np.arange(len(a), dtype=np.int32)
+        self._labels = None
+        self._item2id = None
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, item_cols: list[str]) -> "ItemEncoder":
+        return cls.from_categories(item_cols, [_sorted_values(df[col]) for col in item_cols])
+
+    @classmethod
+    def from_categories(cls, item_cols: list[str], categories: list[pd.Index]) -> "ItemEncoder":
+        """Sequential ids from 1 over already sorted ``categories``."""
+        ids, next_id = [], 1
+        for cats in categories:
+            ids.append(np.arange(next_id, next_id + len(cats), dtype=np.int32))
+            next_id += len(cats)
+        return cls(item_cols, categories, ids)
+
+    @classmethod
+    def from_frame(cls, dict_df: pd.DataFrame) -> "ItemEncoder":
+        """Rebuild from a ``Column``/``Value``/``ID`` dictionary frame."""
+        columns, categories, ids = [], [], []
+        for col, part in dict_df.groupby("Column", sort=False):
+            columns.append(col)
+            categories.append(pd.Index(part["Value"].to_numpy()))
+            ids.append(part["ID"].to_numpy())
+        return cls(columns, categories, ids)
+
+    # ---------- properties ---------------------------------------------------
+    @property
+    def max_id(self) -> int:
+        return len(self._col_of) - 1
+
+    def __len__(self) -> int:
+        return sum(len(a) for a in self.ids)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Column": np.repeat(self.columns, [len(c) for c in self.categories]),
+            "Value": [v for cats in self.categories for v in cats],
+            "ID": np.concatenate(self.ids) if self.ids else np.array([], dtype=np.int32),
+        })
+
+    @property
+    def item2id(self) -> dict:
+        """``{(column, value): id}`` view for code that still wants a dict."""
+        if self._item2id is None:
+            self._item2id = {
+                (col, v): int(i)
+                for col, cats, a in zip(self.columns, self.categories, self.ids)
+                for v, i in zip(cats, a)
+            }
+        return self._item2id
+
+    # ---------- encode -------------------------------------------------------
+    def encode_column(self, col: str, s: pd.Series) -> np.ndarray:
+        j = self.columns.index(col)
+        codes, uniques = pd.factorize(s)
+        if len(uniques) == 0:
+            return np.full(len(s), -1, dtype=np.int32)
+        if isinstance(uniques, pd.Categorical):
+            uniques = np.asarray(uniques)
+        pos = self.categories[j].get_indexer(uniques)
+        lut = np.where(pos >= 0, self.ids[j][pos], -1).astype(np.int32)
+        return np.where(codes >= 0, lut[codes], -1).astype(np.int32)
+
+    def encode(self, df: pd.DataFrame, item_cols: list[str] | None = None) -> np.ndarray:
+        """(rows, columns) int32 ids, -1 where a cell has no id."""
+        item_cols = item_cols or self.columns
+        out = np.full((len(df), len(item_cols)), -1, dtype=np.int32)
+        for j, col in enumerate(item_cols):
+            if col in self.columns:
+                out[:, j] = self.encode_column(col, df[col])
+        return out
+
+    # ---------- decode -------------------------------------------------------
+    def _lookup(self, ids) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        ids = np.asarray(ids, dtype=np.int64)
+        known = (ids >= 0) & (ids <= self.max_id)
+        safe = np.where(known, ids, 0)
+        col = np.where(known, self._col_of[safe], -1)
+        return ids, col, np.where(col >= 0, self._pos_of[safe], -1)
+
+    def decode(self, ids) -> tuple[np.ndarray, np.ndarray]:
+        """Column name and value arrays for ``ids`` (None where unknown)."""
+        ids, col, pos = self._lookup(ids)
+        names = np.array(self.columns + [None], dtype=object)[col]
+        values = np.empty(len(ids), dtype=object)
+        for j, cats in enumerate(self.categories):
+            hit = col == j
+            if hit.any():
+                values[hit] = np.asarray(cats, dtype=object)[pos[hit]]
+        return names, values
+
+    def label_table(self) -> np.ndarray:
+        """Object array indexed by id holding ``"column=value"`` labels."""
+        if self._labels is None:
+            labels = np.array([str(i) for i in range(self.max_id + 1)], dtype=object)
+            for col, cats, a in zip(self.columns, self.categories, self.ids):
+                labels[a] = [f"{col}={v}" for v in cats]
+            self._labels = labels
+        return self._labels
+
+    def labels(self, ids) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        table = self.label_table()
+        inside = (ids >= 0) & (ids < len(table))
+        out = np.empty(len(ids), dtype=object)
+        out[inside] = table[ids[inside]]
+        out[~inside] = [str(i) for i in ids[~inside]]
+        return out
@@ -0,0 +1,23 @@
+# components/spmf/item_pruning.py
+#
+# Infrequent-item pre-pass for the SPMF miners. Support is anti-monotone, so
+# an item contained in fewer sequences than the absolute threshold cannot be
+# part of any frequent pattern; dropping it from the input changes neither
+# the patterns nor their supports, only how much the miner has to scan.
+
+import numpy as np
+from components.spmf.sequence_db import SequenceDB
+
+
+def infrequent_items(db: SequenceDB, min_count: int) -> np.ndarray:
+    """Ids present in the database with a (weighted) support below ``min_count``."""
+    support = db.item_support()
+    return np.flatnonzero((support > 0) & (support < min_count))
+
+
+def prune(db: SequenceDB, min_count: int) -> tuple[SequenceDB, np.ndarray]:
+    """``db`` without its infrequent items, and the ids that were dropped."""
+    drop = infrequent_items(db, min_count)
+    if len(drop) == 0:
+        return db, drop
+    return db.drop_items(drop), drop
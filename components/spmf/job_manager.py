@@ -0,0 +1,401 @@
+# components/spmf/job_manager.py
+#
+# Background mining jobs. Jobs run on a small server-wide thread pool, so at
+# most MAX_CONCURRENT_JOBS miners run at once whatever the number of
+# sessions, and the Streamlit script never blocks on one. Parameter sweeps
+# queue on a pool of their own (``sweeps``), one run per available core. Each job starts
+# its own JVM in a new process group, capped with -Xmx and watched for
+# wall-clock time and resident memory; cancelling or exceeding a limit
+# kills the whole group. The heap gets HEAP_FRACTION of the memory limit,
+# leaving the rest for the JVM's own overhead, so a run that fills its heap
+# fails with an OutOfMemoryError instead of being killed. Isolated jobs
+# (sweep runs) run the whole mining call in a fresh interpreter in such a
+# group, so their time and memory are measured alone. In-process backends
+# mine on the job's thread and check for cancellation and the time limit as
+# they go; their memory is bounded by their pattern cap instead. Sessions
+# keep job ids and pick finished results up on their next rerun; jobs still
+# running when the server exits are killed with it.
+
+import atexit
+import os
+import pickle
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import components.artifact_store as artifact_store
+import components.spmf.result_cache as result_cache
+import components.spmf.spmf_executor as executor
+
+MAX_CONCURRENT_JOBS = 2
+DEFAULT_TIMEOUT = 30 * 60           # seconds
+DEFAULT_MEMORY_MB = 2048
+HEAP_FRACTION = 0.75              # of the memory limit, for -Xmx
+POLL_SECONDS = 0.5
+KILL_GRACE = 2.0                    # seconds between SIGTERM and SIGKILL
+RESULT_TTL = 60 * 60                # finished jobs nobody collected are dropped
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed out"
+OUT_OF_MEMORY = "out of memory"
+FINISHED = {DONE, FAILED, CANCELLED, TIMED_OUT, OUT_OF_MEMORY}
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class JobStopped(RuntimeError):
+    """The job was cancelled or went over a limit."""
+
+
+def available_cores() -> int:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def group_rss(pgid: int) -> int | None:
+    """Resident bytes of every process in group ``pgid`` (None without /proc)."""
+    if not os.path.isdir("/proc"):
+        return None
+    total = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # fields after "(comm)": state ppid pgrp ... rss is the 22nd
+        fields = stat[stat.rindex(b")") + 2:].split()
+        if int(fields[2]) == pgid:
+            total += int(fields[21]) * _PAGE_SIZE
+    return total
+
+
+def heap_mb(memory_mb: int) -> int:
+    """-Xmx for a JVM whose whole process group must stay under ``memory_mb``."""
+    return max(int(memory_mb * HEAP_FRACTION), 64)
+
+
+def kill_group(proc: subprocess.Popen, grace: float = KILL_GRACE):
+    """SIGTERM the process group of ``proc``, then SIGKILL whatever is left
+    of it once the leader exits or ``grace`` runs out."""
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return
+    try:
+        proc.wait(grace)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+
+
+class Job:
+    """One mining run and what is known about it so far."""
+
+    def __init__(
+        self,
+        algo_name: str,
+        input_file: str,
+        parameters: dict,
+        db=None,
+        prune: bool = True,
+        dictionary=None,
+        cache: bool = True,
+        timeout: float = DEFAULT_TIMEOUT,
+        memory_mb: int = DEFAULT_MEMORY_MB,
+        backend: str = "spmf",
+        isolated: bool = False,
+    ):
+        self.id = uuid.uuid4().hex[:8]
+        self.algo_name = algo_name
+        self.input_file = input_file
+        self.parameters = dict(parameters)
+        self.db = db
+        self.prune = prune
+        self.dictionary = dictionary
+        self.cache = cache
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.backend = backend
+        # in-process backends gain nothing from a fresh interpreter but its
+        # start-up time
+        self.isolated = isolated and backend == "spmf"
+
+        self.status = QUEUED
+        self.created = time.time()
+        self.started = self.finished = None
+        self.result = None
+        self.error = None
+        self.peak_rss = 0
+        self.stats = {}             # runtime and peak memory of a finished run
+        self._proc = None
+        self._output = None
+        self._stop = None           # status to end with once the process is gone
+        self._lock = threading.Lock()
+
+    # ---------- progress -----------------------------------------------------
+    @property
+    def active(self) -> bool:
+        return self.status not in FINISHED
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def output_bytes(self) -> int:
+        try:
+            return os.path.getsize(self._output) if self._output else 0
+        except OSError:
+            return 0
+
+    def summary(self) -> dict:
+        return {
+            "Job": self.id,
+            "Algorithm": self.algo_name,
+            "Status": self.status,
+            "Elapsed (s)": round(self.elapsed, 1),
+            "Output (MB)": round(self.output_bytes / 1024 ** 2, 2),
+            "Peak memory (MB)": round(self.peak_rss / 1024 ** 2, 1),
+        }
+
+    # ---------- control ------------------------------------------------------
+    def cancel(self):
+        self._halt(CANCELLED)
+
+    def _check(self):
+        # polled by in-process miners, which have no process to watch
+        if self.elapsed > self.timeout:
+            self._halt(TIMED_OUT)
+        if self._stop:
+            raise JobStopped(self._stop)
+
+    def _halt(self, status: str):
+        with self._lock:
+            if self._stop is None:
+                self._stop = status
+            proc = self._proc
+        if proc is not None:
+            kill_group(proc)
+
+    # ---------- execution ----------------------------------------------------
+    def _watch(self, cmd: list[str], output_path: str | None = None, **popen) -> tuple[int, str]:
+        """Run ``cmd`` in its own process group under the job's limits; its
+        exit status and standard error."""
+        with tempfile.TemporaryFile() as err:
+            with self._lock:
+                if self._stop:
+                    raise JobStopped(self._stop)
+                self._output = output_path
+                self._proc = proc = subprocess.Popen(
+                    cmd, stdout=subprocess.DEVNULL, stderr=err, start_new_session=True,
+                    **popen,
+                )
+            limit = self.memory_mb * 1024 ** 2
+            try:
+                while True:
+                    try:
+                        proc.wait(POLL_SECONDS)
+                        break
+                    except subprocess.TimeoutExpired:
+                        pass
+                    rss = group_rss(proc.pid)
+                    if rss is not None:
+                        self.peak_rss = max(self.peak_rss, rss)
+                        if rss > limit:
+                            self._halt(OUT_OF_MEMORY)
+                    if self.elapsed > self.timeout:
+                        self._halt(TIMED_OUT)
+            finally:
+                if proc.poll() is None:
+                    kill_group(proc)
+                with self._lock:
+                    self._proc = None
+            if self._stop:
+                raise JobStopped(self._stop)
+            err.seek(0)
+            return proc.returncode, err.read().decode(errors="replace")
+
+    def _run_command(self, cmd: list[str], output_path: str):
+        # java -Xmx... -jar spmf.jar run ... in its own process group
+        cmd = cmd[:1] + [f"-Xmx{heap_mb(self.memory_mb)}m"] + cmd[1:]
+        code, err = self._watch(cmd, output_path)
+        if code != 0:
+            raise RuntimeError(f"SPMF Error: {err}")
+
+    def _run_isolated(self):
+        # the whole mine call in a fresh interpreter (see _child_main), so
+        # the run is measured alone; not multiprocessing, whose children
+        # re-run the Streamlit app script that Streamlit installs as __main__
+        task = (
+            self.algo_name, self.input_file, self.parameters, self.db, self.prune,
+            self.dictionary, self.cache, self.backend, self.memory_mb,
+        )
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [_ROOT, env.get("PYTHONPATH")]))
+        with tempfile.TemporaryDirectory(prefix="spmf-job-") as tmp:
+            task_path = os.path.join(tmp, "task.pkl")
+            result_path = os.path.join(tmp, "result.pkl")
+            with open(task_path, "wb") as f:
+                pickle.dump(task, f, pickle.HIGHEST_PROTOCOL)
+            code, err = self._watch(
+                [sys.executable, "-m", "components.spmf.job_manager", task_path, result_path],
+                env=env,
+            )
+            if code != 0:
+                lines = err.strip().splitlines()
+                raise RuntimeError(lines[-1] if lines else f"exit status {code}")
+            with open(result_path, "rb") as f:
+                out = pickle.load(f)
+        # pins live in this process, so only this process evicts
+        artifact_store.store.evict()
+        result_cache.store.evict()
+        if "error" in out:
+            raise RuntimeError(out["error"])
+        self.stats = out["stats"]
+        return out["result"]
+
+    def _execute(self):
+        if self._stop:
+            self.finished, self.status = time.time(), self._stop
+            return
+        self.started, self.status = time.time(), RUNNING
+        status = FAILED
+        try:
+            if self.isolated:
+                self.result = self._run_isolated()
+            else:
+                self.result = executor.mine(
+                    self.algo_name, self.input_file, self.parameters, self.db, self.prune,
+                    run=self._run_command, dictionary=self.dictionary, cache=self.cache,
+                    backend=self.backend, check=self._check,
+                )
+                self.stats = {"runtime": self.elapsed, "peak_rss": self.peak_rss or None}
+            status = DONE
+        except JobStopped as e:
+            status = str(e)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            # finished is set before the status says so
+            self.db = None
+            self.finished = time.time()
+            self.status = status
+
+
+class JobManager:
+    """Server-wide queue of mining jobs."""
+
+    def __init__(self, max_jobs: int = MAX_CONCURRENT_JOBS, name: str = "spmf-job"):
+        self._pool = ThreadPoolExecutor(max_jobs, thread_name_prefix=name)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, algo_name: str, input_file: str, parameters: dict, **options) -> Job:
+        """Queue a run; ``options`` are Job's (db, prune, dictionary, cache,
+        timeout, memory_mb, backend, isolated)."""
+        self._expire()
+        job = Job(algo_name, input_file, parameters, **options)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._pool.submit(job._execute)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def forget(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _expire(self):
+        cutoff = time.time() - RESULT_TTL
+        with self._lock:
+            for job_id in [
+                j.id for j in self._jobs.values() if not j.active and j.finished < cutoff
+            ]:
+                del self._jobs[job_id]
+
+    def jobs(self) -> list[Job]:
+        return list(self._jobs.values())
+
+    def shutdown(self):
+        for job in self.jobs():
+            if job.active:
+                job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+manager = JobManager()
+sweeps = JobManager(available_cores(), name="spmf-sweep")
+# threading joins the pool's threads at exit before atexit handlers run, so
+# running jobs are killed from a hook that runs ahead of that join
+_register = getattr(threading, "_register_atexit", atexit.register)
+_register(manager.shutdown)
+_register(sweeps.shutdown)
+
+
+# ---------- isolated runs ----------------------------------------------------
+def _child_main(task_path: str, result_path: str):
+    # runs as ``python -m components.spmf.job_manager task result`` for
+    # Job._run_isolated; the parent watches this process group
+    artifact_store.store.quota = float("inf")
+    result_cache.store.quota = float("inf")
+    with open(task_path, "rb") as f:
+        algo_name, input_file, parameters, db, prune, dictionary, cache, backend, memory_mb = (
+            pickle.load(f)
+        )
+
+    def run(cmd, output_path):
+        cmd = cmd[:1] + [f"-Xmx{heap_mb(memory_mb)}m"] + cmd[1:]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"SPMF Error: {proc.stderr}")
+
+    try:
+        t0 = time.perf_counter()
+        df = executor.mine(
+            algo_name, input_file, parameters, db, prune, run=run,
+            dictionary=dictionary, cache=cache, backend=backend,
+        )
+        # ru_maxrss is in KiB on Linux; no children when SPMF's output was
+        # on disk already
+        peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+        out = {
+            "result": df,
+            "stats": {"runtime": time.perf_counter() - t0, "peak_rss": peak or None},
+        }
+    except Exception as e:
+        out = {"error": str(e)}
+    with open(result_path, "wb") as f:
+        pickle.dump(out, f, pickle.HIGHEST_PROTOCOL)
+
+
+if __name__ == "__main__":
+    _child_main(*sys.argv[1:3])
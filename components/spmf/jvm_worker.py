@@ -0,0 +1,256 @@
+# components/spmf/jvm_worker.py
+#
+# Pool of long-lived SPMF worker processes (SpmfWorker.java). Each worker
+# keeps one JVM warm and takes jobs over its stdin/stdout pipe, one line per
+# request and answer, so repeated runs skip JVM start-up and JIT warm-up.
+# The pool starts workers on demand up to a size limit, pings idle ones
+# before reuse and replaces dead or wedged ones; callers fall back to a
+# fresh ``java -jar`` when no worker can be had (WorkerUnavailable). A job
+# that runs past its timeout kills its worker and fails (WorkerTimeout)
+# rather than being run again cold.
+
+import atexit
+import os
+import select
+import subprocess
+import threading
+import time
+
+WORKER_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "SpmfWorker.java")
+POOL_SIZE = 2
+START_TIMEOUT = 60.0        # seconds; the first start compiles the worker source
+PING_TIMEOUT = 5.0
+HEALTH_INTERVAL = 30.0      # idle seconds after which a worker is pinged before reuse
+RETRY_SECONDS = 60.0        # no new start attempts this long after one failed
+RUN_TIMEOUT = 30 * 60.0     # seconds a job may run on a worker
+
+
+class WorkerUnavailable(RuntimeError):
+    """No worker could take the job; run it some other way."""
+
+
+class WorkerTimeout(RuntimeError):
+    """The job ran past its timeout; its worker was stopped."""
+
+
+def java_command(jar_path: str) -> list[str]:
+    return ["java", "-cp", jar_path, WORKER_SOURCE]
+
+
+class JvmWorker:
+    """One worker process and its request/answer pipe."""
+
+    def __init__(self, command: list[str]):
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            start_new_session=True,
+        )
+        self.last_answer = 0.0
+        self.jobs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _request(self, line: str, timeout: float | None = None) -> str:
+        try:
+            self.proc.stdin.write(line + "\n")
+            self.proc.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise WorkerUnavailable(f"worker pipe closed: {e}") from e
+        if timeout is not None:
+            ready, _, _ = select.select([self.proc.stdout], [], [], timeout)
+            if not ready:
+                raise TimeoutError("worker did not answer")
+        answer = self.proc.stdout.readline()
+        if not answer:
+            raise WorkerUnavailable("worker exited")
+        self.last_answer = time.monotonic()
+        return answer.rstrip("\n")
+
+    def ping(self, timeout: float = PING_TIMEOUT) -> bool:
+        try:
+            return self._request("PING", timeout) == "PONG"
+        except (WorkerUnavailable, TimeoutError):
+            return False
+
+    def run(self, args: list[str], timeout: float | None = RUN_TIMEOUT):
+        """Run one SPMF job: ``[algorithm, input, output, *params]``. Raises
+        WorkerTimeout, leaving the worker to be killed, when it takes longer
+        than ``timeout`` seconds."""
+        args = [str(a) for a in args]
+        if any(c in a for a in args for c in "\t\r\n"):
+            raise WorkerUnavailable("arguments cannot go over the line protocol")
+        try:
+            answer = self._request("\t".join(["RUN"] + args), timeout)
+        except TimeoutError:
+            raise WorkerTimeout(f"SPMF run exceeded {timeout:g} s") from None
+        self.jobs += 1
+        if answer == "OK":
+            return
+        if answer.startswith("ERR\t"):
+            raise RuntimeError(f"SPMF Error: {answer[4:]}")
+        raise WorkerUnavailable(f"unexpected answer: {answer[:200]}")
+
+    def close(self, timeout: float = 1.0):
+        if self.alive:
+            try:
+                self.proc.stdin.write("QUIT\n")
+                self.proc.stdin.flush()
+                self.proc.wait(timeout)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+
+    def kill(self):
+        if self.alive:
+            self.proc.kill()
+            self.proc.wait()
+        for pipe in (self.proc.stdin, self.proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+
+class WorkerPool:
+    """At most ``size`` workers running ``command``; jobs wait for a free one."""
+
+    def __init__(self, command: list[str], size: int = POOL_SIZE):
+        self.command = list(command)
+        self.size = size
+        self._idle = []
+        self._count = 0            # idle + busy + starting
+        self._cond = threading.Condition()
+        self._down_until = 0.0
+        self._closed = False
+
+    def _start(self) -> JvmWorker:
+        try:
+            worker = JvmWorker(self.command)
+        except OSError as e:
+            raise WorkerUnavailable(f"cannot start worker: {e}") from e
+        if not worker.ping(START_TIMEOUT):
+            worker.kill()
+            raise WorkerUnavailable("worker did not start")
+        return worker
+
+    def _acquire(self) -> JvmWorker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise WorkerUnavailable("pool is shut down")
+                if time.monotonic() < self._down_until:
+                    raise WorkerUnavailable("worker start failed recently")
+                if self._idle:
+                    worker = self._idle.pop()
+                    break
+                if self._count < self.size:
+                    self._count += 1
+                    worker = None
+                    break
+                self._cond.wait()
+
+        if worker is not None:
+            fresh = time.monotonic() - worker.last_answer < HEALTH_INTERVAL
+            if worker.alive and (fresh or worker.ping()):
+                return worker
+            worker.kill()
+        try:
+            return self._start()
+        except WorkerUnavailable:
+            with self._cond:
+                self._count -= 1
+                self._down_until = time.monotonic() + RETRY_SECONDS
+                self._cond.notify()
+            raise
+
+    def _release(self, worker: JvmWorker, healthy: bool, kill: bool = False):
+        with self._cond:
+            if healthy and worker.alive and not self._closed:
+                self._idle.append(worker)
+                worker = None
+            else:
+                self._count -= 1
+            self._cond.notify()
+        if worker is not None and kill:
+            worker.kill()
+        elif worker is not None:
+            worker.close()
+
+    def run(self, args: list[str], timeout: float | None = RUN_TIMEOUT):
+        """Run ``[algorithm, input, output, *params]`` on a pooled worker.
+
+        Raises RuntimeError when SPMF reports an error, WorkerTimeout when
+        the job ran longer than ``timeout`` seconds and WorkerUnavailable
+        when no worker could run the job.
+        """
+        worker = self._acquire()
+        healthy = stuck = False
+        try:
+            worker.run(args, timeout)
+            healthy = True
+        except WorkerUnavailable:
+            raise
+        except WorkerTimeout:
+            stuck = True           # still busy: it would not read a QUIT
+            raise
+        except RuntimeError:
+            healthy = True         # the job failed; the worker answered
+            raise
+        finally:
+            # anything else (e.g. an interrupted wait) leaves an answer in
+            # the pipe, so that worker is dropped
+            self._release(worker, healthy, kill=stuck)
+
+    @property
+    def workers(self) -> int:
+        return self._count
+
+    def shutdown(self):
+        """Stop idle workers now and busy ones when their job ends."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.close()
+
+
+_pool = None
+_pool_version = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(command: list[str], size: int = POOL_SIZE, version=None) -> WorkerPool:
+    """Process-wide pool for ``command``; replaced when the command, the size
+    or ``version`` (e.g. of the jar) changes."""
+    global _pool, _pool_version
+    old = None
+    with _pool_lock:
+        if (
+            _pool is None or _pool.command != list(command)
+            or _pool.size != size or _pool_version != version
+        ):
+            old, _pool, _pool_version = _pool, WorkerPool(command, size), version
+        pool = _pool
+    # jobs already running on the old pool finish there
+    if old is not None:
+        old.shutdown()
+    return pool
+
+
+@atexit.register
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,108 @@
+# components/spmf/parallel_writer.py
+#
+# Multi-process SPMF serialisation. Every sequence is one independent line,
+# so a SequenceDB is cut into contiguous runs of sequences with about the same
+# number of items, each worker process renders one run into a shard file and
+# the shards are concatenated in run order. The result is byte-identical to
+# the single-process writer. One pool of DEFAULT_WORKERS processes is shared
+# by every session; a call's worker count only caps how many shards it cuts.
+# A call whose pool breaks or is shut down under it writes in-process.
+#
+# Only the rendering is parallel. The SequenceDB itself (factorize, sort and
+# encode in SequenceDB.from_frame) is built once in the script process,
+# because the app keeps it for dedup, stats, pruning and the NumPy backend;
+# on large inputs that serial build, not the writing, sets the conversion
+# time (see benchmarks/bench_parallel_writer.py).
+
+import atexit
+import multiprocessing as mp
+import os
+import shutil
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from components.spmf.sequence_db import SequenceDB
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+MIN_SHARD_ITEMS = 1_000_000    # smaller databases are written in-process
+COPY_BUFFER = 16 << 20
+
+_CONTEXT = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(DEFAULT_WORKERS, mp_context=mp.get_context(_CONTEXT))
+        return _pool
+
+
+def _discard(pool: ProcessPoolExecutor):
+    # drop a dead pool; the next call starts a new one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+@atexit.register
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shard_bounds(db: SequenceDB, shards: int) -> np.ndarray:
+    """Sequence positions cutting ``db`` into ``shards`` runs of similar item count."""
+    items_after = db.itemset_offsets[db.sequence_offsets[1:]]
+    targets = db.n_items * np.arange(1, shards) / shards
+    cuts = np.searchsorted(items_after, targets, side="right")
+    return np.unique(np.r_[0, cuts, len(db)])
+
+
+def _write_shard(db: SequenceDB, path: str) -> str:
+    return db.to_spmf(path)
+
+
+def write_parallel(db: SequenceDB, path: str, workers: int = DEFAULT_WORKERS) -> str:
+    """Write ``db`` in the SPMF format in up to ``workers`` shards on the
+    shared pool."""
+    shards = min(workers, DEFAULT_WORKERS, db.n_items // MIN_SHARD_ITEMS)
+    if shards <= 1:
+        return db.to_spmf(path)
+
+    bounds = shard_bounds(db, shards)
+    parts = []
+    for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:])):
+        span = db[int(a):int(b)]
+        # workers only need the items and offsets
+        parts.append((
+            SequenceDB(span.items, span.itemset_offsets, span.sequence_offsets, kind=db.kind),
+            f"{path}.part{i}",
+        ))
+
+    pool = _get_pool()
+    try:
+        futures = [pool.submit(_write_shard, *p) for p in parts]
+        with open(path, "wb") as out:
+            for fut in futures:
+                shard = fut.result()
+                with open(shard, "rb") as f:
+                    shutil.copyfileobj(f, out, COPY_BUFFER)
+    except (BrokenProcessPool, CancelledError):
+        # the pool died or was shut down under this call
+        _discard(pool)
+        return db.to_spmf(path)
+    finally:
+        for _, shard in parts:
+            if os.path.exists(shard):
+                os.remove(shard)
+    return path
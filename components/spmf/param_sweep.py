@@ -0,0 +1,172 @@
+# components/spmf/param_sweep.py
+#
+# Parameter sweeps: one algorithm on one input at several values of one
+# parameter. Every value without a cached result becomes an isolated job on
+# the server-wide sweep queue (job_manager.sweeps), which runs one job per
+# available core apart from background runs; each is held to a time and
+# memory limit and can be cancelled, and the script never waits on them. An isolated job mines in a
+# fresh interpreter, so its peak resident size is that of the run's JVM;
+# in-process backends mine on the job's thread and report no memory. Runs
+# fill the result cache, so a value picked off the curve afterwards loads at
+# once; runs answered from the cache report no time or memory.
+
+import time
+import numpy as np
+import pandas as pd
+
+import components.spmf.algorithm_registry as registry
+import components.spmf.job_manager as jobs
+import components.spmf.result_cache as result_cache
+import components.spmf.spmf_executor as executor
+from components.spmf.sequence_db import SequenceDB
+
+SWEEPABLE = ["min_support", "max_support", "min_conf", "max_pattern_length", "top_k", "k"]
+INT_PARAMS = {"max_pattern_length", "top_k", "k"}
+MAX_VALUES = 50
+
+COLUMNS = ["Patterns", "Runtime (s)", "Peak memory (MB)", "Cached", "Error"]
+
+
+def sweepable(algo_name: str) -> list[str]:
+    params = registry.get_algorithm_parameters(algo_name)
+    return [p for p in SWEEPABLE if p in params]
+
+
+def parse_values(text: str, param: str) -> list:
+    """Values of ``param`` from ``"0.1, 0.2, 0.5"`` or ``"start:stop:count"``
+    (``count`` evenly spaced values, both ends included)."""
+    text = text.strip()
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) != 3:
+            raise ValueError("a range is start:stop:count")
+        values = np.linspace(float(parts[0]), float(parts[1]), int(parts[2])).tolist()
+    else:
+        values = [float(v) for v in text.split(",") if v.strip()]
+    if param in INT_PARAMS:
+        values = [int(round(v)) for v in values]
+    else:
+        values = [round(v, 10) for v in values]
+    values = list(dict.fromkeys(values))
+    if not values:
+        raise ValueError("no values to sweep")
+    if len(values) > MAX_VALUES:
+        raise ValueError(f"at most {MAX_VALUES} values per sweep")
+    return values
+
+
+# ---------- jobs -------------------------------------------------------------
+def _job_row(job: jobs.Job) -> dict:
+    if job.status != jobs.DONE:
+        return {"Cached": False, "Error": job.error or job.status}
+    df = job.result
+    if df.attrs.get("cached"):
+        return {"Patterns": len(df), "Cached": True}
+    peak = job.stats.get("peak_rss")
+    return {
+        "Patterns": len(df),
+        "Runtime (s)": round(job.stats["runtime"], 3),
+        "Peak memory (MB)": round(peak / 1024 ** 2, 1) if peak else None,
+        "Cached": False,
+    }
+
+
+def collect(sweep: dict) -> dict:
+    """Move the rows of finished runs into ``sweep["rows"]`` and drop their
+    jobs from the manager; returns ``sweep``."""
+    for value, job_id in list(sweep["jobs"].items()):
+        job = jobs.sweeps.get(job_id)
+        if job is None:
+            row = {"Cached": False, "Error": "job expired"}
+        elif job.active:
+            continue
+        else:
+            row = _job_row(job)
+            jobs.sweeps.forget(job_id)
+        sweep["rows"][value] = row
+        del sweep["jobs"][value]
+    return sweep
+
+
+def progress(sweep: dict) -> tuple[int, int]:
+    """Finished and total runs of ``sweep``."""
+    running = sum(
+        1 for job_id in sweep["jobs"].values()
+        if (job := jobs.sweeps.get(job_id)) is not None and job.active
+    )
+    total = len(sweep["rows"]) + len(sweep["jobs"])
+    return total - running, total
+
+
+def active(sweep: dict) -> bool:
+    done, total = progress(sweep)
+    return done < total
+
+
+def cancel(sweep: dict):
+    for job_id in sweep["jobs"].values():
+        jobs.sweeps.cancel(job_id)
+
+
+def frame(sweep: dict) -> pd.DataFrame:
+    """One row per value of a finished sweep, sorted by it, with the pattern
+    count, runtime, peak memory, whether the result came from the cache and
+    the error of a failed run."""
+    rows = collect(sweep)["rows"]
+    df = pd.DataFrame.from_dict(rows, orient="index").reindex(columns=COLUMNS)
+    df[COLUMNS[1:3]] = df[COLUMNS[1:3]].astype(float)
+    df.index.name = sweep["param"]
+    return df.sort_index().reset_index()
+
+
+# ---------- public API -------------------------------------------------------
+def start_sweep(
+    algo_name: str,
+    input_file: str,
+    parameters: dict,
+    param: str,
+    values: list,
+    db: SequenceDB | None = None,
+    prune: bool = True,
+    dictionary: pd.DataFrame | None = None,
+    backend: str = "spmf",
+    timeout: float = jobs.DEFAULT_TIMEOUT,
+    memory_mb: int = jobs.DEFAULT_MEMORY_MB,
+) -> dict:
+    """Mine with ``parameters`` and ``param`` set to each of ``values``.
+
+    Values with a cached result are answered here; every other value is
+    queued as an isolated job limited to ``timeout`` seconds and
+    ``memory_mb``. Returns the sweep, ``{"param", "rows", "jobs"}``: rows by
+    value so far and the job id of every value still running.
+    """
+    sweep = {"param": param, "rows": {}, "jobs": {}}
+    for value in values:
+        params = dict(parameters, **{param: value})
+        df = result_cache.load(
+            executor.result_key(algo_name, input_file, params, db, prune, dictionary, backend)
+        )
+        if df is not None:
+            sweep["rows"][value] = {"Patterns": len(df), "Cached": True}
+            continue
+        job = jobs.sweeps.submit(
+            algo_name, input_file, params, db=db, prune=prune, dictionary=dictionary,
+            backend=backend, timeout=timeout, memory_mb=memory_mb, isolated=True,
+        )
+        sweep["jobs"][value] = job.id
+    return sweep
+
+
+def run_sweep(*args, on_result=None, poll: float = jobs.POLL_SECONDS, **kwargs) -> pd.DataFrame:
+    """``start_sweep`` and wait for it; ``on_result(done, total)`` is called
+    as runs finish."""
+    sweep = start_sweep(*args, **kwargs)
+    reported = None
+    while True:
+        done, total = progress(sweep)
+        if on_result is not None and done != reported:
+            on_result(done, total)
+            reported = done
+        if done == total:
+            return frame(sweep)
+        time.sleep(poll)
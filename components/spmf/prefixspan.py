@@ -0,0 +1,160 @@
+# components/spmf/prefixspan.py
+#
+# PrefixSpan in NumPy, run in process on a SequenceDB: no JVM and no input
+# or output file. Projections are pseudo: for every sequence containing the
+# current prefix, the itemset where the prefix's earliest embedding ends.
+# All extensions of a node are counted in one pass over the items from that
+# itemset on. Sequence weights (see SequenceDB.dedup) are counted directly,
+# so deduplicated databases need no recount. The result is the frame
+# parse_sequence_output builds from SPMF PrefixSpan output, with the same
+# patterns and supports. It runs in the server process, so a run that would
+# produce more than MAX_PATTERNS patterns stops with an error instead of
+# filling its memory, and ``check`` is called at every pattern so a job can
+# be cancelled or timed out.
+
+import numpy as np
+import pandas as pd
+
+from components.spmf.sequence_db import SequenceDB, _ranges
+from components.spmf.weighted_support import absolute_support
+
+MAX_PATTERNS = 2_000_000
+
+
+def min_count(min_support: float, total: int) -> int:
+    """SPMF's PrefixSpan threshold: ``ceil(min_support * total)``, at least 1."""
+    return max(absolute_support(min_support, total), 1)
+
+
+class _Index:
+    """Flat view of a database for mining: items sorted and unique within
+    every itemset, items that cannot be frequent left out."""
+
+    def __init__(self, db: SequenceDB, minsup: int):
+        self.weights = (
+            db.weights if db.weights is not None else np.ones(len(db), dtype=np.int64)
+        )
+        itemset = np.repeat(np.arange(db.n_itemsets, dtype=np.int64), db.itemset_lengths())
+        items = db.items.astype(np.int64)
+        support = db.item_support()
+        keep = support[items] >= minsup if len(items) else np.zeros(0, dtype=bool)
+        items, itemset = items[keep], itemset[keep]
+        order = np.lexsort((items, itemset))
+        items, itemset = items[order], itemset[order]
+        first = np.ones(len(items), dtype=bool)
+        first[1:] = (items[1:] != items[:-1]) | (itemset[1:] != itemset[:-1])
+        self.items, self.itemset = items[first], itemset[first]
+        # narrow copy for sorting: NumPy radix-sorts 16-bit keys
+        narrow = len(self.items) == 0 or self.items.max() < np.iinfo(np.int16).max
+        self.sort_items = self.items.astype(np.int16) if narrow else self.items
+        # item range of every itemset, and of every sequence from its start
+        self.item_start = np.searchsorted(self.itemset, np.arange(db.n_itemsets + 1))
+        self.seq_first = db.sequence_offsets[:-1]
+        self.seq_items_end = self.item_start[db.sequence_offsets[1:]]
+
+    def region(self, seqs: np.ndarray, start_itemsets: np.ndarray):
+        """Positions of the items of ``seqs`` from ``start_itemsets`` on and
+        the index into ``seqs`` of each."""
+        starts = self.item_start[start_itemsets]
+        lengths = self.seq_items_end[seqs] - starts
+        pos = _ranges(starts, lengths)
+        return pos, np.repeat(np.arange(len(seqs)), lengths)
+
+
+def _extensions(index: _Index, seqs, local, pos, mask, minsup: int):
+    """Frequent items at ``pos[mask]`` with, for each, the sequences (of
+    ``seqs``) holding it and the first itemset it is in there."""
+    pos, local = pos[mask], local[mask]
+    if len(pos) == 0:
+        return []
+    # positions run by sequence, then itemset; a stable sort by item keeps
+    # that, so the first of every (item, sequence) pair is its earliest
+    order = np.argsort(index.sort_items[pos], kind="stable")
+    pos, local = pos[order], local[order]
+    items = index.items[pos]
+    first = np.ones(len(pos), dtype=bool)
+    first[1:] = (items[1:] != items[:-1]) | (local[1:] != local[:-1])
+    items, seqs, ends = items[first], seqs[local[first]], index.itemset[pos[first]]
+    bounds = np.flatnonzero(np.r_[True, items[1:] != items[:-1], True])
+    support = np.add.reduceat(index.weights[seqs], bounds[:-1])
+    out = []
+    for g in np.flatnonzero(support >= minsup):
+        lo, hi = bounds[g], bounds[g + 1]
+        out.append((int(items[lo]), int(support[g]), seqs[lo:hi], ends[lo:hi]))
+    return out
+
+
+def _holding(its: np.ndarray, member: np.ndarray, size: int) -> np.ndarray:
+    # True at positions whose itemset has ``size`` member items; ``its`` is
+    # non-decreasing, so every itemset is one run of it
+    if len(its) == 0:
+        return member
+    runs = np.flatnonzero(np.r_[True, its[1:] != its[:-1]])
+    counts = np.add.reduceat(member.astype(np.int64), runs)
+    return np.repeat(counts == size, np.diff(np.r_[runs, len(its)]))
+
+
+def _frame(patterns: list) -> pd.DataFrame:
+    # the rows parse_sequence_output reads from SPMF's file
+    rows = []
+    for pid, (pattern, support) in enumerate(patterns, 1):
+        row = {"Pattern ID": pid, "Support": support}
+        for idx, itemset in enumerate(pattern):
+            row[f"Itemset {idx + 1}"] = ", ".join(map(str, itemset))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def prefixspan(
+    db: SequenceDB,
+    min_support: float,
+    max_patterns: int | None = MAX_PATTERNS,
+    check=None,
+) -> pd.DataFrame:
+    """All sequential patterns of ``db`` with (weighted) support of at least
+    ``min_support`` of its sequences, as ``parse_sequence_output`` frames them.
+    Raises ValueError once there are more than ``max_patterns``; ``check()``,
+    called before every pattern is extended, stops the run by raising."""
+    minsup = min_count(min_support, db.total_weight)
+    index = _Index(db, minsup)
+    patterns = []
+
+    seqs = np.arange(len(db), dtype=np.int64)
+    pos, local = index.region(seqs, index.seq_first)
+    stack = [
+        ([(b,)], sup, s, e)
+        for b, sup, s, e in reversed(
+            _extensions(index, seqs, local, pos, np.ones(len(pos), dtype=bool), minsup)
+        )
+    ]
+    while stack:
+        if check is not None:
+            check()
+        pattern, support, seqs, ends = stack.pop()
+        patterns.append((pattern, support))
+        if max_patterns is not None and len(patterns) > max_patterns:
+            raise ValueError(
+                f"more than {max_patterns:,} patterns at min_support={min_support}; "
+                "raise min_support"
+            )
+        last = pattern[-1]
+        pos, local = index.region(seqs, ends)
+        its = index.itemset[pos]
+        items = index.items[pos]
+
+        # s-extensions: a new itemset after the prefix's end
+        later = its > ends[local]
+        # i-extensions: a larger item in an itemset holding the whole last
+        # itemset, from the prefix's end on
+        member = np.isin(items, last) if len(last) > 1 else items == last[0]
+        grow = _holding(its, member, len(last)) & (items > last[-1])
+
+        children = [
+            (pattern[:-1] + [last + (b,)], sup, s, e)
+            for b, sup, s, e in _extensions(index, seqs, local, pos, grow, minsup)
+        ] + [
+            (pattern + [(b,)], sup, s, e)
+            for b, sup, s, e in _extensions(index, seqs, local, pos, later, minsup)
+        ]
+        stack.extend(reversed(children))
+    return _frame(patterns)
@@ -0,0 +1,49 @@
+# components/spmf/result_cache.py
+#
+# Parsed mining results kept on disk between runs and restarts. A result is
+# stored once per key (see spmf_executor.result_key: input content,
+# algorithm, ordered parameters, jar version) as a Parquet file in its own
+# artifact store, so a repeated run reads a compact columnar file instead of
+# running, parsing and recounting again. The store keeps itself under
+# RESULT_QUOTA_BYTES by dropping the least recently used results. Without
+# pyarrow nothing is cached.
+
+import os
+import tempfile
+import pandas as pd
+
+from components.artifact_store import ArtifactStore
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+RESULT_DIR = os.path.join(tempfile.gettempdir(), "spmavis_results")
+RESULT_QUOTA_BYTES = 512 * 1024 ** 2
+SUFFIX = ".parquet"
+
+store = ArtifactStore(RESULT_DIR, RESULT_QUOTA_BYTES)
+
+
+def load(key: str) -> pd.DataFrame | None:
+    """Cached result ``key`` or None."""
+    if not HAS_PARQUET:
+        return None
+    path = store.get(key, SUFFIX)
+    if path is None:
+        return None
+    try:
+        df = pd.read_parquet(path)
+        # last use survives restarts through the file time
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return df
+
+
+def save(key: str, df: pd.DataFrame):
+    """Keep ``df`` (and its ``attrs``) as result ``key``."""
+    if HAS_PARQUET:
+        store.get_or_create(key, lambda path: df.to_parquet(path, index=False), SUFFIX)
@@ -0,0 +1,426 @@
+# components/spmf/sequence_db.py
+#
+# Compressed sequence database. All item ids live in one flat int32 array;
+# ``itemset_offsets`` delimits the itemsets inside it and
+# ``sequence_offsets`` the sequences in terms of itemsets (CSR layout). The
+# SPMF text file is just one serialisation of it, written on demand.
+
+import numpy as np
+import pandas as pd
+from components.artifact_store import content_key, store
+from components.spmf.spmf_writer import (
+    WRITE_BUFFER,
+    encode_items,
+    flatten_rows,
+    render,
+    sequence_ends,
+    sequence_layout,
+    transaction_ends,
+)
+
+PREVIEW_SEQUENCES = 10
+
+_SPMF_COMMENTS = ("#", "%", "@")
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    out = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=out[1:])
+    return out
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    # splitmix64 finaliser, wrapping uint64 arithmetic
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    # concatenation of arange(s, s + n) for every (s, n)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    shift = starts - _offsets(lengths)[:-1]
+    return np.repeat(shift, lengths) + np.arange(total, dtype=np.int64)
+
+
+class SequenceDB:
+    """Sequences of itemsets of integer item ids.
+
+    ``kind`` is ``"sequence"`` (SPMF sequence format) or ``"transaction"``
+    (one itemset per sequence, one line each). ``groups`` holds one key per
+    sequence and ``times`` one timestamp per itemset; both are optional.
+    ``weights``, when set, is the multiplicity of every sequence (see
+    ``dedup``); supports then count each sequence that many times.
+    """
+
+    def __init__(
+        self,
+        items: np.ndarray,
+        itemset_offsets: np.ndarray,
+        sequence_offsets: np.ndarray,
+        groups: np.ndarray | None = None,
+        times: np.ndarray | None = None,
+        kind: str = "sequence",
+        weights: np.ndarray | None = None,
+    ):
+        self.items = np.asarray(items, dtype=np.int32)
+        self.itemset_offsets = np.asarray(itemset_offsets, dtype=np.int64)
+        self.sequence_offsets = np.asarray(sequence_offsets, dtype=np.int64)
+        self.groups = groups
+        self.times = times
+        self.kind = kind
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.int64)
+        self._fingerprint = None
+
+    # ---------- construction -------------------------------------------------
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        item_cols: list[str],
+        items,
+        group_col: str = "groupid",
+        time_col: str | None = None,
+        skip_empty: bool = True,
+    ) -> "SequenceDB":
+        """One sequence per ``group_col`` value, one itemset per row."""
+        rows, flat, counts, starts = sequence_layout(
+            df, item_cols, items, group_col, time_col, skip_empty
+        )
+        groups = df[group_col].to_numpy()[rows[starts]]
+        times = df[time_col].to_numpy()[rows] if time_col else None
+        return cls(
+            flat, _offsets(counts), np.r_[starts, len(counts)], groups, times
+        )
+
+    @classmethod
+    def from_transactions(cls, df: pd.DataFrame, item_cols: list[str], items) -> "SequenceDB":
+        """One single-itemset sequence per row with any known item."""
+        ids = encode_items(df, item_cols, items)
+        keep = (ids >= 0).any(axis=1)
+        flat, counts = flatten_rows(ids)
+        return cls(
+            flat,
+            _offsets(counts),
+            np.arange(len(counts) + 1, dtype=np.int64),
+            groups=df.index.to_numpy()[keep],
+            kind="transaction",
+        )
+
+    @classmethod
+    def from_spmf(cls, path: str) -> "SequenceDB":
+        """Parse an SPMF sequence or transaction file.
+
+        An empty itemset at the end of a sequence reads the same as the
+        standard ``-1 -2`` terminator and is not restored.
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls.from_lines(f)
+
+    @classmethod
+    def from_lines(cls, lines) -> "SequenceDB":
+        lines = [ln for ln in lines if ln.strip() and not ln.startswith(_SPMF_COMMENTS)]
+        tokens = np.array(" ".join(lines).split(), dtype=np.int64)
+
+        if not (tokens == -2).any():
+            counts = np.fromiter(
+                (len(ln.split()) for ln in lines), dtype=np.int64, count=len(lines)
+            )
+            return cls(
+                tokens, _offsets(counts), np.arange(len(counts) + 1), kind="transaction"
+            )
+
+        # -1 closes an itemset; -2 closes the last itemset of a sequence
+        # unless it directly follows a -1
+        after_sep = np.r_[False, tokens[:-1] == -1]
+        closes = (tokens == -1) | ((tokens == -2) & ~after_sep)
+        is_item = tokens >= 0
+        items_before = np.cumsum(is_item)[closes]
+        closed_before = np.cumsum(closes)[tokens == -2]
+        return cls(
+            tokens[is_item], np.r_[0, items_before], np.r_[0, closed_before]
+        )
+
+    # ---------- size ---------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.sequence_offsets) - 1
+
+    @property
+    def n_itemsets(self) -> int:
+        return len(self.itemset_offsets) - 1
+
+    @property
+    def n_items(self) -> int:
+        return len(self.items)
+
+    @property
+    def total_weight(self) -> int:
+        """Number of sequences the database stands for."""
+        return len(self) if self.weights is None else int(self.weights.sum())
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.total_weight / max(len(self), 1)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (
+            self.items, self.itemset_offsets, self.sequence_offsets, self.times, self.weights
+        )
+        own = sum(a.nbytes for a in arrays if a is not None)
+        if self.groups is not None:
+            own += int(pd.Series(self.groups).memory_usage(index=False, deep=True))
+        return own
+
+    def itemset_lengths(self) -> np.ndarray:
+        return np.diff(self.itemset_offsets)
+
+    def sequence_lengths(self) -> np.ndarray:
+        """Number of itemsets in every sequence."""
+        return np.diff(self.sequence_offsets)
+
+    def sequence_of_item(self) -> np.ndarray:
+        """Sequence index of every entry in ``items``."""
+        per_seq = np.diff(self.itemset_offsets[self.sequence_offsets])
+        return np.repeat(np.arange(len(self), dtype=np.int64), per_seq)
+
+    # ---------- slicing ------------------------------------------------------
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.sequence(int(key))
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return self._span(start, max(start, stop))
+            return self.take(np.arange(start, stop, step))
+        return self.take(key)
+
+    def sequence(self, i: int) -> list[np.ndarray]:
+        """Itemsets of sequence ``i`` as a list of id arrays."""
+        if i < 0:
+            i += len(self)
+        s0, s1 = self.sequence_offsets[i], self.sequence_offsets[i + 1]
+        bounds = self.itemset_offsets[s0:s1 + 1]
+        return [self.items[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def _span(self, start: int, stop: int) -> "SequenceDB":
+        # contiguous sequences: item data is a view, offsets are rebased
+        s0, s1 = self.sequence_offsets[start], self.sequence_offsets[stop]
+        i0, i1 = self.itemset_offsets[s0], self.itemset_offsets[s1]
+        return SequenceDB(
+            self.items[i0:i1],
+            self.itemset_offsets[s0:s1 + 1] - i0,
+            self.sequence_offsets[start:stop + 1] - s0,
+            None if self.groups is None else self.groups[start:stop],
+            None if self.times is None else self.times[s0:s1],
+            self.kind,
+            None if self.weights is None else self.weights[start:stop],
+        )
+
+    def take(self, indices) -> "SequenceDB":
+        """Sequences at ``indices`` (positions or a boolean mask), in that order."""
+        idx = np.asarray(indices)
+        if idx.dtype == bool:
+            idx = np.flatnonzero(idx)
+        idx = idx.astype(np.int64)
+        s0, s1 = self.sequence_offsets[idx], self.sequence_offsets[idx + 1]
+        itemsets = _ranges(s0, s1 - s0)
+        i0, i1 = self.itemset_offsets[itemsets], self.itemset_offsets[itemsets + 1]
+        return SequenceDB(
+            self.items[_ranges(i0, i1 - i0)],
+            _offsets(i1 - i0),
+            _offsets(s1 - s0),
+            None if self.groups is None else self.groups[idx],
+            None if self.times is None else self.times[itemsets],
+            self.kind,
+            None if self.weights is None else self.weights[idx],
+        )
+
+    def drop_items(self, drop) -> "SequenceDB":
+        """Database without the item ids in ``drop``.
+
+        Itemsets left empty are removed, and so are sequences left empty.
+        """
+        keep = ~np.isin(self.items, np.asarray(drop, dtype=np.int32))
+        itemset_of_item = np.repeat(np.arange(self.n_itemsets), self.itemset_lengths())
+        set_len = np.bincount(itemset_of_item[keep], minlength=self.n_itemsets)
+        kept_sets = set_len > 0
+        seq_of_set = np.repeat(np.arange(len(self)), self.sequence_lengths())
+        seq_len = np.bincount(seq_of_set[kept_sets], minlength=len(self))
+        kept_seqs = seq_len > 0
+        return SequenceDB(
+            self.items[keep],
+            _offsets(set_len[kept_sets]),
+            _offsets(seq_len[kept_seqs]),
+            None if self.groups is None else self.groups[kept_seqs],
+            None if self.times is None else self.times[kept_sets],
+            self.kind,
+            None if self.weights is None else self.weights[kept_seqs],
+        )
+
+    def head(self, n: int = PREVIEW_SEQUENCES) -> "SequenceDB":
+        return self[:n]
+
+    def sample(self, n: int, seed: int | None = None) -> "SequenceDB":
+        """``n`` sequences drawn without replacement, kept in database order."""
+        n = min(n, len(self))
+        rng = np.random.default_rng(seed)
+        return self.take(np.sort(rng.choice(len(self), size=n, replace=False)))
+
+    # ---------- duplicates ---------------------------------------------------
+    def _token_stream(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # items with a -1 after every itemset, plus start and length of every
+        # sequence in it; equal sequences have equal token runs
+        lengths = self.itemset_lengths()
+        n_sets = self.n_itemsets
+        stream = np.empty(self.n_items + n_sets, dtype=np.int64)
+        stream[np.arange(self.n_items) + np.repeat(np.arange(n_sets), lengths)] = self.items
+        stream[self.itemset_offsets[1:] + np.arange(n_sets)] = -1
+        bounds = self.itemset_offsets[self.sequence_offsets] + self.sequence_offsets
+        return stream, bounds[:-1], np.diff(bounds)
+
+    def _duplicate_labels(self) -> np.ndarray:
+        """Label per sequence; two sequences share a label iff they are equal."""
+        stream, starts, lengths = self._token_stream()
+        pos = np.arange(len(stream), dtype=np.int64) - np.repeat(starts, lengths)
+        token_hash = _mix(_mix(pos.astype(np.uint64)) ^ (stream + 2).astype(np.uint64))
+        seq_hash = np.add.reduceat(token_hash, starts) ^ _mix(lengths.astype(np.uint64))
+        _, first, labels = np.unique(seq_hash, return_index=True, return_inverse=True)
+        labels = labels.ravel()
+
+        # confirm every hash match token by token; collisions get own labels
+        rep = first[labels]
+        dup = np.flatnonzero(rep != np.arange(len(self)))
+        bad = dup[lengths[dup] != lengths[rep[dup]]]
+        same = dup[lengths[dup] == lengths[rep[dup]]]
+        if len(same):
+            a = stream[_ranges(starts[same], lengths[same])]
+            b = stream[_ranges(starts[rep[same]], lengths[same])]
+            differs = np.logical_or.reduceat(a != b, _offsets(lengths[same])[:-1])
+            bad = np.r_[bad, same[differs]]
+        if len(bad):
+            seen = {}
+            for i in np.sort(bad):
+                key = stream[starts[i]:starts[i] + lengths[i]].tobytes()
+                labels[i] = seen.setdefault(key, len(first) + len(seen))
+        return labels
+
+    def dedup(self) -> "SequenceDB":
+        """One copy of every distinct sequence, weighted by its multiplicity.
+
+        Copies keep the position, group key and times of their first
+        occurrence; existing weights are summed.
+        """
+        if len(self) == 0:
+            return self
+        labels = self._duplicate_labels()
+        weights = np.bincount(
+            labels, weights=self.weights if self.weights is not None else None
+        ).astype(np.int64)
+        _, first = np.unique(labels, return_index=True)
+        keep = np.sort(first)
+        out = self.take(keep)
+        out.weights = weights[labels[keep]]
+        return out
+
+    def expand(self) -> "SequenceDB":
+        """Database with every sequence repeated ``weights`` times."""
+        if self.weights is None:
+            return self
+        out = self.take(np.repeat(np.arange(len(self)), self.weights))
+        out.weights = None
+        return out
+
+    # ---------- statistics ---------------------------------------------------
+    def item_support(self) -> np.ndarray:
+        """(Weighted) number of sequences containing each item id, indexed by id."""
+        if self.n_items == 0:
+            return np.zeros(0, dtype=np.int64)
+        width = int(self.items.max()) + 1
+        pairs = np.unique(self.sequence_of_item() * width + self.items)
+        w = None if self.weights is None else self.weights[pairs // width]
+        return np.bincount(pairs % width, weights=w, minlength=width).astype(np.int64)
+
+    def stats(self) -> dict:
+        seq_len = self.sequence_lengths()
+        set_len = self.itemset_lengths()
+        return {
+            "Sequences": len(self),
+            "Itemsets": self.n_itemsets,
+            "Items": self.n_items,
+            "Distinct items": int(np.count_nonzero(self.item_support())),
+            "Avg itemsets / sequence": float(seq_len.mean()) if len(seq_len) else 0.0,
+            "Max itemsets / sequence": int(seq_len.max(initial=0)),
+            "Avg items / itemset": float(set_len.mean()) if len(set_len) else 0.0,
+            "Max items / itemset": int(set_len.max(initial=0)),
+            "Memory (MB)": self.nbytes / 1024 ** 2,
+            "Represented sequences": self.total_weight,
+            "Compression ratio": self.compression_ratio,
+        }
+
+    # ---------- serialisation ------------------------------------------------
+    def write(self, f):
+        counts = self.itemset_lengths()
+        if self.kind == "transaction":
+            ends = transaction_ends(counts)
+        else:
+            ends = sequence_ends(counts, self.sequence_offsets[:-1])
+        render(f, self.items, counts, ends)
+
+    def to_spmf(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+            self.write(f)
+        return path
+
+    def fingerprint(self) -> str:
+        """Hash of everything that ends up in the SPMF file.
+
+        Computed once; databases are not modified after they are built.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = content_key(
+                "SequenceDB", self.kind, self.items, self.itemset_offsets,
+                self.sequence_offsets, self.weights,
+            )
+        return self._fingerprint
+
+    def save(self, write=None) -> str:
+        """Path of this database's SPMF file in the artifact store.
+
+        The file is written (by ``write(path)``, default ``to_spmf``) only if
+        no identical database was saved before.
+        """
+        return store.get_or_create(self.fingerprint(), write or self.to_spmf)
+
+    def to_frame(self, labels: np.ndarray | None = None, first_id: int = 1) -> pd.DataFrame:
+        """Wide preview frame; meant for a few sequences, e.g. ``head()``.
+
+        ``labels`` is an id -> text table such as ``ItemEncoder.label_table()``
+        and ``first_id`` the number shown for the first sequence.
+        """
+        def _text(ids):
+            if labels is None:
+                return " ".join(map(str, ids.tolist()))
+            return ", ".join(labels[ids])
+
+        if self.kind == "transaction":
+            return pd.DataFrame({
+                "Transaction ID": np.arange(first_id, first_id + len(self)),
+                "Transaction": [_text(s[0]) for s in map(self.sequence, range(len(self)))],
+            })
+        rows = []
+        for i in range(len(self)):
+            row = {"Sequence ID": first_id + i}
+            row.update({f"Itemset {j + 1}": _text(s) for j, s in enumerate(self.sequence(i))})
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def __repr__(self) -> str:
+        return (
+            f"SequenceDB(kind={self.kind!r}, sequences={len(self)}, "
+            f"itemsets={self.n_itemsets}, items={self.n_items})"
+        )
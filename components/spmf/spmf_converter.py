@@ -1,86 +1,69 @@
 # components/spmf/spmf_converter.py
 import pandas as pd
 import numpy as np
-import tempfile
 from pathlib import Path
 import components.state_manager as state
-
-BLOCK_SIZE = 100
-
+from components.spmf.item_encoder import ItemEncoder
+from components.spmf.sequence_db import SequenceDB
+from components.spmf.spmf_preview import read_page
+from components.time_grouping import day_number, daily_groupid, parse_datetime, session_groupid
 
 # ---------- helpers ----------------------------------------------------------
-def _tmp_path(suffix: str = ".txt") -> str:
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-    tmp.close()
-    return tmp.name
-
-
 def _parse_time(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
-    df["date_and_time"] = pd.to_datetime(
-        df["date_and_time"],
-        format="%m/%d/%Y %I:%M:%S %p",
-        errors="coerce",
-    )
-    df["dategroup"] = df["date_and_time"].dt.strftime("%Y%m%d")
+    df["date_and_time"] = parse_datetime(df["date_and_time"], "%m/%d/%Y %I:%M:%S %p")
+    df["dategroup"] = day_number(df["date_and_time"])
     return df
 
 
 # ---------- common dictionary builder ---------------------------------------
-def build_dictionary(df: pd.DataFrame, item_cols: list[str]) -> tuple[pd.DataFrame, dict]:
-    offsets = {col: (i + 1) * BLOCK_SIZE for i, col in enumerate(item_cols)}
-    item2id, dict_rows = {}, []
-    for col in item_cols:
-        base = offsets[col]
-        for idx, val in enumerate(sorted(df[col].dropna().unique())):
-            iid = base + idx
-            item2id[(col, val)] = iid
-            dict_rows.append({"Column": col, "Value": val, "ID": iid})
-    return pd.DataFrame(dict_rows), item2id
+def build_dictionary(df: pd.DataFrame, item_cols: list[str]) -> tuple[pd.DataFrame, ItemEncoder]:
+    encoder = ItemEncoder.fit(df, item_cols)
+    return encoder.to_frame(), encoder
 
 
 # ---------- writers ---------------------------------------------------------
-def write_sequence_file(df: pd.DataFrame, item_cols: list[str], item2id: dict) -> str:
-    path = _tmp_path()
-    with open(path, "w", encoding="utf-8") as f:
-        for _, grp in df.groupby("groupid"):
-            grp = grp.sort_values("date_and_time")
-            seq = [
-                " ".join(
-                    str(item2id[(c, v)]) for c, v in row[item_cols].items()
-                    if pd.notna(v) and (c, v) in item2id
-                )
-                for _, row in grp.iterrows()
-            ]
-            f.write(" -1 ".join(seq) + " -2\n")
-    return path
-
-
-def write_transaction_file(df: pd.DataFrame, item_cols: list[str], item2id: dict) -> str:
-    path = _tmp_path()
-    with open(path, "w", encoding="utf-8") as f:
-        for _, row in df.iterrows():
-            ids = [str(item2id[(c, row[c])]) for c in item_cols if (c, row[c]) in item2id]
-            if ids:
-                f.write(" ".join(ids) + "\n")
-    return path
+def write_sequence_file(df: pd.DataFrame, item_cols: list[str], encoder: ItemEncoder) -> str:
+    return SequenceDB.from_frame(
+        df, item_cols, encoder, time_col="date_and_time", skip_empty=False
+    ).save()
+
+
+def write_transaction_file(df: pd.DataFrame, item_cols: list[str], encoder: ItemEncoder) -> str:
+    return SequenceDB.from_transactions(df, item_cols, encoder).save()
 
 
 # ---------- converters for UI ------------------------------------------------
-def sequence_converter(df: pd.DataFrame, time_col: str, fmt: str, group_col: str, item_cols: list, bins_conf: dict):
+def sequence_converter(
+    df: pd.DataFrame,
+    time_col: str,
+    fmt: str,
+    group_col: str,
+    item_cols: list,
+    bins_conf: dict,
+    session_gap: pd.Timedelta | None = None,
+):
+    """Convert ``df`` to an SPMF sequence file.
+
+    Sequences are one ``group_col`` value per calendar day, or per session
+    split at gaps longer than ``session_gap`` when it is given.
+    """
     df = df.copy()
-    df[time_col] = pd.to_datetime(df[time_col], format=fmt, errors="coerce")
-    df["dategroup"] = df[time_col].dt.strftime("%Y%m%d")
-    df["groupid"] = df[group_col].astype(str) + "_" + df["dategroup"]
+    df[time_col] = parse_datetime(df[time_col], fmt)
+    df["dategroup"] = day_number(df[time_col])
+    if session_gap is None:
+        df["groupid"] = daily_groupid(df, group_col, time_col)
+    else:
+        df["groupid"] = session_groupid(df, group_col, time_col, session_gap)
 
     for c, conf in bins_conf.items():
         df[c] = pd.cut(df[c], bins=conf["bins"], labels=conf["labels"], include_lowest=True).astype(str)
 
     df = df.dropna(subset=item_cols)
-    dict_df, item2id = build_dictionary(df, item_cols)
-    file_path = write_sequence_file(df, item_cols, item2id)
-    spmf_df = _sequence_to_df(file_path)
-    return file_path, dict_df, spmf_df
+    dict_df, encoder = build_dictionary(df, item_cols)
+    db = SequenceDB.from_frame(df, item_cols, encoder, time_col=time_col, skip_empty=False)
+    file_path = db.save()
+    return file_path, dict_df, db
 
 
 def transaction_converter(df: pd.DataFrame, item_cols: list, bins_conf: dict):
@@ -89,20 +72,7 @@ def transaction_converter(df: pd.DataFrame, item_cols: list, bins_conf: dict):
         df[c] = pd.cut(df[c], bins=conf["bins"], labels=conf["labels"], include_lowest=True).astype(str)
 
     df = df.dropna(subset=item_cols)
-    dict_df, item2id = build_dictionary(df, item_cols)
-    file_path = write_transaction_file(df, item_cols, item2id)
-    trx_df = pd.read_csv(file_path, header=None, names=["Transaction"])
-    return file_path, dict_df, trx_df
-
-
-# ---------- util -------------------------------------------------------------
-def _sequence_to_df(spmf_file_path: str) -> pd.DataFrame:
-    rows = []
-    with open(spmf_file_path, "r", encoding="utf-8") as f:
-        for sid, line in enumerate(f, 1):
-            parts = line.strip().split("-2")[0].strip().split(" -1 ")
-            row = {"Sequence ID": sid}
-            for idx, itemset in enumerate(parts):
-                row[f"Itemset {idx + 1}"] = itemset.replace(" ", ", ")
-            rows.append(row)
-    return pd.DataFrame(rows)
\ No newline at end of file
+    dict_df, encoder = build_dictionary(df, item_cols)
+    file_path = write_transaction_file(df, item_cols, encoder)
+    return file_path, dict_df, read_page(file_path)
+
@@ -1,11 +1,19 @@
 # components/spmf/executor.py
+import os
 import subprocess
-import tempfile
+import numpy as np
 import pandas as pd
 
 import components.spmf.algorithm_registry as registry
 import components.spmf.spmf_parser as parser
 import components.state_manager as state
+import components.spmf.weighted_support as weighted
+import components.spmf.item_pruning as item_pruning
+import components.spmf.jvm_worker as jvm_worker
+import components.spmf.result_cache as result_cache
+import components.spmf.prefixspan as prefixspan
+from components.spmf.sequence_db import SequenceDB
+from components.artifact_store import content_key, store
 
 
 # ------------- helper --------------------------------------------------------
@@ -17,6 +25,35 @@ _SEQ_ALGOS = {
 
 _RULE_ALGOS = {"TopKClassRules"}
 
+# all-frequent, closed and generator miners: their output on the distinct
+# sequences of a deduplicated database, recounted with weights, equals their
+# output on the full database. Anything else runs on the expanded database,
+# as do runs whose lowered threshold would be only a few distinct sequences.
+_RECOUNT_ALGOS = {
+    "PrefixSpan", "GSP", "SPADE", "CM-SPADE", "SPAM", "CM-SPAM", "LAPIN",
+    "ClaSP", "CM-ClaSP", "CloSpan", "BIDE+", "FEAT", "FSGP", "VGEN",
+}
+
+_PRUNE_PARAMS = {"min_support", "max_pattern_length"}
+
+JAR_PATH = "components/spmf/spmf.jar"
+
+# in-process engines by (algorithm, backend); called as
+# engine(db, parameters, check), check as for prefixspan.prefixspan
+_NATIVE_ENGINES = {
+    ("PrefixSpan", "numpy"): lambda db, params, check: prefixspan.prefixspan(
+        db, float(params["min_support"]), check=check
+    ),
+}
+
+
+def jar_version() -> tuple:
+    try:
+        st = os.stat(JAR_PATH)
+    except OSError:
+        return ()
+    return st.st_size, st.st_mtime_ns
+
 
 def _generate_command(algo_name: str, input_file: str, output_file: str, params: dict) -> list[str]:
     algo_id = registry.get_algorithm_id(algo_name)
@@ -30,25 +67,199 @@ def _generate_command(algo_name: str, input_file: str, output_file: str, params:
         if val is not None:
             param_list.append(str(val))
 
-    return ["java", "-jar", "components/spmf/spmf.jar", "run", algo_id, input_file, output_file] + param_list
+    return ["java", "-jar", JAR_PATH, "run", algo_id, input_file, output_file] + param_list
 
 
-# ------------- public API ----------------------------------------------------
-def run_spmf(algo_name: str, input_file: str, parameters: dict) -> pd.DataFrame:
-    tmp_out = tempfile.NamedTemporaryFile(delete=False, suffix=".txt", mode="w", encoding="utf-8")
-    output_path = tmp_out.name
-    tmp_out.close()
+def _prunable(algo_name: str) -> bool:
+    # plain min_support miners; top-k, max_support and rule miners keep
+    # their input as is
+    params = set(registry.get_algorithm_parameters(algo_name))
+    return algo_name in _SEQ_ALGOS and params <= _PRUNE_PARAMS
+
+
+def _prepare_input(
+    algo_name: str, input_file: str, parameters: dict, db: SequenceDB | None, prune: bool
+):
+    """Input file and parameters to run with, the weighted support target to
+    recount against (or None), the database behind the file and the pruned
+    item ids."""
+    pruned = np.zeros(0, dtype=np.int64)
+    if db is None:
+        return input_file, parameters, None, db, pruned
+
+    recount = db.weights is not None and algo_name in _RECOUNT_ALGOS
+    rewrite = db.weights is not None and not recount
+    if rewrite:
+        db = db.expand()
+
+    minsup = parameters.get("min_support")
+    target = None
+    if minsup is not None:
+        target = weighted.absolute_support(float(minsup), db.total_weight)
+        if prune and _prunable(algo_name):
+            db, pruned = item_pruning.prune(db, target)
+            rewrite = rewrite or len(pruned) > 0
+        if recount and len(db) and weighted.loose_on_distinct(db, target):
+            db, recount, rewrite = db.expand(), False, True
+        if (recount or len(pruned)) and len(db):
+            parameters = dict(parameters, min_support=weighted.distinct_minsup(db, target))
+
+    if rewrite:
+        input_file = db.save()
+    return input_file, parameters, target if recount else None, db, pruned
+
+
+def _ordered_params(algo_name: str, parameters: dict) -> list:
+    return [
+        (key, parameters.get(key)) for key in registry.get_algorithm_parameters(algo_name)
+    ]
 
-    cmd = _generate_command(algo_name, input_file, output_path, parameters)
 
+def output_key(algo_name: str, input_file: str, parameters: dict) -> str:
+    """Artifact key of a run: input content, algorithm, ordered parameters, jar."""
+    return content_key(
+        "output", store.file_key(input_file), registry.get_algorithm_id(algo_name),
+        _ordered_params(algo_name, parameters), jar_version(),
+    )
+
+
+def result_key(
+    algo_name: str,
+    input_file: str,
+    parameters: dict,
+    db: SequenceDB | None = None,
+    prune: bool = True,
+    dictionary: pd.DataFrame | None = None,
+    backend: str = "spmf",
+) -> str:
+    """Result cache key of a ``mine`` call: what ``output_key`` covers for
+    the input as given, plus the database, pruning, (for rules) the
+    dictionary the parsed frame depends on and the backend."""
+    labels = None
+    if algo_name in _RULE_ALGOS and dictionary is not None:
+        labels = pd.util.hash_pandas_object(dictionary, index=False).to_numpy()
+    return content_key(
+        "result", store.file_key(input_file), registry.get_algorithm_id(algo_name),
+        _ordered_params(algo_name, parameters), jar_version(),
+        None if db is None else db.fingerprint(), bool(prune), labels, backend,
+    )
+
+
+def worker_pool() -> jvm_worker.WorkerPool:
+    return jvm_worker.get_pool(jvm_worker.java_command(JAR_PATH), version=jar_version())
+
+
+def _run_jar(
+    algo_name: str, input_file: str, output_path: str, parameters: dict, use_worker: bool = True
+):
+    cmd = _generate_command(algo_name, input_file, output_path, parameters)
+    if use_worker:
+        try:
+            worker_pool().run(cmd[4:])
+            return
+        except jvm_worker.WorkerUnavailable:
+            pass                    # cold start below
     proc = subprocess.run(cmd, capture_output=True, text=True)
     if proc.returncode != 0:
         raise RuntimeError(f"SPMF Error: {proc.stderr}")
 
-    if algo_name in _RULE_ALGOS:
-        df_result = parser.parse_rule_output(output_path, state.get("spmf_dictionary"))
+
+# ------------- public API ----------------------------------------------------
+def mine(
+    algo_name: str,
+    input_file: str,
+    parameters: dict,
+    db: SequenceDB | None = None,
+    prune: bool = True,
+    use_worker: bool = True,
+    run=None,
+    dictionary: pd.DataFrame | None = None,
+    cache: bool = True,
+    backend: str = "spmf",
+    check=None,
+) -> pd.DataFrame:
+    """``run_spmf`` without touching session state, so it can run off the
+    script thread. ``run(cmd, output_path)``, when given, executes the SPMF
+    command line instead of the worker pool or a plain subprocess; in-process
+    backends call ``check()`` as they go, which stops them by raising;
+    ``dictionary`` labels the items of rule output. With ``cache`` a result
+    parsed before for the same inputs is returned from the result cache,
+    marked with ``result.attrs["cached"]``. ``backend`` is one of
+    ``registry.get_algorithm_backends(algo_name)``."""
+    if backend not in registry.get_algorithm_backends(algo_name):
+        raise ValueError(f"Algorithm {algo_name} has no {backend} backend")
+    key = None
+    if cache:
+        key = result_key(algo_name, input_file, parameters, db, prune, dictionary, backend)
+        df_cached = result_cache.load(key)
+        if df_cached is not None:
+            df_cached.attrs["cached"] = True
+            return df_cached
+
+    if backend != "spmf":
+        # in process on the database itself; nothing to prune or recount
+        engine = _NATIVE_ENGINES[(algo_name, backend)]
+        df_result = engine(
+            db if db is not None else SequenceDB.from_spmf(input_file), parameters, check
+        )
+        df_result.attrs["pruned_items"] = []
+        if key is not None:
+            result_cache.save(key, df_result)
+        return df_result
+
+    input_file, parameters, target, db, pruned = _prepare_input(
+        algo_name, input_file, parameters, db, prune
+    )
+
+    if db is not None and len(db) == 0:
+        df_result = pd.DataFrame(columns=["Pattern ID", "Support"])
     else:
-        df_result = parser.parse_sequence_output(output_path)
+        if run is None:
+            def write(path):
+                _run_jar(algo_name, input_file, path, parameters, use_worker)
+        else:
+            def write(path):
+                run(_generate_command(algo_name, input_file, path, parameters), path)
+        output_path = store.get_or_create(output_key(algo_name, input_file, parameters), write)
+
+        if algo_name in _RULE_ALGOS:
+            df_result = parser.parse_rule_output(output_path, dictionary)
+        else:
+            df_result = parser.parse_sequence_output(output_path)
+            if target is not None:
+                df_result = weighted.recount(df_result, db, target)
+
+    df_result.attrs["pruned_items"] = pruned.tolist()
+    if key is not None:
+        result_cache.save(key, df_result)
+    return df_result
+
+
+def run_spmf(
+    algo_name: str,
+    input_file: str,
+    parameters: dict,
+    db: SequenceDB | None = None,
+    prune: bool = True,
+    use_worker: bool = True,
+    cache: bool = True,
+    backend: str = "spmf",
+) -> pd.DataFrame:
+    """Run ``algo_name`` on ``input_file``.
 
+    ``db`` is the SequenceDB the file was written from. With it, items that
+    cannot reach ``min_support`` are pruned from the input first (``prune``)
+    and supports of a deduplicated database are made exact for the full one.
+    The pruned item ids are kept in ``result.attrs["pruned_items"]``.
+    With ``use_worker`` the job goes to a warm pooled JVM when one can be
+    had, else to a fresh ``java -jar``. With ``cache`` a repeated run is
+    answered from the on-disk result cache. A ``backend`` other than
+    "spmf" mines in process, on ``db`` or on the database read back from
+    ``input_file``.
+    """
+    df_result = mine(
+        algo_name, input_file, parameters, db, prune, use_worker,
+        dictionary=state.get("spmf_dictionary"), cache=cache, backend=backend,
+    )
     state.set("spmf_output_data", df_result)
-    return df_result
\ No newline at end of file
+    return df_result
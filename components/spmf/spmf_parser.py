@@ -1,5 +1,6 @@
 # components/spmf/spmf_parser.py
 import pandas as pd
+from components.spmf.item_encoder import ItemEncoder
 
 
 def parse_sequence_output(file_path: str) -> pd.DataFrame:
@@ -24,7 +25,13 @@ def parse_sequence_output(file_path: str) -> pd.DataFrame:
 
 
 def parse_rule_output(file_path: str, dict_df: pd.DataFrame) -> pd.DataFrame:
-    id_info = dict_df.set_index("ID")[["Column", "Value"]].to_dict("index")
+    labels = ItemEncoder.from_frame(dict_df).label_table()
+
+    def _ids_to_str(token: str):
+        return " & ".join(
+            labels[int(i)] if 0 <= int(i) < len(labels) else i
+            for i in token.strip().split()
+        )
 
     rows = []
     with open(file_path, "r", encoding="utf-8") as f:
@@ -33,13 +40,6 @@ def parse_rule_output(file_path: str, dict_df: pd.DataFrame) -> pd.DataFrame:
             rhs, sup_conf = rhs_sup.split(" #SUP: ")
             sup_txt, conf_txt = sup_conf.replace("#CONF:", "").split()
 
-            def _ids_to_str(token: str):
-                return " & ".join(
-                    f"{id_info[int(i)]['Column']}={id_info[int(i)]['Value']}"
-                    if int(i) in id_info else i
-                    for i in token.strip().split()
-                )
-
             rows.append({
                 "Rule ID": rid,
                 "Antecedent": _ids_to_str(lhs),
@@ -51,7 +51,7 @@ def parse_rule_output(file_path: str, dict_df: pd.DataFrame) -> pd.DataFrame:
 
 
 def sequence_to_readable(seq_df: pd.DataFrame, dict_df: pd.DataFrame) -> pd.DataFrame:
-    id_info = dict_df.set_index("ID")[["Column", "Value"]].to_dict("index")
+    labels = ItemEncoder.from_frame(dict_df).label_table()
     patterns = []
     for _, row in seq_df.iterrows():
         pat = {"Pattern ID": row["Pattern ID"], "Support": row.get("Support")}
@@ -59,10 +59,7 @@ def sequence_to_readable(seq_df: pd.DataFrame, dict_df: pd.DataFrame) -> pd.Data
         idx = 1
         while f"Itemset {idx}" in row and pd.notna(row[f"Itemset {idx}"]):
             ids = [int(j.strip()) for j in row[f"Itemset {idx}"].split(",")]
-            items = [
-                f"{id_info[j]['Column']}={id_info[j]['Value']}" if j in id_info else str(j)
-                for j in ids
-            ]
+            items = [labels[j] if 0 <= j < len(labels) else str(j) for j in ids]
             parts.append(" + ".join(items))
             idx += 1
         pat["Pattern"] = " → ".join(parts)
@@ -0,0 +1,75 @@
+# components/spmf/spmf_preview.py
+#
+# Paged reads of SPMF text files. The byte offset of every line start is found
+# once per file version by scanning the file in blocks and is cached; a page
+# is then a single seek + read of its byte range, so preview cost depends on
+# the page size only, not on the size of the file.
+
+import os
+import numpy as np
+import pandas as pd
+from components.cache import LRUCache
+from components.spmf.sequence_db import SequenceDB
+
+PAGE_SIZE = 10
+SCAN_BLOCK = 64 << 20          # bytes per read while indexing
+INDEX_CACHE_BYTES = 256 << 20
+
+_index = LRUCache(INDEX_CACHE_BYTES)
+
+
+def _file_key(path: str) -> tuple:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+
+def _build_index(path: str, size: int) -> np.ndarray:
+    parts = [np.zeros(1, dtype=np.int64)]
+    pos = 0
+    with open(path, "rb") as f:
+        while block := f.read(SCAN_BLOCK):
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            parts.append(newlines.astype(np.int64) + pos + 1)
+            pos += len(block)
+    index = np.concatenate(parts)
+    if index[-1] != size:
+        # last line has no trailing newline
+        index = np.append(index, size)
+    return index
+
+
+def line_index(path: str) -> np.ndarray:
+    """Start offset of every line plus the file size (``lines + 1`` entries)."""
+    key = _file_key(path)
+    index = _index.get(key)
+    if index is None:
+        index = _index.put(key, _build_index(path, key[2]))
+    return index
+
+
+def line_count(path: str) -> int:
+    return len(line_index(path)) - 1
+
+
+def page_count(path: str, page_size: int = PAGE_SIZE) -> int:
+    return max(1, -(-line_count(path) // page_size))
+
+
+def read_lines(path: str, start: int, stop: int) -> list[str]:
+    index = line_index(path)
+    start, stop = max(start, 0), min(stop, len(index) - 1)
+    if start >= stop:
+        return []
+    with open(path, "rb") as f:
+        f.seek(index[start])
+        data = f.read(int(index[stop] - index[start]))
+    return data.decode("utf-8").splitlines()
+
+
+def read_page(
+    path: str, page: int = 0, page_size: int = PAGE_SIZE, labels: np.ndarray | None = None
+) -> pd.DataFrame:
+    """Page ``page`` (0-based) of an SPMF file as a preview frame."""
+    first = page * page_size
+    db = SequenceDB.from_lines(read_lines(path, first, first + page_size))
+    return db.to_frame(labels, first_id=first + 1)
@@ -0,0 +1,175 @@
+# components/spmf/spmf_writer.py
+#
+# Columnar writers for the SPMF input formats. Item columns are mapped to
+# integer ids once per distinct value, rows are ordered with one global
+# stable sort and the text is assembled from NumPy arrays in large blocks.
+
+import numpy as np
+import pandas as pd
+from components.spmf.item_encoder import ItemEncoder
+
+WRITE_BLOCK = 1 << 20          # tokens per write() call
+WRITE_BUFFER = 8 << 20         # bytes
+
+_ITEM_SEP = " "
+_ITEMSET_END = " -1 "
+_SEQUENCE_END = " -2\n"
+_LINE_END = "\n"
+_SEPARATORS = np.array([_ITEM_SEP, _ITEMSET_END, _SEQUENCE_END, _LINE_END], dtype=object)
+_END_ITEMSET, _END_SEQUENCE, _END_LINE = 1, 2, 3
+
+
+# ---------- encoding ---------------------------------------------------------
+def encode_items(df: pd.DataFrame, item_cols: list[str], items) -> np.ndarray:
+    """(rows, len(item_cols)) array of item ids, -1 where a cell has no id.
+
+    ``items`` is an ItemEncoder or a legacy ``{(column, value): id}`` dict.
+    """
+    if isinstance(items, ItemEncoder):
+        return items.encode(df, item_cols)
+    item2id = items
+    by_col = {}
+    for (col, val), iid in item2id.items():
+        by_col.setdefault(col, {})[val] = iid
+    out = np.full((len(df), len(item_cols)), -1, dtype=np.int64)
+    for j, col in enumerate(item_cols):
+        lookup = by_col.get(col, {})
+        codes, uniques = pd.factorize(df[col])
+        if len(uniques) == 0:
+            continue
+        lut = np.fromiter(
+            (lookup.get(v, -1) for v in uniques), dtype=np.int64, count=len(uniques)
+        )
+        out[:, j] = np.where(codes >= 0, lut[codes], -1)
+    return out
+
+
+def _rank(s: pd.Series) -> np.ndarray:
+    # sort key with missing values last, like sort_values
+    codes, uniques = pd.factorize(s, sort=True)
+    return np.where(codes < 0, len(uniques), codes)
+
+
+def sequence_order(
+    df: pd.DataFrame, group_col: str = "groupid", time_col: str | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Row order of the sequence file and the group code of each of those rows.
+
+    Groups are in sorted key order (rows without a key are dropped, as in
+    groupby); rows keep their original order within a group unless
+    ``time_col`` is given, in which case they are stably sorted by it.
+    """
+    groups, _ = pd.factorize(df[group_col], sort=True)
+    keys = (groups,) if time_col is None else (_rank(df[time_col]), groups)
+    order = np.lexsort(keys)
+    order = order[groups[order] >= 0]
+    return order, groups[order]
+
+
+# ---------- CSR layout -------------------------------------------------------
+def flatten_rows(ids: np.ndarray, keep_empty: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """Flat int32 item array and per-row item counts of an encoded id matrix.
+
+    Rows without any id are dropped unless ``keep_empty``, in which case they
+    stay as zero-length itemsets.
+    """
+    valid = ids >= 0
+    counts = valid.sum(axis=1)
+    if not keep_empty:
+        counts = counts[counts > 0]
+    return ids[valid].astype(np.int32), counts.astype(np.int64)
+
+
+def sequence_layout(
+    df: pd.DataFrame,
+    item_cols: list[str],
+    items,
+    group_col: str = "groupid",
+    time_col: str | None = None,
+    skip_empty: bool = True,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """``(rows, flat items, itemset counts, sequence starts)`` of a sequence file.
+
+    ``rows`` are the source row positions of the itemsets in output order and
+    ``sequence starts`` the index of the first itemset of every sequence.
+    """
+    order, groups = sequence_order(df, group_col, time_col)
+    ids = encode_items(df, item_cols, items)[order]
+    if skip_empty:
+        keep = (ids >= 0).any(axis=1)
+        ids, groups, order = ids[keep], groups[keep], order[keep]
+    flat, counts = flatten_rows(ids, keep_empty=True)
+    first = np.ones(len(groups), dtype=bool)
+    first[1:] = groups[1:] != groups[:-1]
+    return order, flat, counts, np.flatnonzero(first)
+
+
+# ---------- rendering --------------------------------------------------------
+def render(f, items: np.ndarray, counts: np.ndarray, ends: np.ndarray):
+    """Write ``items`` split into itemsets of ``counts`` items, each followed
+    by the separator kind in ``ends``. Zero-length itemsets are written as an
+    empty token so they keep their separator."""
+    if len(counts) == 0:
+        return
+    items = np.asarray(items, dtype=np.int64)
+    tokens = np.maximum(counts, 1)
+    if len(items) == int(tokens.sum()):
+        flat = items
+    else:
+        flat = np.full(int(tokens.sum()), -2, dtype=np.int64)
+        flat[np.repeat(counts > 0, tokens)] = items
+
+    max_id = int(flat.max(initial=0))
+    labels = np.array([str(i) for i in range(max_id + 1)] + [""], dtype=object)
+    flat = np.where(flat == -2, max_id + 1, flat)
+
+    kind = np.zeros(flat.size, dtype=np.int8)
+    kind[np.cumsum(tokens) - 1] = ends
+
+    for start in range(0, flat.size, WRITE_BLOCK):
+        stop = start + WRITE_BLOCK
+        block = np.empty(2 * len(flat[start:stop]), dtype=object)
+        block[0::2] = labels[flat[start:stop]]
+        block[1::2] = _SEPARATORS[kind[start:stop]]
+        f.write("".join(block.tolist()))
+
+
+def sequence_ends(counts: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    ends = np.full(len(counts), _END_ITEMSET, dtype=np.int8)
+    ends[np.r_[starts[1:], len(counts)] - 1] = _END_SEQUENCE
+    return ends
+
+
+def transaction_ends(counts: np.ndarray) -> np.ndarray:
+    return np.full(len(counts), _END_LINE, dtype=np.int8)
+
+
+def write_sequences(
+    df: pd.DataFrame,
+    item_cols: list[str],
+    items,
+    path: str,
+    group_col: str = "groupid",
+    time_col: str | None = None,
+    skip_empty: bool = True,
+) -> str:
+    """Write one SPMF sequence per group, one itemset per row.
+
+    With ``skip_empty`` rows without any known item are dropped (and so are
+    groups left empty); otherwise they are written as empty itemsets.
+    """
+    _, flat, counts, starts = sequence_layout(
+        df, item_cols, items, group_col, time_col, skip_empty
+    )
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        if len(counts):
+            render(f, flat, counts, sequence_ends(counts, starts))
+    return path
+
+
+def write_transactions(df: pd.DataFrame, item_cols: list[str], items, path: str) -> str:
+    """Write one line of space-separated item ids per row with any known item."""
+    flat, counts = flatten_rows(encode_items(df, item_cols, items))
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        render(f, flat, counts, transaction_ends(counts))
+    return path
@@ -0,0 +1,64 @@
+# components/spmf/stand_in_worker.py
+#
+# Stand-in for SpmfWorker.java that speaks the same line protocol, for
+# exercising the worker pool where Java or the SPMF jar is not available:
+#
+#   WorkerPool(stand_in_worker.command())
+#
+# Every RUN mines the frequent single items of the input (sequence or
+# transaction format) at the relative min_support given as the first
+# parameter and writes them in SPMF's "item -1 #SUP: n" output format.
+# STAND_IN_DELAY (seconds) slows each job down, e.g. to test cancellation.
+
+import math
+import os
+import sys
+import time
+
+
+def command() -> list[str]:
+    return [sys.executable, os.path.abspath(__file__)]
+
+
+def _mine_items(input_path: str, output_path: str, params: list[str]):
+    minsup = float(params[0]) if params else 0.0
+    support, n = {}, 0
+    with open(input_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line[0] in "#%@":
+                continue
+            n += 1
+            for item in {t for t in line.split() if t not in ("-1", "-2")}:
+                support[item] = support.get(item, 0) + 1
+    threshold = max(math.ceil(minsup * n), 1)
+    with open(output_path, "w", encoding="utf-8") as out:
+        for item in sorted(support, key=int):
+            if support[item] >= threshold:
+                out.write(f"{item} -1 #SUP: {support[item]}\n")
+
+
+def main():
+    delay = float(os.environ.get("STAND_IN_DELAY", "0"))
+    for line in sys.stdin:
+        fields = line.rstrip("\n").split("\t")
+        if fields[0] == "PING":
+            answer = "PONG"
+        elif fields[0] == "QUIT":
+            return
+        elif fields[0] == "RUN":
+            try:
+                if len(fields) < 4:
+                    raise ValueError("RUN needs algorithm, input and output")
+                time.sleep(delay)
+                _mine_items(fields[2], fields[3], fields[4:])
+                answer = "OK"
+            except Exception as e:
+                answer = "ERR\t" + " ".join(str(e).split())
+        else:
+            answer = f"ERR\tunknown request {fields[0]}"
+        sys.stdout.write(answer + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# components/spmf/weighted_support.py
+#
+# Exact supports for patterns mined on a deduplicated SequenceDB. The SPMF
+# tools only see the distinct sequences, so the miner runs with a threshold
+# low enough to find every pattern that is frequent once weights count, and
+# each pattern's support is then recounted against the weighted database.
+# When that threshold would fall to a handful of distinct sequences, the
+# miner would enumerate nearly every subsequence of them; such runs use the
+# expanded database instead (see loose_on_distinct).
+
+import math
+import numpy as np
+import pandas as pd
+from components.spmf.sequence_db import SequenceDB
+
+# fewest distinct sequences a recounted pattern must occur in; below this,
+# with a relative threshold under the requested one, mining the distinct
+# sequences costs more than mining the expanded database
+MIN_DISTINCT_SUPPORT = 5
+
+
+def absolute_support(min_support: float, total: int) -> int:
+    """SPMF's absolute threshold for a relative ``min_support``."""
+    return math.ceil(min_support * total)
+
+
+def distinct_count(db: SequenceDB, target: int) -> int:
+    """Fewest of ``db``'s distinct sequences a pattern must occur in for its
+    weighted support to reach ``target``: the fewest heaviest weights that
+    sum to it."""
+    weights = db.weights if db.weights is not None else np.ones(len(db), dtype=np.int64)
+    heaviest = np.cumsum(np.sort(weights)[::-1])
+    return max(int(np.searchsorted(heaviest, target)) + 1, 1)
+
+
+def distinct_minsup(db: SequenceDB, target: int) -> float:
+    """Relative minsup under which the miner finds, in ``db``'s distinct
+    sequences, every pattern whose weighted support can reach ``target``.
+
+    The returned value maps back to exactly ``distinct_count`` under SPMF's
+    ``ceil(minsup * N)``.
+    """
+    return (min(distinct_count(db, target), len(db)) - 0.5) / len(db)
+
+
+def loose_on_distinct(db: SequenceDB, target: int) -> bool:
+    """Whether mining ``db``'s distinct sequences for ``target`` needs a
+    threshold of only a few sequences, lower relative to them than
+    ``target`` is to the full database."""
+    k = distinct_count(db, target)
+    return k < MIN_DISTINCT_SUPPORT and k * db.total_weight < target * len(db)
+
+
+class SupportCounter:
+    """Weighted containment counts of sequential patterns in ``db``."""
+
+    def __init__(self, db: SequenceDB):
+        self.db = db
+        self.weights = (
+            db.weights if db.weights is not None else np.ones(len(db), dtype=np.int64)
+        )
+        itemset_of_item = np.repeat(np.arange(db.n_itemsets), db.itemset_lengths())
+        order = np.argsort(db.items, kind="stable")
+        self._itemsets = itemset_of_item[order]      # grouped by item, ascending
+        self._bounds = np.searchsorted(
+            db.items[order], np.arange(int(db.items.max(initial=-1)) + 2)
+        )
+
+    def _itemsets_with(self, itemset: list[int]) -> np.ndarray:
+        # sorted indices of the itemsets containing every item of ``itemset``
+        hits = None
+        for item in itemset:
+            if not 0 <= item < len(self._bounds) - 1:
+                return np.zeros(0, dtype=np.int64)
+            rows = np.unique(self._itemsets[self._bounds[item]:self._bounds[item + 1]])
+            hits = rows if hits is None else np.intersect1d(hits, rows, assume_unique=True)
+        return hits
+
+    def _match(self, alive, ptr, itemset):
+        # sequences of ``alive`` holding ``itemset`` from ``ptr`` on, and
+        # the itemset after the earliest such match in each
+        cand = self._itemsets_with(itemset)
+        if len(cand) == 0:
+            return alive[:0], ptr[:0]
+        c = np.searchsorted(cand, ptr)
+        ok = c < len(cand)
+        found = cand[np.minimum(c, len(cand) - 1)]
+        ok &= found < self.db.sequence_offsets[alive + 1]
+        return alive[ok], found[ok] + 1
+
+    def support(self, pattern: list[list[int]]) -> int:
+        return int(self.supports([pattern])[0])
+
+    def supports(self, patterns: list) -> np.ndarray:
+        """Weighted supports of ``patterns``. They are counted in sorted
+        order, so patterns sharing leading itemsets share their matching."""
+        patterns = [tuple(tuple(itemset) for itemset in p) for p in patterns]
+        out = np.zeros(len(patterns), dtype=np.int64)
+        # matches after each itemset of ``path``, the last pattern counted
+        stack = [(np.arange(len(self.db)), self.db.sequence_offsets[:-1].copy())]
+        path = ()
+        for i in sorted(range(len(patterns)), key=patterns.__getitem__):
+            pattern = patterns[i]
+            shared = 0
+            while shared < min(len(path), len(pattern)) and path[shared] == pattern[shared]:
+                shared += 1
+            del stack[shared + 1:]
+            for itemset in pattern[shared:]:
+                alive, ptr = stack[-1]
+                stack.append(self._match(alive, ptr, itemset) if len(alive) else (alive, ptr))
+            path = pattern
+            out[i] = self.weights[stack[-1][0]].sum()
+        return out
+
+
+def _patterns(result: pd.DataFrame, itemset_cols: list[str]) -> list[list[list[int]]]:
+    cells = result[itemset_cols].astype(object).to_numpy()
+    return [
+        [[int(x) for x in str(c).split(",")] for c in row if pd.notna(c) and str(c).strip()]
+        for row in cells
+    ]
+
+
+def recount(result: pd.DataFrame, db: SequenceDB, target: int) -> pd.DataFrame:
+    """Replace ``Support`` in a ``parse_sequence_output`` frame with weighted
+    supports and keep the patterns reaching ``target``."""
+    if result.empty:
+        return result
+    itemset_cols = [c for c in result.columns if c.startswith("Itemset ")]
+    support = SupportCounter(db).supports(_patterns(result, itemset_cols))
+    out = result.assign(Support=support)[support >= target].reset_index(drop=True)
+    out["Pattern ID"] = np.arange(1, len(out) + 1)
+    return out.dropna(axis=1, how="all")
@@ -1,6 +1,9 @@
 #components/state_manager.py
 
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import components.artifact_store as artifacts
+from components.version_store import DatasetVersion
 
 DEFAULT_STATE = {
     "base_data": None,
@@ -8,6 +11,7 @@ DEFAULT_STATE = {
 }
 
 CUSTOM_STATE_LIST_KEY = "_dynamic_data_keys"
+ARTIFACT_SESSION_KEY = "_artifact_session"
 
 def init_state():
     for key, value in DEFAULT_STATE.items():
@@ -15,8 +19,18 @@ def init_state():
             st.session_state[key] = value
     if CUSTOM_STATE_LIST_KEY not in st.session_state:
         st.session_state[CUSTOM_STATE_LIST_KEY] = []
+    if ARTIFACT_SESSION_KEY not in st.session_state:
+        # pins this session's files in the artifact store until the session
+        # state is dropped
+        st.session_state[ARTIFACT_SESSION_KEY] = artifacts.store.open_session()
 
 def get(key):
+    value = st.session_state.get(key)
+    if isinstance(value, DatasetVersion):
+        return value.materialize()
+    return value
+
+def get_raw(key):
     return st.session_state.get(key)
 
 def set(key, value):
@@ -40,3 +54,15 @@ def add_dynamic_data_key(key, category="normal"):
     entry = {"key": key, "category": category}
     if entry not in st.session_state[CUSTOM_STATE_LIST_KEY]:
         st.session_state[CUSTOM_STATE_LIST_KEY].append(entry)
+
+
+def _artifact_session():
+    # background threads (mining jobs) have no session to pin files to
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return None
+    try:
+        return st.session_state.get(ARTIFACT_SESSION_KEY)
+    except Exception:
+        return None
+
+artifacts.set_session_provider(_artifact_session)
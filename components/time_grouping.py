@@ -0,0 +1,86 @@
+# components/time_grouping.py
+#
+# Timestamp parsing and sequence keys for the SPMF conversion. Strings are
+# parsed once per distinct value and mapped back by code, days come from
+# integer floor division of epoch nanoseconds, and sequence keys are integer
+# composites of the entity code and the day (or session) instead of
+# formatted strings.
+
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10 ** 9
+
+
+def parse_datetime(s: pd.Series, fmt: str | None = None) -> pd.Series:
+    """``pd.to_datetime(s, format=fmt, errors="coerce")``, parsing each
+    distinct value once."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s
+    codes, uniques = pd.factorize(s)
+    parsed = pd.DatetimeIndex(pd.to_datetime(pd.Index(uniques), format=fmt, errors="coerce"))
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=s.index, name=s.name)
+
+
+def epoch_ns(ts: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Wall-clock nanoseconds since the epoch and a validity mask."""
+    if getattr(ts.dt, "tz", None) is not None:
+        ts = ts.dt.tz_localize(None)
+    valid = ts.notna().to_numpy()
+    ns = ts.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return ns, valid
+
+
+def day_number(ts: pd.Series) -> pd.Series:
+    """Days since 1970-01-01 (nullable Int64), the integer form of the date."""
+    ns, valid = epoch_ns(ts)
+    return pd.Series(
+        pd.arrays.IntegerArray(ns // NS_PER_DAY, ~valid), index=ts.index, name=ts.name
+    )
+
+
+def _entity_codes(s: pd.Series) -> np.ndarray:
+    # sorted codes, -1 for a missing entity
+    codes, _ = pd.factorize(s, sort=True)
+    return codes.astype(np.int64)
+
+
+def daily_groupid(df: pd.DataFrame, group_col: str, datetime_col: str) -> pd.Series:
+    """One integer key per (``group_col`` value, calendar day).
+
+    Rows without a timestamp or a group value get <NA> and drop out of the
+    sequences.
+    """
+    ns, valid = epoch_ns(df[datetime_col])
+    codes = _entity_codes(df[group_col])
+    valid = valid & (codes >= 0)
+    day = ns // NS_PER_DAY
+    key = np.zeros(len(df), dtype=np.int64)
+    if valid.any():
+        first, last = day[valid].min(), day[valid].max()
+        key = codes * (last - first + 1) + (day - first)
+    return pd.Series(pd.arrays.IntegerArray(key, ~valid), index=df.index, name="groupid")
+
+
+def session_groupid(
+    df: pd.DataFrame, group_col: str, datetime_col: str, gap: pd.Timedelta
+) -> pd.Series:
+    """One integer key per session: rows of the same ``group_col`` value,
+    in time order, with no gap longer than ``gap`` between consecutive rows.
+
+    Sessions are numbered by entity, then by start time. Rows without a
+    timestamp or a group value get <NA>.
+    """
+    ns, valid = epoch_ns(df[datetime_col])
+    codes = _entity_codes(df[group_col])
+    valid = valid & (codes >= 0)
+    order = np.lexsort((ns, codes))
+    order = order[valid[order]]
+    key = np.zeros(len(df), dtype=np.int64)
+    if len(order):
+        c, t = codes[order], ns[order]
+        starts = np.ones(len(order), dtype=bool)
+        starts[1:] = (c[1:] != c[:-1]) | (np.diff(t) > pd.Timedelta(gap).value)
+        key[order] = np.cumsum(starts) - 1
+    return pd.Series(pd.arrays.IntegerArray(key, ~valid), index=df.index, name="groupid")
@@ -0,0 +1,95 @@
+# components/type_inference.py
+#
+# Column type inference for the Data Tool. Every test runs on the distinct
+# values of a head sample, and results are cached per (dataset fingerprint,
+# column) so reruns and repeated callers do no work.
+
+from dataclasses import dataclass
+import pandas as pd
+import components.data_ops as ops
+from components.cache import LRUCache
+
+SAMPLE_ROWS = 1000
+DEFAULT_DATETIME_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+DATETIME_FORMATS = [
+    DEFAULT_DATETIME_FORMAT,
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+]
+_MATCH_RATIO = 0.8
+_CATEGORY_MAX_UNIQUE = 50
+_CATEGORY_RATIO = 0.5
+
+_cache = LRUCache(8192, sizeof=lambda _: 1)
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    type: str | None
+    datetime_format: str | None = None
+
+
+def _detect_format(uniq: pd.Series) -> str | None:
+    best, best_ratio = None, _MATCH_RATIO
+    for fmt in DATETIME_FORMATS:
+        ratio = pd.to_datetime(uniq, format=fmt, errors="coerce").notna().mean()
+        if ratio > best_ratio:
+            best, best_ratio = fmt, ratio
+            if ratio == 1.0:
+                break
+    return best
+
+
+def _infer(s: pd.Series) -> ColumnInfo:
+    s = s.dropna()
+    if s.empty:
+        return ColumnInfo(None)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return ColumnInfo("Datetime")
+    if pd.api.types.is_bool_dtype(s):
+        return ColumnInfo("Bool")
+    if pd.api.types.is_numeric_dtype(s):
+        return ColumnInfo("Numeric")
+
+    uniq = pd.Series(pd.unique(s.astype(str).str.strip()))
+    fmt = _detect_format(uniq)
+    if fmt:
+        return ColumnInfo("Datetime", fmt)
+    if pd.to_numeric(uniq, errors="coerce").notna().mean() > _MATCH_RATIO:
+        return ColumnInfo("Numeric")
+    if len(uniq) <= _CATEGORY_MAX_UNIQUE and len(uniq) <= len(s) * _CATEGORY_RATIO:
+        return ColumnInfo("Category")
+    return ColumnInfo(None)
+
+
+def infer_columns(df: pd.DataFrame, sample_n: int = SAMPLE_ROWS) -> dict[str, ColumnInfo]:
+    fp = ops.frame_fingerprint(df)
+    sample = df.head(sample_n)
+    res = {}
+    for col in df.columns:
+        key = (fp, col, sample_n)
+        info = _cache.get(key)
+        if info is None:
+            info = _cache.put(key, _infer(sample[col]))
+        res[col] = info
+    return res
+
+
+def infer_column_types(df: pd.DataFrame, sample_n: int = SAMPLE_ROWS) -> dict:
+    return {c: info.type for c, info in infer_columns(df, sample_n).items()}
+
+
+def datetime_format(df: pd.DataFrame, col: str) -> str | None:
+    if col not in df.columns:
+        return None
+    return infer_columns(df)[col].datetime_format
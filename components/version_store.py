@@ -0,0 +1,106 @@
+# components/version_store.py
+#
+# Copy-on-write storage for cleaned dataset versions. A version records its
+# parent, the row positions it keeps and only the columns whose values differ
+# from the parent; every other column is taken from the parent on demand, so
+# unchanged buffers are shared instead of copied per "Save clean".
+# Materialized frames are cached under a byte budget; the newest one is kept
+# even when it alone is over budget, and a version also finds its frame again
+# through a weak reference while anything else still holds it.
+
+import uuid
+import weakref
+import numpy as np
+import pandas as pd
+from components.cache import LRUCache
+
+MATERIALIZED_CACHE_BYTES = 1024 ** 3
+
+_materialized = LRUCache(MATERIALIZED_CACHE_BYTES, keep_oversized=True)
+
+
+class DatasetVersion:
+    def __init__(self, parent=None, frame=None, rows=None, columns=None, changed=None):
+        self.id = uuid.uuid4().hex
+        self.parent = parent
+        self._frame = frame
+        self.rows = rows
+        self.columns = list(columns if columns is not None else frame.columns)
+        self.changed = changed or {}
+        self._built = None          # weak reference to the last materialization
+
+    @classmethod
+    def root(cls, df: pd.DataFrame) -> "DatasetVersion":
+        return cls(frame=df)
+
+    @property
+    def is_root(self) -> bool:
+        return self._frame is not None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes owned by this version (not shared with the parent)."""
+        if self.is_root:
+            return int(self._frame.memory_usage(index=True, deep=True).sum())
+        own = sum(int(a.nbytes) for a in self.changed.values())
+        return own + (self.rows.nbytes if self.rows is not None else 0)
+
+    def materialize(self) -> pd.DataFrame:
+        if self.is_root:
+            return self._frame
+        df = _materialized.get(self.id)
+        if df is None:
+            df = self._built() if self._built is not None else None
+            if df is None:
+                df = self._build()
+                self._built = weakref.ref(df)
+            _materialized.put(self.id, df)
+        return df
+
+    def _build(self) -> pd.DataFrame:
+        parent = self.parent.materialize()
+        index = parent.index if self.rows is None else parent.index.take(self.rows)
+        data = {}
+        for col in self.columns:
+            if col in self.changed:
+                data[col] = pd.Series(self.changed[col], index=index, name=col, copy=False)
+            elif self.rows is None:
+                data[col] = parent[col]
+            else:
+                data[col] = parent[col].take(self.rows)
+        return pd.DataFrame(data, index=index, columns=self.columns, copy=False)
+
+
+def _row_positions(parent: pd.DataFrame, df: pd.DataFrame) -> np.ndarray | None:
+    if df.index.equals(parent.index):
+        return None
+    if not parent.index.is_unique:
+        raise ValueError("parent index is not unique")
+    pos = parent.index.get_indexer(df.index)
+    if (pos < 0).any():
+        raise ValueError("rows not found in parent")
+    dtype = np.int32 if len(parent) < 2 ** 31 else np.int64
+    return pos.astype(dtype)
+
+
+def create_version(parent: DatasetVersion, df: pd.DataFrame) -> DatasetVersion:
+    """Record ``df`` as a delta on top of ``parent``.
+
+    Falls back to a root version when the rows of ``df`` cannot be expressed
+    as a selection of the parent's rows.
+    """
+    base = parent.materialize()
+    try:
+        rows = _row_positions(base, df)
+    except ValueError:
+        return DatasetVersion.root(df)
+
+    changed = {}
+    for col in df.columns:
+        new = df[col]
+        if col in base.columns and new.dtype == base[col].dtype:
+            old = base[col] if rows is None else base[col].take(rows)
+            if old.equals(new):
+                continue
+        changed[col] = new.array
+    return DatasetVersion(parent=parent, rows=rows, columns=df.columns, changed=changed)
@@ -0,0 +1,112 @@
+# tests/test_artifact_store.py
+
+import gc
+import os
+import stat
+import time
+
+import pytest
+
+import components.artifact_store as artifact_store
+from components.artifact_store import ArtifactStore, private_dir
+
+
+def test_store_root_is_private(tmp_path):
+    root = tmp_path / "store"
+    ArtifactStore(str(root))
+    assert stat.S_IMODE(os.stat(root).st_mode) == 0o700
+
+    loose = tmp_path / "loose"
+    loose.mkdir(mode=0o777)
+    os.chmod(loose, 0o777)
+    private_dir(str(loose))
+    assert stat.S_IMODE(os.stat(loose).st_mode) == 0o700
+
+
+def test_store_root_refuses_links_and_other_owners(tmp_path):
+    target = tmp_path / "target"
+    target.mkdir()
+    (tmp_path / "link").symlink_to(target)
+    with pytest.raises(PermissionError):
+        ArtifactStore(str(tmp_path / "link"))
+
+    if os.getuid() != 0:
+        pytest.skip("changing a directory's owner needs root")
+    other = tmp_path / "other"
+    other.mkdir(mode=0o700)
+    os.chown(other, 12345, 12345)
+    with pytest.raises(PermissionError, match="another user"):
+        ArtifactStore(str(other))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    current = {"session": None}
+    monkeypatch.setattr(artifact_store, "_session_provider", lambda: current["session"])
+    store = ArtifactStore(str(tmp_path / "store"), quota=10_000)
+    store.current = current
+    return store
+
+
+def _write(size: int):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * size)
+    return write
+
+
+def test_identical_artifacts_are_written_once(store):
+    calls = []
+
+    def write(path):
+        calls.append(path)
+        _write(10)(path)
+
+    key = artifact_store.content_key("conversion", 1, [2, 3])
+    first = store.get_or_create(key, write)
+    assert store.get_or_create(artifact_store.content_key("conversion", 1, [2, 3]), write) == first
+    assert len(calls) == 1 and os.path.getsize(first) == 10
+    assert not [n for n in os.listdir(store.root) if n.startswith(".")]
+
+
+def test_quota_evicts_least_recently_used_first(store):
+    for key in "abc":
+        store.get_or_create(key, _write(3_000))
+        time.sleep(0.01)
+    # "a" is used again, so "b" is now the oldest and goes first
+    store.get("a")
+    time.sleep(0.01)
+    store.get_or_create("d", _write(3_000))
+    assert sorted(os.listdir(store.root)) == ["a.txt", "c.txt", "d.txt"]
+    assert store.nbytes <= store.quota
+
+
+def test_pinned_files_survive_eviction(store):
+    store.current["session"] = session = store.open_session()
+    store.get_or_create("pinned", _write(6_000))
+    store.current["session"] = None
+    store.get_or_create("other", _write(6_000))
+    store.get_or_create("newest", _write(6_000))
+    assert os.path.exists(store.path("pinned"))
+    assert not os.path.exists(store.path("other"))
+    del session
+
+
+def test_ended_sessions_delete_files_nobody_else_uses(store, tmp_path):
+    results = ArtifactStore(str(tmp_path / "results"))
+    store.current["session"] = first = store.open_session()
+    store.get_or_create("shared", _write(10))
+    store.get_or_create("own", _write(10))
+    results.get_or_create("result", _write(10), ".parquet")
+    store.current["session"] = second = store.open_session()
+    store.get("shared")
+    store.current["session"] = None
+    store.get_or_create("unpinned", _write(10))
+
+    del first
+    gc.collect()
+    assert sorted(os.listdir(store.root)) == ["shared.txt", "unpinned.txt"]
+    assert os.listdir(results.root) == []
+    del second
+    gc.collect()
+    assert os.listdir(store.root) == ["unpinned.txt"]
@@ -0,0 +1,53 @@
+# tests/test_data_ops.py
+
+import pandas as pd
+import pytest
+
+import components.clean_pipeline as clean
+import components.data_ops as ops
+import components.type_inference as inference
+from tests.test_rule_engine import _clean_params
+
+
+@pytest.fixture
+def text_numbers():
+    return pd.DataFrame({
+        "x": pd.Series(["0.5", "1.5", "", "7", "12", "3"] * 4, dtype="str"),
+        "y": pd.Series(["a", "b", "c", "a", "b", "c"] * 4, dtype="str"),
+    })
+
+
+@pytest.mark.parametrize("fill", [False, True], ids=["raw", "filled"])
+@pytest.mark.parametrize("category", [False, True], ids=["text", "category"])
+def test_numbers_as_text_are_saved_numeric(text_numbers, fill, category):
+    df = ops.compact_frame(text_numbers)[0] if category else text_numbers
+    type_map = inference.infer_column_types(df)
+    assert type_map["x"] == "Numeric"
+    cleaned = clean.clean_cached(
+        df, _clean_params(type_map=type_map, fill_type=fill)
+    )
+    assert pd.api.types.is_float_dtype(cleaned["x"])
+    assert cleaned["x"].iloc[:2].tolist() == [0.5, 1.5]
+    assert (cleaned["x"].iloc[2] == 0) if fill else pd.isna(cleaned["x"].iloc[2])
+
+    binned = ops.discretize_fields(
+        cleaned, {"x": {"bins": [0, 1, 10, 20], "labels": ["lo", "mid", "hi"]}}
+    )
+    assert binned["x_bin"].iloc[:2].tolist() == ["lo", "mid"]
+
+
+def test_numbers_as_text_filter_numerically(text_numbers):
+    type_map = inference.infer_column_types(text_numbers)
+    cleaned = clean.clean_cached(text_numbers, _clean_params(
+        type_map=type_map, filter_rows=True, filter_col="x", filter_op=">", filter_val="5",
+    ))
+    assert sorted(set(cleaned["x"])) == [7.0, 12.0]
+
+
+def test_base_data_bins_numbers_as_text(text_numbers):
+    binned = ops.discretize_fields(
+        text_numbers, {"x": {"bins": [0, 1, 10, 20], "labels": ["lo", "mid", "hi"]}}
+    )
+    bins = binned["x_bin"].iloc[:6]
+    assert bins.isna().tolist() == [False, False, True, False, False, False]
+    assert bins.dropna().tolist() == ["lo", "mid", "mid", "hi", "mid"]
@@ -0,0 +1,84 @@
+# tests/test_external_sort.py
+
+import filecmp
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import components.spmf.external_sort as ext
+from components.artifact_store import ArtifactStore
+
+FMT = "%Y-%m-%d %H:%M"
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(ext, "store", ArtifactStore(str(tmp_path / "store")))
+    rng = np.random.default_rng(0)
+    rows = 2_000
+    times = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 20 * 24 * 60, rows), "min")
+    pd.DataFrame({
+        "Date And Time": times.strftime(FMT),
+        "Zip": rng.integers(0, 30, rows),
+        "Weather": rng.choice(["clear", "rain", "snow", None], rows),
+        "Light": rng.choice(["day", "dark"], rows),
+    }).to_csv(tmp_path / "src.csv", index=False)
+    return str(tmp_path / "src.csv")
+
+
+def _convert(path):
+    return ext.convert_sequences(
+        path, ["weather", "light"], "date_and_time", "zip", FMT, chunk_rows=300
+    )
+
+
+def _no_pass(*args, **kwargs):
+    raise AssertionError("source read again")
+
+
+def test_hit_skips_both_passes(source, monkeypatch):
+    spmf, dictionary, stats = _convert(source)
+    monkeypatch.setattr(ext, "collect_dictionaries", _no_pass)
+    monkeypatch.setattr(ext, "spill_runs", _no_pass)
+    again, dictionary2, stats2 = _convert(source)
+    assert again == spmf and stats2 == stats and stats["Sequences"] > 0
+    pd.testing.assert_frame_equal(dictionary2, dictionary)
+
+
+def test_lost_files_are_rebuilt(source, monkeypatch, tmp_path):
+    spmf, dictionary, stats = _convert(source)
+    reference = str(tmp_path / "reference.txt")
+    os.link(spmf, reference)
+
+    # SPMF file evicted: rebuilt from the kept dictionaries without pass 1
+    collect = ext.collect_dictionaries
+    os.remove(spmf)
+    monkeypatch.setattr(ext, "collect_dictionaries", _no_pass)
+    again, _, stats2 = _convert(source)
+    assert filecmp.cmp(reference, again, shallow=False) and stats2 == stats
+    monkeypatch.setattr(ext, "collect_dictionaries", collect)
+
+    # metadata evicted: the stats come back with a full rebuild
+    os.remove(ext.store.path(os.path.basename(spmf)[:-4], ext.META_SUFFIX))
+    again, dictionary3, stats3 = _convert(source)
+    assert filecmp.cmp(reference, again, shallow=False) and stats3 == stats
+    pd.testing.assert_frame_equal(dictionary3, dictionary)
+
+
+def test_metadata_loads_without_pickle(source):
+    spmf, dictionary, stats = _convert(source)
+    key = os.path.basename(spmf)[:-4]
+    meta_path = ext.store.path(key, ext.META_SUFFIX)
+    with np.load(meta_path, allow_pickle=False) as meta:
+        assert "entities" in meta.files
+
+    # anything else under that name is ignored and replaced
+    with open(meta_path, "wb") as f:
+        f.write(b"\x80\x04garbage")
+    again, dictionary2, stats2 = _convert(source)
+    assert stats2 == stats
+    pd.testing.assert_frame_equal(dictionary2, dictionary)
+    with np.load(meta_path, allow_pickle=False) as meta:
+        assert "entities" in meta.files
@@ -0,0 +1,37 @@
+# tests/test_job_manager.py
+
+import time
+
+import components.spmf.job_manager as jobs
+from components.spmf.sequence_db import SequenceDB
+
+
+def _wait(job: jobs.Job, seconds: float = 30.0) -> jobs.Job:
+    deadline = time.time() + seconds
+    while job.active and time.time() < deadline:
+        time.sleep(0.05)
+    return job
+
+
+def _db():
+    return SequenceDB.from_lines(["1 -1 2 -1 3 -2", "2 -1 3 -2", "1 3 -1 -2"])
+
+
+def test_native_jobs_mine_in_process():
+    job = _wait(jobs.manager.submit(
+        "PrefixSpan", "unused.txt", {"min_support": 0.5}, db=_db(), cache=False,
+        backend="numpy", isolated=True,
+    ))
+    assert not job.isolated
+    assert job.status == jobs.DONE and len(job.result) == 4
+    assert job.stats["runtime"] < 5 and job.stats["peak_rss"] is None
+    jobs.manager.forget(job.id)
+
+
+def test_native_jobs_stop_at_the_time_limit():
+    job = _wait(jobs.manager.submit(
+        "PrefixSpan", "unused.txt", {"min_support": 0.5}, db=_db(), cache=False,
+        backend="numpy", timeout=0.0,
+    ))
+    assert job.status == jobs.TIMED_OUT and job.result is None
+    jobs.manager.forget(job.id)
@@ -0,0 +1,115 @@
+# tests/test_jvm_worker.py
+
+import sys
+import threading
+
+import pytest
+
+import components.spmf.jvm_worker as jvm_worker
+from components.spmf import stand_in_worker
+
+
+@pytest.fixture
+def pool():
+    pool = jvm_worker.WorkerPool(stand_in_worker.command(), size=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def sequences(tmp_path):
+    path = tmp_path / "input.txt"
+    path.write_text("1 -1 2 -1 -2\n2 -1 3 -1 -2\n2 -2\n", encoding="utf-8")
+    return str(path)
+
+
+def test_runs_jobs_on_a_reused_worker(pool, sequences, tmp_path):
+    out = tmp_path / "out.txt"
+    pool.run(["PrefixSpan", sequences, str(out), "0.5"])
+    assert out.read_text() == "2 -1 #SUP: 3\n"
+    pool.run(["PrefixSpan", sequences, str(out), "0.1"])
+    assert out.read_text().splitlines() == [
+        "1 -1 #SUP: 1", "2 -1 #SUP: 3", "3 -1 #SUP: 1",
+    ]
+    assert pool.workers == 1 and pool._idle[0].jobs == 2
+
+
+def test_spmf_errors_keep_the_worker(pool, tmp_path):
+    with pytest.raises(RuntimeError, match="SPMF Error"):
+        pool.run(["PrefixSpan", str(tmp_path / "missing.txt"), str(tmp_path / "out.txt")])
+    assert pool.workers == 1 and pool._idle[0].alive
+
+
+def test_timeout_kills_the_worker(pool, sequences, tmp_path, monkeypatch):
+    monkeypatch.setenv("STAND_IN_DELAY", "30")
+    with pytest.raises(jvm_worker.WorkerTimeout):
+        pool.run(["PrefixSpan", sequences, str(tmp_path / "out.txt")], timeout=0.5)
+    assert pool.workers == 0 and not pool._idle
+
+    monkeypatch.delenv("STAND_IN_DELAY")
+    pool.run(["PrefixSpan", sequences, str(tmp_path / "out.txt")])
+    assert pool.workers == 1
+
+
+def test_jobs_share_at_most_size_workers(pool, sequences, tmp_path, monkeypatch):
+    monkeypatch.setenv("STAND_IN_DELAY", "0.2")
+    peak, errors = [], []
+
+    def job(i):
+        try:
+            pool.run(["PrefixSpan", sequences, str(tmp_path / f"out{i}.txt")])
+            peak.append(pool.workers)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=job, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and max(peak) <= 2
+    assert all((tmp_path / f"out{i}.txt").exists() for i in range(6))
+
+
+def test_failed_start_is_not_retried_at_once(sequences, tmp_path):
+    pool = jvm_worker.WorkerPool([sys.executable, "-c", "pass"], size=1)
+    args = ["PrefixSpan", sequences, str(tmp_path / "out.txt")]
+    with pytest.raises(jvm_worker.WorkerUnavailable, match="did not start"):
+        pool.run(args)
+    with pytest.raises(jvm_worker.WorkerUnavailable, match="failed recently"):
+        pool.run(args)
+    assert pool.workers == 0
+
+
+def test_shut_down_pool_refuses_jobs(pool, sequences, tmp_path):
+    args = ["PrefixSpan", sequences, str(tmp_path / "out.txt")]
+    pool.run(args)
+    worker = pool._idle[0]
+    pool.shutdown()
+    assert not worker.alive and pool.workers == 0
+    with pytest.raises(jvm_worker.WorkerUnavailable, match="shut down"):
+        pool.run(args)
+
+
+def test_get_pool_keeps_one_pool_under_concurrent_calls(monkeypatch):
+    monkeypatch.setattr(jvm_worker, "_pool", None)
+    monkeypatch.setattr(jvm_worker, "_pool_version", None)
+    command = stand_in_worker.command()
+    seen, start = [], threading.Barrier(8)
+
+    def call(version):
+        start.wait()
+        seen.append(jvm_worker.get_pool(command, version=version))
+
+    threads = [threading.Thread(target=call, args=(i % 2,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    current = jvm_worker._pool
+    # every pool handed out but the current one was shut down
+    assert all(pool._closed for pool in seen if pool is not current)
+    assert not current._closed
+    assert jvm_worker.get_pool(command, version=jvm_worker._pool_version) is current
+    jvm_worker.shutdown()
+    assert current._closed and jvm_worker._pool is None
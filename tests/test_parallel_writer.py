@@ -0,0 +1,68 @@
+# tests/test_parallel_writer.py
+
+import filecmp
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+import components.spmf.parallel_writer as pw
+from components.spmf.sequence_db import SequenceDB, _offsets
+
+
+@pytest.fixture
+def shared_pool(monkeypatch):
+    monkeypatch.setattr(pw, "DEFAULT_WORKERS", 2)
+    monkeypatch.setattr(pw, "MIN_SHARD_ITEMS", 1_000)
+    pw.shutdown()
+    yield
+    pw.shutdown()
+
+
+def _db(sequences: int = 3_000, seed: int = 0) -> SequenceDB:
+    rng = np.random.default_rng(seed)
+    itemsets = 1 + rng.poisson(2, sequences)
+    sizes = np.ones(int(itemsets.sum()), dtype=np.int64)
+    items = rng.integers(1, 50, int(sizes.sum()))
+    return SequenceDB(items, _offsets(sizes), _offsets(itemsets))
+
+
+def test_concurrent_calls_share_one_pool(shared_pool, tmp_path):
+    db = _db()
+    serial = db.to_spmf(str(tmp_path / "serial.txt"))
+    errors, pools = [], set()
+
+    def write(i, workers):
+        try:
+            path = pw.write_parallel(db, str(tmp_path / f"out{i}.txt"), workers)
+            pools.add(id(pw._pool))
+            assert filecmp.cmp(serial, path, shallow=False)
+        except Exception as e:            # surfaced below
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(i, 2 + i % 3)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(pools) == 1
+
+
+def test_dead_pool_falls_back_to_one_process(shared_pool, tmp_path, monkeypatch):
+    db = _db()
+    pool = pw._get_pool()
+    pool.shutdown(cancel_futures=True)
+    # a pool shut down between the lookup and the submit cancels the writes
+    monkeypatch.setattr(pw, "_get_pool", lambda: pool)
+    monkeypatch.setattr(pool, "submit", lambda *a: _cancelled())
+    path = pw.write_parallel(db, str(tmp_path / "out.txt"), workers=2)
+    assert filecmp.cmp(db.to_spmf(str(tmp_path / "serial.txt")), path, shallow=False)
+    assert pw._pool is None
+
+
+def _cancelled() -> Future:
+    future = Future()
+    future.cancel()
+    return future
@@ -0,0 +1,63 @@
+# tests/test_param_sweep.py
+
+import threading
+
+import pytest
+
+import components.spmf.job_manager as jobs
+import components.spmf.param_sweep as sweep
+
+
+def test_parse_values():
+    assert sweep.parse_values("0.1:0.3:3", "min_support") == [0.1, 0.2, 0.3]
+    assert sweep.parse_values("1, 2.4, 2", "top_k") == [1, 2]
+    with pytest.raises(ValueError):
+        sweep.parse_values("1:2", "min_support")
+
+
+def test_sweep_runs_as_jobs(tmp_path):
+    before = {j.id for j in jobs.sweeps.jobs()}
+    src = tmp_path / "in.txt"
+    src.write_text("1 -1 2 -1 -2\n2 -1 3 -1 -2\n1 3 -1 -2\n")
+    seen = []
+    frame = sweep.run_sweep(
+        "PrefixSpan", str(src), {"min_support": 0.5}, "min_support", [0.7, 0.2, 0.5],
+        backend="numpy", on_result=lambda done, total: seen.append((done, total)),
+    )
+    assert frame["min_support"].tolist() == [0.2, 0.5, 0.7]
+    assert frame["Patterns"].tolist() == [6, 3, 0]
+    assert frame["Error"].isna().all()
+    assert seen[-1] == (3, 3)
+    # finished runs are collected and dropped from the manager
+    assert {j.id for j in jobs.sweeps.jobs()} == before
+
+
+def test_sweeps_do_not_wait_for_background_jobs(tmp_path, monkeypatch):
+    assert jobs.sweeps._pool._max_workers == jobs.available_cores()
+    src = tmp_path / "in.txt"
+    src.write_text("1 -1 2 -1 -2\n2 -1 3 -1 -2\n")
+    release = threading.Event()
+    mine = jobs.executor.mine
+
+    def held(*args, **kwargs):
+        if threading.current_thread().name.startswith("spmf-job"):
+            release.wait(30)
+        return mine(*args, **kwargs)
+
+    monkeypatch.setattr(jobs.executor, "mine", held)
+    busy = [
+        jobs.manager.submit("PrefixSpan", str(src), {"min_support": 0.5}, backend="numpy",
+                            cache=False)
+        for _ in range(jobs.MAX_CONCURRENT_JOBS)
+    ]
+    try:
+        frame = sweep.run_sweep(
+            "PrefixSpan", str(src), {"min_support": 0.5}, "min_support", [0.4, 0.9],
+            backend="numpy",
+        )
+        assert frame["Error"].isna().all()
+        assert all(job.active for job in busy)
+    finally:
+        release.set()
+        for job in busy:
+            jobs.manager.forget(job.id)
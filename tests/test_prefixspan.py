@@ -0,0 +1,93 @@
+# tests/test_prefixspan.py
+
+import random
+
+import pytest
+
+from components.spmf.prefixspan import min_count, prefixspan
+from components.spmf.sequence_db import SequenceDB
+from components.spmf.weighted_support import SupportCounter
+
+N_DATABASES = 150
+
+
+def _random_lines(rng: random.Random) -> list[str]:
+    # a small pool of sequences drawn with repeats, so dedup finds weights
+    pool = []
+    for _ in range(rng.randint(1, 8)):
+        seq = []
+        for _ in range(rng.randint(1, 4)):
+            items = sorted(rng.sample(range(1, 6), rng.randint(1, 2)))
+            seq.append(" ".join(map(str, items)))
+        pool.append(" -1 ".join(seq) + " -1 -2")
+    return [rng.choice(pool) for _ in range(rng.randint(1, 14))]
+
+
+def _brute_force(db: SequenceDB, minsup: int) -> dict:
+    # grow every frequent pattern by every item, in both directions
+    counter = SupportCounter(db)
+    items = sorted(set(db.items.tolist()))
+    found, frontier = {}, [[[i]] for i in items]
+    while frontier:
+        grown = []
+        for pattern in frontier:
+            support = counter.support(pattern)
+            if support < minsup:
+                continue
+            found[tuple(map(tuple, pattern))] = support
+            for i in items:
+                if i > pattern[-1][-1]:
+                    grown.append(pattern[:-1] + [pattern[-1] + [i]])
+                grown.append(pattern + [[i]])
+        frontier = grown
+    return found
+
+
+def _patterns(df) -> dict:
+    cols = [c for c in df.columns if c.startswith("Itemset ")]
+    out = {}
+    for _, row in df.iterrows():
+        pattern = tuple(
+            tuple(int(x) for x in row[c].split(", ")) for c in cols if isinstance(row[c], str)
+        )
+        out[pattern] = int(row["Support"])
+    assert len(out) == len(df), "pattern reported twice"
+    return out
+
+
+@pytest.mark.parametrize("weighted", [False, True], ids=["plain", "weighted"])
+def test_matches_brute_force(weighted):
+    rng = random.Random(0)
+    for trial in range(N_DATABASES):
+        lines = _random_lines(rng)
+        db = SequenceDB.from_lines(lines)
+        if weighted:
+            db = db.dedup()
+        min_support = rng.choice([0.2, 0.3, 0.5, 0.8])
+        expected = _brute_force(db, min_count(min_support, db.total_weight))
+        assert _patterns(prefixspan(db, min_support)) == expected, (trial, lines, min_support)
+
+
+def test_empty_database():
+    assert prefixspan(SequenceDB.from_lines([]), 0.5).empty
+
+
+def test_pattern_limit():
+    db = SequenceDB.from_lines(["1 2 3 4 -1 1 2 3 4 -1 -2"] * 3)
+    assert len(prefixspan(db, 0.5, max_patterns=None)) > 10
+    with pytest.raises(ValueError, match="raise min_support"):
+        prefixspan(db, 0.5, max_patterns=10)
+
+
+def test_check_stops_the_run():
+    db = SequenceDB.from_lines(["1 -1 2 -1 3 -2"] * 3)
+    calls = []
+
+    def check():
+        calls.append(None)
+        if len(calls) > 2:
+            raise RuntimeError("stopped")
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        prefixspan(db, 0.5, check=check)
+    assert len(calls) == 3
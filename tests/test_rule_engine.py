@@ -0,0 +1,94 @@
+# tests/test_rule_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import components.clean_pipeline as clean
+import components.data_ops as ops
+import components.rule_engine as rules
+
+
+def _cfg(*rule_list):
+    return {
+        "rules": [dict(zip(("col", "op", "val", "label"), r)) for r in rule_list],
+        "default": "other",
+        "new_name": "group",
+    }
+
+
+def _clean_params(**over):
+    params = {
+        "drop_pe": False, "pe_thresh": 0.5, "fill_type": False, "type_map": {},
+        "select_cols": False, "keep_cols": [], "filter_rows": False, "filter_col": None,
+        "filter_op": "==", "filter_val": "", "drop_dup": False, "drop_null": False,
+        "null_types": [], "custom_nulls": "",
+    }
+    params.update(over)
+    return params
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "severity": ["A", "C", None, "B", "D", "A"],
+        "speed": [30, 50, 70, None, 20, 90],
+    })
+
+
+@pytest.mark.parametrize("op", [">", ">=", "<", "<=", "==", "!="])
+def test_category_rules_compare_like_strings(frame, op):
+    typed = ops.ensure_types(frame, {"severity": "Category"})
+    assert isinstance(typed["severity"].dtype, pd.CategoricalDtype)
+    cfg = _cfg(("severity", op, "B", "hit"))
+    got = rules.evaluate_rules(typed, cfg)
+    assert got.tolist() == rules.evaluate_rules(frame, cfg).tolist()
+
+
+def test_compacted_frame_rules(frame):
+    compact, _ = ops.compact_frame(pd.concat([frame] * 4, ignore_index=True))
+    assert isinstance(compact["severity"].dtype, pd.CategoricalDtype)
+    cfg = _cfg(("severity", ">", "A", "late"), ("speed", ">=", "70", "fast"))
+    assert rules.evaluate_rules(compact, cfg).tolist() == [
+        "other", "late", "fast", "late", "late", "fast",
+    ] * 4
+
+
+def test_category_filter_in_clean_plan(frame):
+    params = _clean_params(
+        type_map={"speed": "Category"},
+        filter_rows=True, filter_col="speed", filter_op=">", filter_val="40",
+    )
+    warnings = []
+    out = clean.run_clean_plan(clean.compile_clean_plan(params), frame, warnings.append)
+    assert not warnings
+    assert out["speed"].tolist() == [50, 70, 90]
+
+
+def test_masks_follow_content_not_a_sample():
+    # one changed cell far from any sampled row must not reuse a mask
+    a = pd.DataFrame({"x": np.r_[np.zeros(5000), np.nan, np.zeros(5000)]})
+    cfg = _cfg(("x", "==", "0", "zero"))
+    assert rules.evaluate_rules(a, cfg).iloc[5000] == "other"
+    assert rules.evaluate_rules(a.fillna(0), cfg).iloc[5000] == "zero"
+
+
+def test_fingerprint_is_memoised_per_frame():
+    a = pd.DataFrame({"x": range(10)})
+    b = a.copy()
+    assert ops.frame_fingerprint(a) == ops.frame_fingerprint(b)
+    assert ops.frame_fingerprint(a) is ops.frame_fingerprint(a)
+    assert ops.frame_fingerprint(a) != ops.frame_fingerprint(a.assign(x=a["x"] + 1))
+
+
+def test_clean_cached_keys_on_content_and_replays_warnings():
+    a = pd.DataFrame({"x": np.r_[np.zeros(5000), np.nan, np.zeros(5000)]})
+    params = _clean_params(drop_null=True, null_types=["NaN"])
+    assert len(clean.clean_cached(a, params)) == 10000
+    assert len(clean.clean_cached(a.fillna(0), params)) == 10001
+
+    bad = _clean_params(filter_rows=True, filter_col="x", filter_op=">", filter_val="x")
+    for _ in range(2):
+        warnings = []
+        clean.clean_cached(a, bad, on_warning=warnings.append)
+        assert warnings == ["Filter expression failed"]
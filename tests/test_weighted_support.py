@@ -0,0 +1,81 @@
+# tests/test_weighted_support.py
+
+import random
+
+import components.spmf.spmf_executor as executor
+import components.spmf.weighted_support as weighted
+from components.spmf.prefixspan import prefixspan
+from components.spmf.sequence_db import SequenceDB
+
+
+def _contains(sequence: list, pattern: list) -> bool:
+    i = 0
+    for itemset in sequence:
+        if i < len(pattern) and set(pattern[i]) <= set(itemset):
+            i += 1
+    return i == len(pattern)
+
+
+def _random_db(rng: random.Random) -> tuple[list, SequenceDB]:
+    sequences = [
+        [sorted(rng.sample(range(1, 7), rng.randint(1, 3))) for _ in range(rng.randint(1, 5))]
+        for _ in range(rng.randint(1, 12))
+    ]
+    lines = [" -1 ".join(" ".join(map(str, s)) for s in seq) + " -1 -2" for seq in sequences]
+    return sequences, SequenceDB.from_lines(lines)
+
+
+def test_batched_supports_match_containment():
+    rng = random.Random(0)
+    for _ in range(100):
+        sequences, db = _random_db(rng)
+        patterns = [
+            [sorted(rng.sample(range(1, 8), rng.randint(1, 2))) for _ in range(rng.randint(1, 3))]
+            for _ in range(30)
+        ]
+        expected = [sum(_contains(s, p) for s in sequences) for p in patterns]
+        assert weighted.SupportCounter(db).supports(patterns).tolist() == expected
+        dedup = db.dedup()
+        assert weighted.SupportCounter(dedup).supports(patterns).tolist() == expected
+
+
+def test_recount_matches_full_database():
+    rng = random.Random(1)
+    for _ in range(30):
+        _, db = _random_db(rng)
+        dedup = db.dedup()
+        target = weighted.absolute_support(0.5, db.total_weight)
+        mined = prefixspan(dedup, weighted.distinct_minsup(dedup, target), max_patterns=None)
+        full = prefixspan(db, 0.5, max_patterns=None)
+        recounted = weighted.recount(mined, dedup, target)
+        key = lambda df: sorted(
+            tuple(df.drop(columns="Pattern ID").fillna("").astype(str).itertuples(index=False))
+        )
+        assert key(recounted) == key(full)
+
+
+def test_heavy_sequence_runs_on_expanded_database():
+    # one sequence alone reaches the target: mining the distinct sequences
+    # would need support 1, so the run falls back to the full database
+    db = SequenceDB.from_lines(["1 -1 2 -1 3 -2"] * 20 + ["4 -1 5 -2", "6 -2"]).dedup()
+    target = weighted.absolute_support(0.5, db.total_weight)
+    assert weighted.distinct_count(db, target) == 1
+    assert weighted.loose_on_distinct(db, target)
+
+    _, params, recount_target, used, _ = executor._prepare_input(
+        "PrefixSpan", "unused.txt", {"min_support": 0.5}, db, prune=False
+    )
+    assert recount_target is None and used.weights is None
+    assert len(used) == db.total_weight and params["min_support"] == 0.5
+
+
+def test_spread_weights_stay_deduplicated():
+    db = SequenceDB.from_lines(
+        [f"{i} -1 {i + 1} -2" for i in range(10) for _ in range(3)]
+    ).dedup()
+    target = weighted.absolute_support(0.5, db.total_weight)
+    assert not weighted.loose_on_distinct(db, target)
+    _, params, recount_target, used, _ = executor._prepare_input(
+        "PrefixSpan", "unused.txt", {"min_support": 0.5}, db, prune=False
+    )
+    assert recount_target == target and used is db